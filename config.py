@@ -11,6 +11,7 @@ DEFAULT_WINDOW_HEIGHT = 1920
 TIMEOUTS = {
     "scrcpy_start": 5,
     "window_detection": 3,
+    "window_discovery": 30,
     "profile_load": 10,
     "screenshot_capture": 2,
     "interaction_delay": 1,
@@ -22,16 +23,191 @@ RATING_THRESHOLD = 6
 MAX_RATING = 10
 
 # Screenshot settings
+# SCREENSHOT_FORMAT: "png", "webp" (lossless) or "npy" (raw pixel array, fastest to write)
 SCREENSHOT_DIR = "screenshots"
 SCREENSHOT_FORMAT = "png"
 
+# Screenshot writer
+# Captures are encoded and saved by background workers; frames stay in memory while
+# queued, so the automation never waits on the encoder.
+SCREENSHOT_WRITER = {
+    "asynchronous": True,
+    "workers": 2,
+    "queue_size": 16,  # Frames waiting for a worker before a capture blocks
+    "png_compress_level": 1,  # zlib level (0-9); PIL's default of 6 is several times slower
+    "webp_method": 0,  # Lossless WebP effort (0 fastest - 6 smallest)
+    "cache_size": 32  # Recently captured frames served from memory
+}
+
+# Run-scoped screenshot storage
+# Each run captures into SCREENSHOT_DIR. At startup the previous run's directory is moved
+# to runs_dir/<run id> with a single rename, and archived runs beyond the retention
+# limits are deleted by a background thread.
+ARTIFACT_STORE = {
+    "runs_dir": "screenshot_runs",
+    "keep_runs": 3,  # Archived runs kept (newest first)
+    "max_bytes": 2 * 1024 ** 3  # Total size of archived runs kept, None for no limit
+}
+
+# Capture backend
+# "window": grab the scrcpy window from the desktop (window must be visible)
+# "stream": decode scrcpy's video output directly (see STREAM_CONFIG)
+CAPTURE_BACKEND = "window"
+
+# Stream capture settings (used when CAPTURE_BACKEND = "stream")
+# On Linux, scrcpy can publish the device screen to a v4l2loopback device which
+# OpenCV then decodes. Any cv2.VideoCapture source (file, URL) also works.
+# --v4l2-sink is Linux-only; on macOS point "source" at another capture source and
+# drop it from scrcpy_options. The stream only replaces screenshots: clicks and swipes
+# still go to the mirror window, so do not add --no-video-playback (scrcpy would then
+# open no window and input would land on whatever window has focus).
+STREAM_CONFIG = {
+    "source": "/dev/video2",
+    "buffer_size": 8,  # Number of recent frames kept in memory
+    "realtime": False,  # Pace decoding at the stream FPS (for recorded files)
+    "scrcpy_options": [
+        "--v4l2-sink=/dev/video2"
+    ]
+}
+
+# Screen watcher settings
+# Background capture thread that keeps recent frames in memory and publishes
+# "changed"/"stable" events. Best paired with CAPTURE_BACKEND = "stream".
+SCREEN_WATCHER = {
+    "enabled": False,
+    "fps": 5,
+    "buffer_size": 30,  # Number of recent frames kept in memory
+    "change_threshold": 2.0,  # Mean grayscale difference (0-255) that counts as a change
+    "stable_frames": 3  # Consecutive unchanged frames before the screen is stable
+}
+
+# Adaptive profile scrolling
+# The displacement of each swipe is measured between captures and the next swipe is
+# sized so consecutive captures share target_overlap of the content.
+SCROLLING = {
+    "target_overlap": 0.1,  # Fraction of the content height visible in both captures
+    "initial_fraction": 0.8,  # First swipe length (fraction of window height)
+    "min_fraction": 0.3,
+    "max_fraction": 0.85,
+    "start_fraction": 0.9,  # Swipe start position from the top (fraction of window height)
+    "speed": 1.6,  # Drag speed in window heights per second (0.8 of the height takes 0.5s)
+    "min_duration": 0.2,
+    "max_duration": 1.5,
+    "smoothing": 0.5  # Weight of the newest displacement measurement
+}
+
+# End-of-profile detection after each scroll
+# Signals are combined as 1 - prod(1 - confidence); scrolling stops at min_confidence.
+END_OF_PROFILE = {
+    "min_confidence": 0.6,
+    "still_threshold": 0.02,  # Displacement (fraction of content rows) treated as no movement
+    "still_confidence": 0.95,
+    "short_scroll_confidence": 0.9,  # Scaled by how far short of the expected displacement a swipe fell
+    # OCR the bottom of new captures for the end-of-profile buttons: True after every scroll,
+    # "uncertain" only when the scroll signals are inconclusive (a short or unmeasured
+    # scroll that has not already ended the profile), False never
+    "ocr_markers": "uncertain",
+    "marker_shortfall": 0.1,  # Shortfall (fraction of the expected displacement) that makes a scroll uncertain
+    "marker_region": 0.4,  # Bottom fraction of the capture searched for markers
+    "marker_confidence": 0.85  # All markers found (a partial match scales down)
+}
+
+# Static UI chrome (status bar, top bar, bottom buttons) cropped from frames before
+# screenshot comparison, hashing and LLM requests. Learned per window geometry from
+# the rows that stay constant while a profile scrolls; overrides take precedence,
+# e.g. {"1080x1920": {"top": 120, "bottom": 210}}.
+CHROME_MASK = {
+    "enabled": True,
+    "learn": True,
+    "changed_fraction": 0.05,  # Largest fraction of changed pixels for a row to count as constant
+    "history": 5,  # Learned mask is the median of this many recent profiles
+    "overrides": {}
+}
+
+# Screenshot comparison cascade
+# A 256-bit vertical difference hash of a 16x17 grayscale thumbnail settles clear cases; the
+# perceptual hash (or pixel sampling without imagehash) only runs when the difference
+# hash distance falls between identical_max and different_min.
+COMPARE_CASCADE = {
+    "identical_max": 4,  # dhash distance at or below which frames are identical
+    "different_min": 96,  # dhash distance at or above which frames differ (random frames average 128)
+    "phash_threshold": 5  # phash distance below which frames are identical
+}
+
+# Near-duplicate frame suppression before full analysis
+# Frames are clustered by perceptual hash (64 bits, chrome cropped) and one frame per
+# cluster is analysed, dropping repeated photos and scrolls that bounced back.
+# Hash matches are confirmed on quarter-size thumbnails so prompt cards sharing a
+# layout but not their text are all kept. Skipped when STITCHING is enabled: the
+# stitcher needs every adjacent scroll position and drops the overlap itself.
+FRAME_DEDUP = {
+    "enabled": True,
+    "max_distance": 4,  # Largest Hamming distance treated as a duplicate (compare cascade phash uses < 5)
+    "confirm_tolerance": 32  # Largest grayscale difference (0-255) between duplicate thumbnails
+}
+
+# Cross-run index of evaluated profiles, keyed by the perceptual hash of the first frame
+# A profile whose first frame matches a recorded SKIP or ENGAGE is dismissed without any
+# LLM call, so an engaged profile is never liked or commented on twice.
+# Only hashes, timestamps, decisions and ratings are stored.
+PROFILE_INDEX = {
+    "enabled": False,
+    "path": "data/profile_index.hidx",
+    "max_distance": 4,  # Largest Hamming distance accepted as the same profile
+    "max_age_days": 30  # Older decisions are ignored and removed
+}
+
+# Frame stitching before full analysis
+# Overlapping scroll screenshots are joined into one composite (static header kept
+# once, static footer dropped) and re-sliced into tiles at the vision model's input
+# size, so the model does not re-encode overlapping pixels.
+STITCHING = {
+    "enabled": False,
+    "tile_size": 896,  # Vision model input size in pixels (gemma3 uses 896x896)
+    "bands": 16,  # Column bands per row profile used for offset estimation
+    "min_overlap": 0.05,  # Minimum overlap between frames (fraction of content height)
+    "max_error": 25.0,  # Largest mean squared row-profile difference accepted as a match
+    "static_tolerance": 1.0,  # Mean absolute row difference (0-255) for header/footer rows
+    "keep_footer": False,
+    "save_composite": False
+}
+
 # Logging settings
 LOG_DIR = "logs"
 LOG_LEVEL = "INFO"
 
+# Latency instrumentation
+# Per-profile stage timings are appended to <output_dir>/profile_timings_<run>.jsonl
+INSTRUMENTATION = {
+    "enabled": True,
+    "output_dir": LOG_DIR
+}
+
+# Chrome / Perfetto trace export of every span (open in chrome://tracing or ui.perfetto.dev)
+TRACE = {
+    "enabled": False,
+    "output_dir": LOG_DIR
+}
+
+# Session recording into a single archive (frames, actions, LLM calls) for replay and benchmarks
+RECORDING = {
+    "enabled": False,
+    "output_dir": LOG_DIR
+}
+
 # Comment settings
 MAX_COMMENT_LENGTH = 150
 
+# Profile analysis mode:
+# "single"    - one call returns rating, reason, decision and comment
+# "two_phase" - a short decision call, then a comment call only for ENGAGE profiles
+ANALYSIS_MODE = "single"
+TWO_PHASE_ANALYSIS = {
+    "decision_options": {"temperature": 0.3, "num_predict": 60},
+    "comment_options": {"temperature": 0.8, "num_predict": 80},
+    "comment_attempts": 2  # Comment generations tried before giving up on a valid comment
+}
+
 # Error handling
 MAX_RETRY_ATTEMPTS = 3
 DAILY_LIMIT_MESSAGE = "Limit of daily profiles reached"
@@ -62,6 +238,26 @@ OLLAMA_CONFIG = {
     "max_retries": 2
 }
 
+# Model per analysis role. Each role inherits OLLAMA_CONFIG and may override
+# "model", "options" (base options; per-call budgets such as num_predict still apply)
+# and "keep_alive" (how long Ollama keeps the model loaded, e.g. "30m" or -1).
+# The quick filter runs on every profile, so a smaller vision model there
+# (e.g. "qwen2.5vl:3b") cuts the average per-profile inference time.
+MODEL_ROLES = {
+    "quick_filter": {
+        "model": "gemma3:4b",
+        "keep_alive": "30m"
+    },
+    "full_analysis": {
+        "model": "gemma3:4b",
+        "keep_alive": "30m"
+    },
+    "json_repair": {
+        "model": "gemma3:4b",
+        "keep_alive": "5m"
+    }
+}
+
 STRING_TO_INDICATE_AI_GENERATED_MESSAGE = "-AI gen"
 
 # UI Text Detection Strings
@@ -73,6 +269,21 @@ UI_TEXT_STRINGS = {
     "profile_not_available": "profile not available",
     # AI enabled reply options screen text strings
     "ai_enabled_reply_give_feedback": "Give feedback",
-    "ai_enabled_reply_hinge_learning": "Hinge is still learning"
+    "ai_enabled_reply_hinge_learning": "Hinge is still learning",
+    # Buttons shown below the last prompt of a profile
+    "profile_end_hide": "hide",
+    "profile_end_report": "report"
+
+}
+
+# OCR engine (tesserocr keeps one engine loaded; pytesseract is the fallback)
+OCR_CONFIG = {
+    "lang": "eng",
+    "psm": None  # Tesseract page segmentation mode, None for tesseract's default
+}
 
+# OCR the first frame and reject on red-flag keywords before the quick LLM call
+OCR_PREFILTER = {
+    "enabled": False,
+    "reject_severities": ["high"]
 }
@@ -3,6 +3,7 @@ Hinge Automation Main Script
 Orchestrates the overall automation workflow
 """
 
+import json
 import logging
 import sys
 import os
@@ -15,13 +16,80 @@ from scrcpy_manager import ScrcpyManager
 from window_detector import WindowDetector
 from interaction_handler import InteractionHandler
 from screenshot_handler import ScreenshotHandler
+from stream_frame_source import StreamFrameSource
+from screen_watcher import ScreenWatcher
+from startup_orchestrator import StartupOrchestrator
+from instrumentation import get_instrumentation, span, timed_sleep
+from trace_export import TraceRecorder
+from session_recorder import SessionRecorder, RecordingLLM
 from profile_analyzer import ProfileAnalyzer
+from frame_stitcher import get_frame_stitcher
+from scroll_controller import ScrollController
+from profile_end_detector import ProfileEndDetector
+from chrome_mask import get_chrome_mask
+from frame_dedup import get_frame_deduplicator
+from profile_index import get_profile_index, first_frame_hash as hash_first_frame
+from screenshot_writer import get_screenshot_writer
+from artifact_store import get_artifact_store
+from ai.metrics import get_inference_metrics
 
 from error_handler import ErrorHandler
 from ui_detector import get_ui_detector
-from config import STRING_TO_INDICATE_AI_GENERATED_MESSAGE, TIMEOUTS
+from config import STRING_TO_INDICATE_AI_GENERATED_MESSAGE, TIMEOUTS, WINDOW_TITLE, CAPTURE_BACKEND, STREAM_CONFIG, SCREEN_WATCHER, TRACE, RECORDING, STITCHING, FRAME_DEDUP, PROFILE_INDEX
 
-def like_and_post_comment(comment: str, interaction_handler, ui_detector, screenshot_handler) -> bool:
+def click_and_check_screen_change(x, y, name, interaction_handler, screenshot_handler, screen_watcher=None) -> bool:
+    """
+    Click a button and check whether the screen content changed afterwards
+
+    Args:
+        x, y: Coordinates to click
+        name: Short button name used in logs and temporary screenshot names
+        interaction_handler: Handler for UI interactions
+        screenshot_handler: Handler for screenshots
+        screen_watcher: Optional running ScreenWatcher used instead of before/after screenshots
+
+    Returns:
+        bool: True if the click was performed, False otherwise
+    """
+    changed = None
+
+    if screen_watcher:
+        click_time = time.time()
+        if not interaction_handler.click_at(x, y):
+            return False
+        changed = screen_watcher.wait_for_change(since=click_time, timeout=1.0)
+    else:
+        # Take screenshot before clicking for comparison
+        before_screenshot = screenshot_handler.capture_screenshot(f"before_{name}_click.png")
+
+        if not interaction_handler.click_at(x, y):
+            return False
+
+        # Wait for UI to respond
+        timed_sleep(1.0, "click_confirm")
+
+        # Take screenshot after clicking to check if screen changed
+        after_screenshot = screenshot_handler.capture_screenshot(f"after_{name}_click.png")
+
+        if before_screenshot and after_screenshot:
+            changed = not screenshot_handler.compare_screenshots(before_screenshot, after_screenshot)
+
+            # Clean up temporary screenshots
+            try:
+                get_screenshot_writer().discard(before_screenshot)
+                get_screenshot_writer().discard(after_screenshot)
+            except Exception as e:
+                logging.debug(f"Could not clean up temporary screenshots: {e}")
+
+    if changed is False:
+        logging.warning(f"⚠️ ALERT: No screen content change detected after clicking {name} button!")
+        logging.warning(f"The {name} button click may have failed or the UI did not respond as expected")
+    elif changed:
+        logging.info(f"Screen content changed after {name} click")
+
+    return True
+
+def like_and_post_comment(comment: str, interaction_handler, ui_detector, screenshot_handler, screen_watcher=None) -> bool:
     """
     Like the profile and 
     Post a comment directly using interaction handler and UI detector
@@ -31,6 +99,7 @@ def like_and_post_comment(comment: str, interaction_handler, ui_detector, screen
         interaction_handler: Handler for UI interactions
         ui_detector: UI detector for coordinates
         screenshot_handler: Handler for screenshots
+        screen_watcher: Optional running ScreenWatcher for click confirmation
 
     Returns:
         bool: True if comment posted successfully, False otherwise
@@ -44,48 +113,24 @@ def like_and_post_comment(comment: str, interaction_handler, ui_detector, screen
         heart_x, heart_y = ui_detector.get_heart_button_coords()
         logging.info(f"Clicking heart icon at ({heart_x}, {heart_y})")
 
-        # Take screenshot before clicking heart for comparison
-        before_heart_screenshot = screenshot_handler.capture_screenshot("before_heart_click.png")
-
-        if not interaction_handler.click_at(heart_x, heart_y):
+        # Click heart and check that the comment interface opened
+        if not click_and_check_screen_change(heart_x, heart_y, "heart", interaction_handler,
+                                             screenshot_handler, screen_watcher):
             logging.error("Failed to click heart icon")
             return False
 
-        # Wait for UI to respond
-        time.sleep(1.0)
-
-        # Take screenshot after clicking heart to check if screen changed
-        after_heart_screenshot = screenshot_handler.capture_screenshot("after_heart_click.png")
-
-        if before_heart_screenshot and after_heart_screenshot:
-            if screenshot_handler.compare_screenshots(before_heart_screenshot, after_heart_screenshot):
-                logging.warning("⚠️ ALERT: No screen content change detected after clicking heart/like icon!")
-                logging.warning("The heart icon click may have failed or the comment interface did not open")
-            else:
-                logging.info("Screen content changed after heart click - comment interface opened successfully")
-
-            # Clean up temporary screenshots
-            try:
-                import os
-                if os.path.exists(before_heart_screenshot):
-                    os.remove(before_heart_screenshot)
-                if os.path.exists(after_heart_screenshot):
-                    os.remove(after_heart_screenshot)
-            except Exception as e:
-                logging.debug(f"Could not clean up temporary screenshots: {e}")
-
         # Step 3: Type the comment: Commenting below lines since text box is already focused after clicking heart
         # text_box_x, text_box_y = ui_detector.get_comment_box_coords(interaction_handler.window_bounds)
         # logging.info(f"Clicking comment text box at ({text_box_x}, {text_box_y})")
         # interaction_handler.click_at(text_box_x, text_box_y)
         
-        time.sleep(1)
+        timed_sleep(1, "before_typing")
         logging.info(f"Typing comment: {comment}")
         if not interaction_handler.type_text(comment):
             logging.error("Failed to type comment")
             return False
         logging.info(f"Typing comment: {comment} task completed")
-        time.sleep(1)
+        timed_sleep(1, "after_typing")
 
         # Atleast one of these will work - hack, TODO : Fix long in long term
         # Use normal send button
@@ -103,7 +148,7 @@ def like_and_post_comment(comment: str, interaction_handler, ui_detector, screen
         if not interaction_handler.click_at(send_x, send_y):
             logging.error("Failed to send comment") # TODO: This will never get triggerd. Fix
             return False
-        time.sleep(0.5)
+        timed_sleep(0.5, "after_send")
 
         # Check if intermediate screen is shown checking if user wants to send a rose instead of like
         logging.info("Checking if 'send rose instead' screen appeared")
@@ -115,22 +160,21 @@ def like_and_post_comment(comment: str, interaction_handler, ui_detector, screen
                 
                 send_x, send_y = ui_detector.get_send_like_anyway_coords(interaction_handler.window_bounds)
                 logging.info(f"Clicking send like button at ({send_x}, {send_y})")
-                time.sleep(0.5)
+                timed_sleep(0.5, "before_send_like_anyway")
 
                 if not interaction_handler.click_at(send_x, send_y):
                     logging.error("Failed to send comment")
                     return False
-                time.sleep(1.0)
+                timed_sleep(1.0, "after_send_like_anyway")
             else:
                 logging.info("No 'Send Rose Instead' screen detected")
                 try:
-                    if os.path.exists(intermediate_screenshot):
-                        os.remove(intermediate_screenshot)
+                    get_screenshot_writer().discard(intermediate_screenshot)
                 except Exception as e:
                     logging.debug(f"Could not clean up intermediate screenshot: {e}")
 
         # Wait for comment to post
-        time.sleep(1.0)
+        timed_sleep(1.0, "comment_post")
         logging.info("Comment sent successfully")
         return True
 
@@ -138,104 +182,93 @@ def like_and_post_comment(comment: str, interaction_handler, ui_detector, screen
         logging.error(f"Failed to post comment: {e}")
         return False
 
-def cleanup_screenshots():
-    """
-    Clean up screenshot directories before each run
-    - Clear screenshots_from_last_run folder
-    - Move all images from screenshots folder to screenshots_from_last_run
-    - Clear the screenshots folder
+def run_automation(scrcpy_mgr, window_detector, interaction_handler, screenshot_handler,
+                   profile_analyzer, ui_detector, max_profiles=9, rotate_screenshots=True, recorder=None):
     """
-    import shutil
-
-    screenshots_dir = "screenshots"
-    last_run_dir = "screenshots_from_last_run"
-
-    try:
-        # Create directories if they don't exist
-        os.makedirs(screenshots_dir, exist_ok=True)
-        os.makedirs(last_run_dir, exist_ok=True)
-
-        # Clear screenshots_from_last_run folder
-        for filename in os.listdir(last_run_dir):
-            file_path = os.path.join(last_run_dir, filename)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-                logging.info(f"Removed old file from last run: {filename}")
-
-        # Move all files from screenshots to screenshots_from_last_run
-        for filename in os.listdir(screenshots_dir):
-            src_path = os.path.join(screenshots_dir, filename)
-            dst_path = os.path.join(last_run_dir, filename)
-            if os.path.isfile(src_path):
-                shutil.move(src_path, dst_path)
-                logging.info(f"Moved screenshot to last run: {filename}")
-
-        # Clear the screenshots folder (should be empty now, but just in case)
-        for filename in os.listdir(screenshots_dir):
-            file_path = os.path.join(screenshots_dir, filename)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-                logging.info(f"Cleaned up remaining file: {filename}")
-
-        logging.info("Screenshot cleanup completed successfully")
+    Run the automation workflow with the given components
 
-    except Exception as e:
-        logging.error(f"Error during screenshot cleanup: {e}")
+    Components are injected so the same loop can run against a live device or
+    against replay backends (see replay.py).
 
-def main():
-    """
-    Main automation workflow
+    Args:
+        scrcpy_mgr: Manages the scrcpy process
+        window_detector: Finds the mirror window and its geometry
+        interaction_handler: Performs clicks, swipes and typing
+        screenshot_handler: Captures frames (ScreenshotHandler or a subclass)
+        profile_analyzer: Rates profiles with the LLM
+        ui_detector: Provides button coordinates and OCR screen checks
+        max_profiles: Safety limit to prevent infinite loops
+        rotate_screenshots: Archive the previous run's screenshots on startup
+        recorder: Optional SessionRecorder archiving frames, actions and LLM calls
     """
-    # Initialize logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
-
-    # Clean up screenshots from previous run
-    logging.info("Performing screenshot cleanup from previous run...")
-    cleanup_screenshots()
-
-    # Initialize components
-    scrcpy_mgr = ScrcpyManager()
-    window_detector = WindowDetector()
-    interaction_handler = InteractionHandler()
-    screenshot_handler = ScreenshotHandler()
-    profile_analyzer = ProfileAnalyzer()
-
+    use_stream = isinstance(screenshot_handler, StreamFrameSource)
     error_handler = ErrorHandler()
-    ui_detector = get_ui_detector()
+    screen_watcher = None
+    instrumentation = get_instrumentation()
+    tracer = None
+    if TRACE["enabled"]:
+        tracer = TraceRecorder()
+        instrumentation.add_listener(tracer.on_span)
+    if recorder:
+        screenshot_handler.set_recorder(recorder)
+        interaction_handler.set_recorder(recorder)
+        for role_attr in ('llm', 'quick_llm', 'repair_llm'):
+            setattr(profile_analyzer, role_attr, RecordingLLM(getattr(profile_analyzer, role_attr), recorder))
+        comment_generator = profile_analyzer.comment_generator
+        comment_generator.llm = RecordingLLM(comment_generator.llm, recorder)
 
     try:
-        # Step 1: Run scrcpy in a terminal
-        logging.info("Starting Hinge Automation - Step 1: Launching scrcpy")
-        if not scrcpy_mgr.start_scrcpy():
-            logging.error("Failed to start scrcpy. Exiting.")
-            return
-
-        logging.info("scrcpy launched successfully. Automation ready to proceed.")
-
-        # Step 2: Identify the active window and prepare Hinge app
+        # Step 1: Launch scrcpy and run the independent startup tasks concurrently
+        logging.info("Starting Hinge Automation - Step 1: Launching scrcpy and warming up components")
         print("\n" + "="*60)
-        print("STEP 2: WINDOW & APP PREPARATION")
+        print("STEP 1 & 2: STARTUP, WINDOW & APP PREPARATION")
         print("="*60)
-        print("Please do BOTH of the following within 10 seconds:")
-        print("1. Make the scrcpy window ACTIVE (click on it)")
-        print("2. Open the Hinge app on your device")
+        print("Please open the Hinge app on your device")
         print("="*60)
 
-        # Wait 10 seconds for user to activate window and open Hinge app
-        for i in range(10, 0, -1):
-            print(f"\rTime remaining: {i} seconds", end="", flush=True)
-            time.sleep(1)
-        print("\rPreparation time complete!     ")
+        scrcpy_extra_options = STREAM_CONFIG["scrcpy_options"] if use_stream else None
+        # Input is sent to the mirror window, which scrcpy does not open without playback
+        if scrcpy_extra_options and "--no-video-playback" in scrcpy_extra_options:
+            logging.error("STREAM_CONFIG scrcpy_options must not include --no-video-playback: "
+                          "clicks and swipes need the scrcpy window. Exiting.")
+            return
 
-        # Get the active window
-        logging.info("Detecting active window...")
-        if not window_detector.get_active_window():
-            logging.error("Failed to get active window. Exiting.")
+        startup = StartupOrchestrator()
+        # Archive the previous run's screenshots and expire old runs in the background
+        if rotate_screenshots:
+            startup.add_task("artifact_rotation", get_artifact_store().rotate, required=False)
+        startup.add_task("scrcpy_launch", lambda: scrcpy_mgr.start_scrcpy(scrcpy_extra_options))
+        if use_stream:
+            startup.add_task("stream_capture", screenshot_handler.start, depends_on=["scrcpy_launch"])
+        # Find the scrcpy window by its configured title as soon as it appears
+        startup.add_task("window_discovery", lambda: window_detector.wait_for_window(WINDOW_TITLE),
+                         depends_on=["scrcpy_launch"], required=False)
+        startup.add_task("llm_warmup", profile_analyzer.warm_up, required=False)
+        startup.add_task("ocr_init", ui_detector.warm_up, required=False)
+
+        if not startup.run():
+            logging.error("Failed to start scrcpy or its video stream. Exiting.")
             return
 
+        logging.info("scrcpy launched successfully. Automation ready to proceed.")
+
+        # Step 2: Fall back to the active window if the title lookup failed
+        if not startup.succeeded("window_discovery"):
+            logging.warning("Could not find window by title - falling back to active window detection")
+            print("Please make the scrcpy window ACTIVE (click on it) within 10 seconds")
+
+            # Wait 10 seconds for user to activate window
+            for i in range(10, 0, -1):
+                print(f"\rTime remaining: {i} seconds", end="", flush=True)
+                time.sleep(1)
+            print("\rPreparation time complete!     ")
+
+            # Get the active window
+            logging.info("Detecting active window...")
+            if not window_detector.get_active_window():
+                logging.error("Failed to get active window. Exiting.")
+                return
+
         # Get window dimensions
         dimensions = window_detector.get_dimensions()
         if not dimensions:
@@ -249,15 +282,36 @@ def main():
         interaction_handler.set_window_bounds(dimensions)
         screenshot_handler.set_window_bounds(dimensions)
 
+        # Start background screen watcher so steps read the latest frame instead of grabbing
+        if SCREEN_WATCHER["enabled"]:
+            screen_watcher = ScreenWatcher(screenshot_handler)
+            if screen_watcher.start():
+                screenshot_handler.attach_watcher(screen_watcher)
+            else:
+                logging.warning("Screen watcher could not start - using on-demand captures")
+                screen_watcher = None
+
         logging.info("Window and Hinge app preparation complete")
         print("Continuing with automation...")
 
         # Main profile processing loop
         profile_count = 0
-        max_profiles = 9  # Safety limit to prevent infinite loops
+        scroll_controller = ScrollController()
+        end_detector = ProfileEndDetector(ui_detector)
 
         while profile_count < max_profiles:
             profile_count += 1
+            instrumentation.begin_profile(profile_count)
+            scroll_controller.begin_profile()
+            if recorder:
+                recorder.begin_profile(profile_count)
+
+            # Re-detect window geometry only if it moved or was resized
+            if window_detector.refresh_if_moved():
+                dimensions = window_detector.dimensions
+                interaction_handler.set_window_bounds(dimensions)
+                screenshot_handler.set_window_bounds(dimensions)
+
             print(f"\n{'='*60}")
             print(f"PROCESSING PROFILE #{profile_count}")
             print(f"{'='*60}")
@@ -267,7 +321,7 @@ def main():
             print("STEP 5: WAITING FOR PROFILE TO LOAD")
             print("="*60)
             logging.info(f"Waiting for profile #{profile_count} to load...")
-            time.sleep(TIMEOUTS["profile_load"])
+            timed_sleep(TIMEOUTS["profile_load"], "profile_load")
             logging.info("Profile load wait complete")
 
             # Step 6: Take screenshots of profile with scrolling
@@ -282,11 +336,41 @@ def main():
             first_screenshot = screenshot_handler.capture_screenshot("profile_001.png")
             if first_screenshot:
                 profile_screenshots.append(first_screenshot)
+                scroll_controller.record_first_capture()
                 logging.info(f"First screenshot captured: {first_screenshot}")
             else:
                 logging.error("Failed to capture first screenshot")
+                instrumentation.end_profile(outcome="capture_failed")
                 continue  # Skip to next profile instead of exiting
 
+            # Profiles decided in an earlier run are dismissed without calling the LLM
+            profile_index = get_profile_index() if PROFILE_INDEX.get("enabled", False) else None
+            first_frame_hash = None
+            if profile_index is not None:
+                with span("profile_index"):
+                    try:
+                        first_frame_hash = hash_first_frame(first_screenshot)
+                        prior = profile_index.lookup(first_frame_hash)
+                    except Exception as e:
+                        logging.warning(f"Profile index lookup failed: {e}")
+                        prior = None
+
+                if prior:
+                    # A profile engaged before is not liked or commented on a second time
+                    outcome = "index_engaged" if prior['decision'] == "ENGAGE" else "index_skipped"
+                    logging.info(f"Profile already decided: {prior['decision']} (distance {prior['distance']}, "
+                                 f"rating {prior['rating']}) - skipping to next profile")
+                    cross_x, cross_y = ui_detector.get_cross_button_coords()
+                    if interaction_handler.click_at(cross_x, cross_y):
+                        logging.info("Cross clicked - moving to next profile")
+                        timed_sleep(TIMEOUTS["profile_load"], "profile_load")
+                    else:
+                        logging.error("Failed to click cross button")
+
+                    instrumentation.end_profile(outcome=outcome, rating=prior['rating'],
+                                                decision=prior['decision'], **scroll_controller.end_profile())
+                    continue
+
             # Quick analysis for pre-filtering
             print("\n" + "="*60)
             print("QUICK PROFILE ANALYSIS")
@@ -305,38 +389,48 @@ def main():
                 cross_x, cross_y = ui_detector.get_cross_button_coords()
                 logging.info(f"Using cross button coordinates: ({cross_x}, {cross_y})")
 
-                if interaction_handler.click_at(cross_x, cross_y):
+                dismissed = interaction_handler.click_at(cross_x, cross_y)
+                if dismissed:
                     logging.info("Cross clicked - moving to next profile")
                     # Wait for next profile to load
-                    time.sleep(TIMEOUTS["profile_load"])
+                    timed_sleep(TIMEOUTS["profile_load"], "profile_load")
                 else:
                     logging.error("Failed to click cross button")
 
+                # Failed analyses are not decisions; the profile is evaluated again next run
+                if first_frame_hash is not None and dismissed and not quick_result.get('error'):
+                    profile_index.add(first_frame_hash, "SKIP", quick_result['rating'])
+
                 logging.info(f"Profile #{profile_count} processing complete - quick filtered")
+                instrumentation.end_profile(outcome="quick_filtered", quick_rating=quick_result['rating'],
+                                            **scroll_controller.end_profile())
                 continue  # Continue to next profile
 
             logging.info("Profile passed quick analysis - continuing with full screenshot capture")
 
-            # Scroll and take more screenshots
+            # Scroll and take more screenshots until the end of the profile is detected
             max_scrolls = 10  # Prevent infinite loop
             scroll_count = 0
-            consecutive_identical = 0  # Track consecutive identical screenshots
-            max_identical_threshold = 2  # Stop after 2 identical screenshots
 
             while scroll_count < max_scrolls:
-                # Perform full swipe (almost end to end screen)
-                start_y = dimensions['height'] * 9 // 10  # Near bottom
-                end_y = dimensions['height'] // 10       # Near top
-                center_x = dimensions['width'] // 2
+                # Swipe length adapts to the displacement measured on previous swipes
+                start_x, start_y, end_x, end_y, duration = scroll_controller.next_swipe(dimensions)
+
+                logging.info(f"Performing scroll {scroll_count + 1} ({start_y - end_y}px over {duration}s)")
+                with span("scroll"):
+                    swiped = interaction_handler.swipe(start_x, start_y, end_x, end_y, duration=duration)
+                    if swiped:
+                        # Wait for scroll to complete
+                        if screen_watcher:
+                            with span("sleep.scroll_wait"):
+                                screen_watcher.wait_for_stable(timeout=TIMEOUTS["scroll_wait"])
+                        else:
+                            timed_sleep(TIMEOUTS["scroll_wait"], "scroll_wait")
 
-                logging.info(f"Performing full scroll {scroll_count + 1}")
-                if not interaction_handler.swipe(center_x, start_y, center_x, end_y):
+                if not swiped:
                     logging.error("Failed to perform scroll")
                     break
 
-                # Wait for scroll to complete
-                time.sleep(TIMEOUTS["scroll_wait"])
-
                 # Take new screenshot
                 screenshot_num = len(profile_screenshots) + 1
                 new_screenshot = screenshot_handler.capture_screenshot(f"profile_{screenshot_num:03d}.png")
@@ -345,65 +439,58 @@ def main():
                     logging.error("Failed to capture screenshot after scroll")
                     break
 
-                # Check if screenshot is different from the last one (end of profile detection)
-                if len(profile_screenshots) > 0:
-                    last_screenshot = profile_screenshots[-1]
-                    if screenshot_handler.compare_screenshots(last_screenshot, new_screenshot):
-                        consecutive_identical += 1
-                        logging.info(f"Screenshots are identical (count: {consecutive_identical}/{max_identical_threshold})")
-
-                        # If we've seen identical screenshots multiple times, we've reached the end
-                        if consecutive_identical >= max_identical_threshold:
-                            logging.info("Reached end of profile - stopping scroll")
-                            # Remove the identical screenshot
-                            os.remove(new_screenshot)
-                            break
-                        else:
-                            # Keep the screenshot but continue (might be temporary UI state)
-                            profile_screenshots.append(new_screenshot)
-                            logging.info(f"Screenshot captured (may be duplicate): {new_screenshot}")
-                    else:
-                        # Reset counter when we get different content
-                        consecutive_identical = 0
-                        profile_screenshots.append(new_screenshot)
-                        logging.info(f"New screenshot captured: {new_screenshot}")
+                # End of profile detection from the measured displacement and bottom-of-profile markers
+                last_screenshot = profile_screenshots[-1]
+                with span("scroll_measure"):
+                    measurement = scroll_controller.measure(last_screenshot, new_screenshot)
+                    end_check = end_detector.check(
+                        measurement, new_screenshot,
+                        identical=lambda: screenshot_handler.compare_screenshots(last_screenshot, new_screenshot))
+
+                if end_check['duplicate']:
+                    # The profile did not move, so this capture repeats the previous one
+                    get_screenshot_writer().discard(new_screenshot)
+                    logging.info(f"Discarded repeated screenshot: {new_screenshot}")
                 else:
-                    # First scroll screenshot
                     profile_screenshots.append(new_screenshot)
                     logging.info(f"New screenshot captured: {new_screenshot}")
 
                 scroll_count += 1
 
+                if end_check['end']:
+                    logging.info(f"Reached end of profile - stopping scroll (confidence {end_check['confidence']})")
+                    break
+
             logging.info(f"Profile screenshot capture complete. Total screenshots: {len(profile_screenshots)}")
             for screenshot in profile_screenshots:
                 logging.info(f"Profile screenshot: {screenshot}")
 
-            # Remove the last screenshot if it's a duplicate (end of profile detection)
-            if len(profile_screenshots) > 1:
-                last_screenshot = profile_screenshots[-1]
-                second_last_screenshot = profile_screenshots[-2]
-
-                if screenshot_handler.compare_screenshots(second_last_screenshot, last_screenshot):
-                    logging.info("Removing duplicate last screenshot before AI analysis")
-                    # Remove the duplicate screenshot from the list
-                    removed_screenshot = profile_screenshots.pop()
-                    # Also remove the file from disk
-                    if os.path.exists(removed_screenshot):
-                        os.remove(removed_screenshot)
-                        logging.info(f"Removed duplicate screenshot file: {removed_screenshot}")
-
-            logging.info(f"Final screenshots for AI analysis: {len(profile_screenshots)}")
-            for screenshot in profile_screenshots:
-                logging.info(f"Analysis screenshot: {screenshot}")
+            # Learn the static UI rows from this profile's frames for comparison, hashing and LLM requests
+            with span("chrome_mask"):
+                get_chrome_mask().learn(profile_screenshots)
 
             # Step 7: Analyze profile and decide action
             print("\n" + "="*60)
             print("STEP 7: PROFILE ANALYSIS & ENGAGEMENT")
             print("="*60)
 
+            analysis_images = profile_screenshots
+            if STITCHING.get("enabled", False):
+                # Join overlapping screenshots into non-overlapping model-sized tiles
+                # (the stitcher needs every adjacent scroll position, so no dedup first)
+                analysis_images = get_frame_stitcher().stitch_to_tiles(profile_screenshots,
+                                                                       prefix=f"profile_{profile_count:03d}")
+            elif FRAME_DEDUP.get("enabled", True):
+                # Drop near-duplicate frames (repeated photos, scrolls that bounced back)
+                analysis_images, _ = get_frame_deduplicator().deduplicate(profile_screenshots)
+
+            logging.info(f"Final screenshots for AI analysis: {len(analysis_images)}")
+            for screenshot in analysis_images:
+                logging.info(f"Analysis screenshot: {screenshot}")
+
             # Analyze the profile using vision LLM
             logging.info("Analyzing profile with AI...")
-            analysis_result = profile_analyzer.analyze_profile(profile_screenshots)
+            analysis_result = profile_analyzer.analyze_profile(analysis_images)
             final_comment = analysis_result['comment'] + STRING_TO_INDICATE_AI_GENERATED_MESSAGE
 
             logging.info(f"Analysis result: Rating {analysis_result['rating']}/10, Decision: {analysis_result['decision']}")
@@ -413,64 +500,56 @@ def main():
             if profile_analyzer.should_engage_profile(analysis_result):
                 # Post the generated comment directly
                 logging.info("Engaging with profile - posting comment")
-                comment_success = like_and_post_comment(
-                    final_comment,
-                    interaction_handler,
-                    ui_detector,
-                    screenshot_handler
-                )
-
+                with span("posting"):
+                    comment_success = like_and_post_comment(
+                        final_comment,
+                        interaction_handler,
+                        ui_detector,
+                        screenshot_handler,
+                        screen_watcher
+                    )
+
+                outcome = "engaged" if comment_success else "engage_failed"
                 if comment_success:
                     logging.info("Comment posted successfully - waiting for next profile")
                     # Wait for next profile to load
-                    time.sleep(TIMEOUTS["profile_load"])
+                    timed_sleep(TIMEOUTS["profile_load"], "profile_load")
                 else:
                     logging.error("Failed to post comment")
                     # Could implement retry logic here
             else:
                 # Skip to next profile by clicking cross
                 logging.info("Skipping profile - clicking cross")
-
-                # TODO : Later : Refactor this code to a function
-                # Take screenshot before clicking cross for comparison
-                before_cross_screenshot = screenshot_handler.capture_screenshot("before_cross_click.png")
+                outcome = "skipped"
 
                 # Get cross button coordinates from UI detector
                 cross_x, cross_y = ui_detector.get_cross_button_coords()
                 logging.info(f"Using cross button coordinates: ({cross_x}, {cross_y})")
 
-                if interaction_handler.click_at(cross_x, cross_y):
+                if click_and_check_screen_change(cross_x, cross_y, "cross", interaction_handler,
+                                                 screenshot_handler, screen_watcher):
                     logging.info("Cross clicked - moving to next profile")
 
-                    # Wait a moment for UI to respond
-                    time.sleep(1.0)
-
-                    # Take screenshot after clicking cross to check if screen changed
-                    after_cross_screenshot = screenshot_handler.capture_screenshot("after_cross_click.png")
-
-                    if before_cross_screenshot and after_cross_screenshot:
-                        if screenshot_handler.compare_screenshots(before_cross_screenshot, after_cross_screenshot):
-                            logging.warning("⚠️ ALERT: No screen content change detected after clicking cross button!")
-                            logging.warning("The cross button click may have failed or the UI did not respond as expected")
-                        else:
-                            logging.info("Screen content changed after cross click - navigation successful")
-
-                        # Clean up temporary screenshots
-                        try:
-                            if os.path.exists(before_cross_screenshot):
-                                os.remove(before_cross_screenshot)
-                            if os.path.exists(after_cross_screenshot):
-                                os.remove(after_cross_screenshot)
-                        except Exception as e:
-                            logging.debug(f"Could not clean up temporary screenshots: {e}")
-
                     # Wait for next profile to load
-                    time.sleep(TIMEOUTS["profile_load"])
+                    timed_sleep(TIMEOUTS["profile_load"], "profile_load")
                 else:
                     logging.error("Failed to click cross button")
+                    outcome = "skip_failed"
+
+            # Remember the decision so the profile is not re-evaluated in later runs
+            # (only when the analysis succeeded and the like or dismiss went through)
+            if (first_frame_hash is not None and outcome in ("engaged", "skipped")
+                    and not analysis_result.get('error')):
+                profile_index.add(first_frame_hash, "ENGAGE" if outcome == "engaged" else "SKIP",
+                                  analysis_result['rating'])
 
             # Continue the loop for next profile
             logging.info(f"Profile #{profile_count} processing complete - ready for next profile")
+            instrumentation.end_profile(outcome=outcome, rating=analysis_result['rating'],
+                                        decision=analysis_result['decision'],
+                                        screenshots=len(profile_screenshots),
+                                        analysis_images=len(analysis_images),
+                                        **scroll_controller.end_profile())
 
         logging.info(f"Reached maximum profile limit of {max_profiles}. Stopping automation.")
 
@@ -478,9 +557,50 @@ def main():
         logging.error(f"Main workflow error: {e}")
         error_handler.handle_error(e)
     finally:
-        # Cleanup - stop scrcpy if running
+        instrumentation.finish()
+        if tracer:
+            tracer.write()
+        if recorder:
+            recorder.close()
+        screenshot_writer = get_screenshot_writer()
+        screenshot_writer.close()
+        logging.info(f"Screenshot writes: {json.dumps(screenshot_writer.stats())}")
+        for purpose, stats in get_inference_metrics().summary().items():
+            logging.info(f"LLM '{purpose}' calls: {json.dumps(stats)}")
+
+        # Cleanup - stop background capture and scrcpy if running
+        if screen_watcher:
+            screen_watcher.stop()
+        if use_stream:
+            screenshot_handler.stop()
         scrcpy_mgr.stop_scrcpy()
         error_handler.cleanup()
 
+def main():
+    """
+    Main automation workflow
+    """
+    # Initialize logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    # Initialize components
+    if CAPTURE_BACKEND == "stream":
+        screenshot_handler = StreamFrameSource()
+    else:
+        screenshot_handler = ScreenshotHandler()
+
+    run_automation(
+        scrcpy_mgr=ScrcpyManager(),
+        window_detector=WindowDetector(),
+        interaction_handler=InteractionHandler(),
+        screenshot_handler=screenshot_handler,
+        profile_analyzer=ProfileAnalyzer(),
+        ui_detector=get_ui_detector(),
+        recorder=SessionRecorder() if RECORDING["enabled"] else None
+    )
+
 if __name__ == "__main__":
     main()
@@ -3,6 +3,7 @@ AI Layer Module
 Provides configurable LLM interface for Hinge automation
 """
 
-from ai.ai_manager import get_llm
+from ai.ai_manager import get_llm, create_llm
+from ai.metrics import get_inference_metrics
 
-__all__ = ['get_llm']
+__all__ = ['get_llm', 'create_llm', 'get_inference_metrics']
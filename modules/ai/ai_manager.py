@@ -6,34 +6,55 @@ Factory for creating configured LLM instances
 from typing import Optional
 from ai.ollama_client import OllamaLLM
 
-# Cache for LLM instance
-_cached_llm = None
+# Cache of LLM instances per role (None is the default OLLAMA_CONFIG instance)
+_cached_llms = {}
 
-def get_llm():
+def create_llm(role: Optional[str] = None, **overrides):
     """
-    Get configured LLM instance
+    Create a new LLM instance for a model role
+
+    Args:
+        role: Name of a MODEL_ROLES entry (e.g. 'quick_filter'), or None for OLLAMA_CONFIG
+        **overrides: Settings replacing the configured ones (model, host, options, keep_alive, ...)
 
     Returns:
         LLM instance based on configuration
     """
-    global _cached_llm
-    if _cached_llm:
-        return _cached_llm
-
     # Import config here to avoid circular imports
-    from config import AI_PROVIDER, OLLAMA_CONFIG
+    from config import AI_PROVIDER, OLLAMA_CONFIG, MODEL_ROLES
 
     provider = (AI_PROVIDER or "ollama").lower()
 
+    if role is not None and role not in MODEL_ROLES:
+        raise ValueError(f"Unknown model role: {role}")
+
     if provider == "ollama":
-        cfg = OLLAMA_CONFIG
-        _cached_llm = OllamaLLM(
+        role_cfg = MODEL_ROLES.get(role, {}) if role else {}
+        cfg = {**OLLAMA_CONFIG, **role_cfg, **overrides}
+        cfg["options"] = {**OLLAMA_CONFIG.get("options", {}), **role_cfg.get("options", {}),
+                          **overrides.get("options", {})}
+        return OllamaLLM(
             model=cfg.get("model", "gemma3:4b"),
             host=cfg.get("host"),
-            default_options=cfg.get("options", {}),
+            default_options=cfg["options"],
             timeout_s=cfg.get("timeout_s", 30),
             max_retries=cfg.get("max_retries", 2),
+            keep_alive=cfg.get("keep_alive"),
         )
-        return _cached_llm
 
     raise ValueError(f"Unsupported AI provider: {provider}")
+
+def get_llm(role: Optional[str] = None):
+    """
+    Get configured LLM instance
+
+    Args:
+        role: Name of a MODEL_ROLES entry (quick_filter, full_analysis, json_repair),
+              or None for the default OLLAMA_CONFIG model
+
+    Returns:
+        LLM instance based on configuration (cached per role)
+    """
+    if role not in _cached_llms:
+        _cached_llms[role] = create_llm(role)
+    return _cached_llms[role]
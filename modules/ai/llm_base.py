@@ -9,7 +9,8 @@ class LLM(Protocol):
     """
     Protocol for LLM implementations
     """
-    def generate(self, prompt: str, system: Optional[str] = None, options: Optional[Dict] = None, images: Optional[List[str]] = None) -> str:
+    def generate(self, prompt: str, system: Optional[str] = None, options: Optional[Dict] = None,
+                 images: Optional[List[str]] = None, purpose: Optional[str] = None) -> str:
         """
         Generate text response from LLM
 
@@ -18,6 +19,7 @@ class LLM(Protocol):
             system: Optional system message/instruction
             options: Optional generation parameters (temperature, max_tokens, etc.)
             images: Optional list of image file paths for vision models
+            purpose: Optional tag describing the call, used for metrics
 
         Returns:
             Generated text response
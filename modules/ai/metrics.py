@@ -0,0 +1,128 @@
+"""
+Inference Metrics
+Collects per-call LLM timing and token metrics reported by Ollama
+"""
+
+import threading
+from collections import deque
+
+# Ollama reports durations in nanoseconds
+NS_PER_MS = 1_000_000
+
+
+def ns_to_ms(value):
+    """
+    Convert an Ollama nanosecond duration to milliseconds
+
+    Args:
+        value: Duration in nanoseconds or None
+
+    Returns:
+        float or None
+    """
+    if value is None:
+        return None
+    return round(value / NS_PER_MS, 3)
+
+
+class InferenceMetrics:
+    """
+    Bounded store of inference metric records
+
+    Each record is a dict with the call's purpose (quick, full, json_retry, ...),
+    image count, payload bytes and Ollama's prompt-eval / eval / load / total
+    durations, which together show whether latency comes from image encoding,
+    token generation or model reloads.
+    """
+
+    def __init__(self, max_records=1000):
+        """
+        Initialize the metrics store
+
+        Args:
+            max_records: Maximum number of records kept in memory
+        """
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        """
+        Store a metrics record
+
+        Args:
+            record: Dict describing one LLM call
+        """
+        with self._lock:
+            self._records.append(record)
+
+    def records(self, purpose=None):
+        """
+        Get stored records
+
+        Args:
+            purpose: Only return records with this purpose (all if None)
+
+        Returns:
+            list of record dicts, oldest first
+        """
+        with self._lock:
+            records = list(self._records)
+        if purpose is None:
+            return records
+        return [r for r in records if r.get('purpose') == purpose]
+
+    def clear(self):
+        """
+        Remove all stored records
+        """
+        with self._lock:
+            self._records.clear()
+
+    def summary(self):
+        """
+        Aggregate records per purpose
+
+        Returns:
+            dict: purpose -> calls, images, mean durations (ms) and generation speed
+        """
+        grouped = {}
+        for record in self.records():
+            grouped.setdefault(record.get('purpose', 'unspecified'), []).append(record)
+
+        def mean(values):
+            values = [v for v in values if v is not None]
+            return round(sum(values) / len(values), 3) if values else None
+
+        summary = {}
+        for purpose, records in grouped.items():
+            eval_tokens = sum(r.get('eval_count') or 0 for r in records)
+            eval_ms = sum(r.get('eval_duration_ms') or 0 for r in records)
+            summary[purpose] = {
+                'calls': len(records),
+                'images': sum(r.get('images', 0) for r in records),
+                'mean_payload_bytes': mean([r.get('payload_bytes') for r in records]),
+                'mean_prompt_eval_count': mean([r.get('prompt_eval_count') for r in records]),
+                'mean_prompt_eval_ms': mean([r.get('prompt_eval_duration_ms') for r in records]),
+                'mean_eval_count': mean([r.get('eval_count') for r in records]),
+                'mean_eval_ms': mean([r.get('eval_duration_ms') for r in records]),
+                'mean_load_ms': mean([r.get('load_duration_ms') for r in records]),
+                'mean_total_ms': mean([r.get('total_duration_ms') for r in records]),
+                'eval_tokens_per_s': round(eval_tokens / (eval_ms / 1000), 2) if eval_ms else None
+            }
+        return summary
+
+
+# Global metrics store shared by all LLM clients
+_inference_metrics = None
+
+def get_inference_metrics():
+    """
+    Get the global inference metrics store
+
+    Returns:
+        InferenceMetrics instance
+    """
+    global _inference_metrics
+    if _inference_metrics is None:
+        _inference_metrics = InferenceMetrics()
+    return _inference_metrics
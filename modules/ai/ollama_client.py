@@ -3,12 +3,15 @@ Ollama LLM Client
 Implements LLM interface using local Ollama
 """
 
+import json
 import logging
 import time
-import os
 import ollama
 from typing import Optional, Dict, List
 from ai.llm_base import LLM
+from ai.metrics import get_inference_metrics, ns_to_ms
+from instrumentation import span, timed_sleep
+from chrome_mask import get_chrome_mask
 
 class OllamaLLM(LLM):
     """
@@ -16,7 +19,7 @@ class OllamaLLM(LLM):
     """
 
     def __init__(self, model: str, host: Optional[str] = None, default_options: Optional[Dict] = None,
-                 timeout_s: int = 30, max_retries: int = 2):
+                 timeout_s: int = 30, max_retries: int = 2, keep_alive=None):
         """
         Initialize Ollama LLM client
 
@@ -26,14 +29,20 @@ class OllamaLLM(LLM):
             default_options: Default generation options
             timeout_s: Request timeout in seconds
             max_retries: Maximum retry attempts on failure
+            keep_alive: How long Ollama keeps the model loaded (e.g. '30m', -1), server default if None
         """
         self.model = model
         self.host = host
         self.default_options = default_options or {}
         self.timeout_s = timeout_s
         self.max_retries = max_retries
+        self.keep_alive = keep_alive
+        self.metrics = get_inference_metrics()
+        self.last_metrics = None
+        self._client = None
 
-    def generate(self, prompt: str, system: Optional[str] = None, options: Optional[Dict] = None, images: Optional[List[str]] = None) -> str:
+    def generate(self, prompt: str, system: Optional[str] = None, options: Optional[Dict] = None,
+                 images: Optional[List[str]] = None, purpose: Optional[str] = None) -> str:
         """
         Generate text using Ollama
 
@@ -42,6 +51,7 @@ class OllamaLLM(LLM):
             system: Optional system message
             options: Optional generation parameters
             images: Optional list of image file paths for vision analysis
+            purpose: Optional tag for metrics (e.g. 'quick', 'full', 'json_retry')
 
         Returns:
             Generated text response
@@ -61,39 +71,107 @@ class OllamaLLM(LLM):
                 if system:
                     kwargs["system"] = system
 
+                if self.keep_alive is not None:
+                    kwargs["keep_alive"] = self.keep_alive
+
                 if images:
-                    # Convert image paths to file objects for Ollama
+                    # Read images for Ollama, without the static UI chrome when it is known
                     image_files = []
+                    chrome_mask = get_chrome_mask()
                     for img_path in images:
                         try:
-                            with open(img_path, 'rb') as f:
-                                image_files.append(f.read())
+                            image_files.append(chrome_mask.image_bytes(img_path))
                         except Exception as e:
                             logging.warning(f"Failed to read image {img_path}: {e}")
                             continue
                     if image_files:
                         kwargs["images"] = image_files
 
-                if self.host:
-                    # Temporarily set OLLAMA_HOST environment variable
-                    prev_host = os.environ.get("OLLAMA_HOST")
-                    try:
-                        os.environ["OLLAMA_HOST"] = self.host
-                        resp = ollama.generate(**kwargs)
-                    finally:
-                        if prev_host is not None:
-                            os.environ["OLLAMA_HOST"] = prev_host
-                        else:
-                            os.environ.pop("OLLAMA_HOST", None)
-                else:
-                    resp = ollama.generate(**kwargs)
+                call_start = time.perf_counter()
+                with span("llm.generate", model=self.model, purpose=purpose,
+                          images=len(kwargs.get("images", [])), attempt=attempt + 1):
+                    resp = self._call_generate(**kwargs)
+                wall_ms = (time.perf_counter() - call_start) * 1000
+
+                self._record_metrics(resp, kwargs, purpose, attempt + 1, wall_ms)
 
                 return resp.get("response", "")
 
             except Exception as e:
                 last_exc = e
                 logging.warning(f"Ollama generate failed (attempt {attempt+1}/{self.max_retries+1}): {e}")
-                time.sleep(min(1.5 * (attempt + 1), 5))  # Exponential backoff
+                timed_sleep(min(1.5 * (attempt + 1), 5), "llm_retry_backoff")  # Exponential backoff
                 attempt += 1
 
         raise RuntimeError(f"OllamaLLM failed after {self.max_retries+1} attempts") from last_exc
+
+    def _record_metrics(self, resp, kwargs, purpose, attempt, wall_ms):
+        """
+        Capture Ollama's timing and token counters for one call
+
+        Args:
+            resp: Ollama generate response
+            kwargs: Arguments sent to ollama.generate
+            purpose: Tag describing why the call was made
+            attempt: Attempt number (1-based)
+            wall_ms: Client-side wall time of the call in milliseconds
+        """
+        images = kwargs.get("images", [])
+        payload_bytes = (len(kwargs["prompt"].encode("utf-8")) + len((kwargs.get("system") or "").encode("utf-8"))
+                         + sum(len(img) for img in images))
+
+        record = {
+            "purpose": purpose or "unspecified",
+            "model": self.model,
+            "attempt": attempt,
+            "images": len(images),
+            "payload_bytes": payload_bytes,
+            "prompt_eval_count": resp.get("prompt_eval_count"),
+            "prompt_eval_duration_ms": ns_to_ms(resp.get("prompt_eval_duration")),
+            "eval_count": resp.get("eval_count"),
+            "eval_duration_ms": ns_to_ms(resp.get("eval_duration")),
+            "load_duration_ms": ns_to_ms(resp.get("load_duration")),
+            "total_duration_ms": ns_to_ms(resp.get("total_duration")),
+            "wall_ms": round(wall_ms, 3)
+        }
+        self.last_metrics = record
+        self.metrics.record(record)
+        logging.info(f"LLM metrics: {json.dumps(record)}")
+
+    def _call_generate(self, **kwargs):
+        """
+        Call ollama.generate against the configured host
+
+        The module-level ollama.generate uses a client created at import time, so
+        setting OLLAMA_HOST afterwards has no effect; a dedicated Client (which
+        also applies timeout_s) is used whenever a host is configured.
+
+        Args:
+            **kwargs: Arguments passed through to ollama.generate
+
+        Returns:
+            Ollama generate response
+        """
+        if self.host:
+            if self._client is None:
+                self._client = ollama.Client(host=self.host, timeout=self.timeout_s)
+            return self._client.generate(**kwargs)
+        return ollama.generate(**kwargs)
+
+    def warm_up(self) -> bool:
+        """
+        Load the model into memory so the first real request does not pay the load cost
+
+        Returns:
+            bool: True if the model was loaded successfully
+        """
+        try:
+            start = time.time()
+            # An empty prompt makes Ollama load the model without generating tokens
+            kwargs = {"keep_alive": self.keep_alive} if self.keep_alive is not None else {}
+            self._call_generate(model=self.model, prompt="", **kwargs)
+            logging.info(f"Ollama model '{self.model}' loaded in {time.time() - start:.2f}s")
+            return True
+        except Exception as e:
+            logging.warning(f"Ollama warm-up failed for model '{self.model}': {e}")
+            return False
@@ -52,3 +52,43 @@ def get_step7_analysis_prompt():
         str: The analysis prompt
     """
     return STEP7_ANALYSIS_PROMPT
+
+STEP7_DECISION_PROMPT = """
+You are screening a Hinge dating profile from multiple screenshots. Identify the main person and
+RATE them 1-10 on attractiveness, personality indicators and overall appeal. If the rating is 6 or
+more, the decision is ENGAGE, otherwise NEXT_PROFILE. Do not write a comment.
+
+Respond with ONLY this JSON object, no markdown and no other text:
+{"rating": <integer 1-10>, "reason": "<at most 12 words>", "decision": "ENGAGE or NEXT_PROFILE"}
+"""
+
+COMMENT_PROMPT = """
+You are writing the opening comment on a Hinge dating profile shown in the screenshots.
+{reason_line}Write ONE charming, specific, conversation-starting comment that is slightly humorous or flirty
+and refers to something in this profile. Keep it under {max_length} characters.
+
+Return ONLY the comment text, without quotes, labels or explanations.
+"""
+
+def get_step7_decision_prompt():
+    """
+    Get the short decision-only prompt used in two-phase analysis
+
+    Returns:
+        str: The decision prompt
+    """
+    return STEP7_DECISION_PROMPT
+
+def get_comment_prompt(max_length, reason=None):
+    """
+    Get the comment-writing prompt used in two-phase analysis
+
+    Args:
+        max_length: Maximum comment length in characters
+        reason: Optional reason from the decision phase to focus the comment
+
+    Returns:
+        str: The comment prompt
+    """
+    reason_line = f"What stood out: {reason}\n" if reason else ""
+    return COMMENT_PROMPT.format(reason_line=reason_line, max_length=max_length)
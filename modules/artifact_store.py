@@ -0,0 +1,233 @@
+"""
+Artifact Store Module
+Run-scoped screenshot directories with constant-time rotation and background retention
+"""
+
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+from config import SCREENSHOT_DIR, ARTIFACT_STORE
+from instrumentation import get_instrumentation
+
+# File in the live directory naming the run that writes into it
+RUN_MARKER = ".run"
+
+# Prefix of archived runs that are being deleted (hidden from runs())
+DELETING_PREFIX = ".deleting-"
+
+# Previous-run directory of the old layout, migrated into the archive by rotate()
+LEGACY_LAST_RUN_DIR = "screenshots_from_last_run"
+
+
+def directory_size(path):
+    """
+    Total size in bytes of the files below a directory
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ArtifactStore:
+    """
+    Keeps each run's screenshots in a directory of its own
+
+    The current run captures into live_dir. At startup, rotate() moves the previous
+    run's live directory to runs_dir/<run id> with one rename, whatever the number of
+    files inside, and starts a background thread that deletes archived runs beyond
+    the retention policy (keep_runs newest runs, max_bytes in total).
+    """
+
+    def __init__(self, live_dir=None, runs_dir=None, keep_runs=None, max_bytes=None, run_id=None,
+                 legacy_dir=LEGACY_LAST_RUN_DIR):
+        """
+        Initialize the store
+
+        Args:
+            live_dir: Directory the current run captures into (defaults to SCREENSHOT_DIR)
+            runs_dir: Directory holding archived runs
+            keep_runs: Number of archived runs kept
+            max_bytes: Total size of archived runs kept, None for no limit
+            run_id: Identifier of this run (defaults to the instrumentation run id)
+            legacy_dir: Previous-run directory of the old layout, archived like a run if present
+        """
+        self.live_dir = live_dir or SCREENSHOT_DIR
+        self.runs_dir = runs_dir or ARTIFACT_STORE.get("runs_dir", "screenshot_runs")
+        self.keep_runs = keep_runs if keep_runs is not None else ARTIFACT_STORE.get("keep_runs", 3)
+        self.max_bytes = max_bytes if max_bytes is not None else ARTIFACT_STORE.get("max_bytes")
+        self.run_id = run_id or get_instrumentation().run_id
+        self.legacy_dir = legacy_dir
+        self._prune_thread = None
+
+    @staticmethod
+    def _run_id_of(directory):
+        """
+        Identifier of the run that wrote into a directory
+
+        Read from the run marker, or derived from the directory's modification time
+        for directories written before the marker existed.
+        """
+        try:
+            with open(os.path.join(directory, RUN_MARKER)) as f:
+                run_id = f.read().strip()
+            if run_id:
+                return run_id
+        except OSError:
+            pass
+        return datetime.fromtimestamp(os.path.getmtime(directory)).strftime("%Y%m%d_%H%M%S")
+
+    def _archive(self, directory):
+        """
+        Move a run directory into runs_dir under its run id with one rename
+
+        Returns:
+            str: Archived path
+        """
+        os.makedirs(self.runs_dir, exist_ok=True)
+        run_id = self._run_id_of(directory)
+        archived = os.path.join(self.runs_dir, run_id)
+        suffix = 1
+        while os.path.exists(archived):
+            archived = os.path.join(self.runs_dir, f"{run_id}_{suffix}")
+            suffix += 1
+        os.rename(directory, archived)
+        return archived
+
+    def _has_artifacts(self):
+        """
+        Check whether the live directory holds anything besides the run marker
+
+        Stops at the first entry found, so the cost does not grow with the file count.
+        """
+        if not os.path.isdir(self.live_dir):
+            return False
+        with os.scandir(self.live_dir) as entries:
+            return any(entry.name != RUN_MARKER for entry in entries)
+
+    def rotate(self):
+        """
+        Archive the previous run and prepare an empty live directory for this one
+
+        Returns:
+            str: Path the previous run was archived to, None if there was nothing to
+                 archive, or False if rotation failed
+        """
+        try:
+            # The old layout's previous-run directory expires with the other archived runs
+            if self.legacy_dir and os.path.isdir(self.legacy_dir):
+                migrated = self._archive(self.legacy_dir)
+                logging.info(f"Moved {self.legacy_dir} into the run archive as {migrated}")
+
+            archived = None
+            if self._has_artifacts():
+                archived = self._archive(self.live_dir)
+                logging.info(f"Archived previous run's screenshots to {archived}")
+
+            os.makedirs(self.live_dir, exist_ok=True)
+            with open(os.path.join(self.live_dir, RUN_MARKER), 'w') as f:
+                f.write(self.run_id)
+
+            self.start_pruning()
+            return archived
+
+        except OSError as e:
+            logging.error(f"Error rotating screenshot directories: {e}")
+            return False
+
+    def runs(self):
+        """
+        Archived run directories, newest first
+
+        Returns:
+            list: Run directory names (run ids sort chronologically)
+        """
+        if not os.path.isdir(self.runs_dir):
+            return []
+        with os.scandir(self.runs_dir) as entries:
+            names = [entry.name for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+        return sorted(names, reverse=True)
+
+    def prune(self):
+        """
+        Delete archived runs beyond the retention policy
+
+        Runs are kept newest first while both keep_runs and max_bytes hold; the first
+        run that breaks either limit and every older run expire. Each expired run is
+        renamed out of the run list and then deleted, so an interrupted deletion is
+        finished by the next prune.
+
+        Returns:
+            list: Names of the deleted runs
+        """
+        runs = self.runs()
+        kept = min(len(runs), self.keep_runs)
+        if self.max_bytes is not None:
+            total_bytes = 0
+            for index in range(kept):
+                total_bytes += directory_size(os.path.join(self.runs_dir, runs[index]))
+                if total_bytes > self.max_bytes:
+                    kept = index
+                    break
+        expired = runs[kept:]
+
+        for name in expired:
+            try:
+                os.rename(os.path.join(self.runs_dir, name), os.path.join(self.runs_dir, DELETING_PREFIX + name))
+            except OSError as e:
+                logging.error(f"Error expiring screenshot run {name}: {e}")
+
+        if os.path.isdir(self.runs_dir):
+            with os.scandir(self.runs_dir) as entries:
+                doomed = [entry.path for entry in entries if entry.name.startswith(DELETING_PREFIX)]
+            for path in doomed:
+                shutil.rmtree(path, ignore_errors=True)
+
+        if expired:
+            logging.info(f"Deleted {len(expired)} expired screenshot run(s): {', '.join(expired)}")
+        return expired
+
+    def start_pruning(self):
+        """
+        Run prune() on a background thread
+
+        Returns:
+            threading.Thread: The pruning thread
+        """
+        self._prune_thread = threading.Thread(target=self.prune, name="artifact-prune", daemon=True)
+        self._prune_thread.start()
+        return self._prune_thread
+
+    def wait(self, timeout=None):
+        """
+        Wait for background pruning to finish
+
+        Returns:
+            bool: True if no pruning is running any more
+        """
+        if self._prune_thread:
+            self._prune_thread.join(timeout)
+            return not self._prune_thread.is_alive()
+        return True
+
+
+# Global instance for easy access
+_artifact_store = None
+
+def get_artifact_store():
+    """
+    Get the global artifact store instance
+
+    Returns:
+        ArtifactStore instance
+    """
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore()
+    return _artifact_store
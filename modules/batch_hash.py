@@ -0,0 +1,135 @@
+"""
+Batch Hash Module
+Vectorised perceptual hashing and Hamming distances for stacks of frames
+"""
+
+import logging
+from screenshot_writer import load_image
+
+try:
+    import numpy as np
+    from PIL import Image
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy or PIL not available. Batch hashing will be disabled.")
+
+
+# Same geometry as imagehash.phash: a 32x32 thumbnail, the top-left 8x8 DCT coefficients
+HASH_SIZE = 8
+THUMBNAIL_SIZE = 32
+
+# Frames whose thumbnails are transformed by one batched DCT
+CHUNK_SIZE = 256
+
+# Number of set bits in every byte value, for vectorised popcount
+if NUMPY_AVAILABLE:
+    POPCOUNT_TABLE = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def dct_matrix(size):
+    """
+    Unnormalised DCT-II matrix, matching scipy.fftpack.dct's default
+
+    Args:
+        size: Number of samples
+
+    Returns:
+        float32 array of shape (size, size); matrix @ x is the DCT of x
+    """
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    return (2 * np.cos(np.pi * k * (2 * n + 1) / (2 * size))).astype(np.float32)
+
+def thumbnails(frames):
+    """
+    Grayscale 32x32 thumbnails of frames, stacked into one array
+
+    Each frame is downsampled by PIL's LANCZOS filter exactly as imagehash.phash does.
+    PIL only evaluates the filter's nonzero taps, which on full-size frames is faster
+    than a dense resampling matrix multiply over the whole stack.
+
+    Args:
+        frames: uint8 grayscale array of shape (frames, height, width), or a list
+                of PIL images / image paths
+
+    Returns:
+        float32 array of shape (frames, 32, 32)
+    """
+    stack = np.empty((len(frames), THUMBNAIL_SIZE, THUMBNAIL_SIZE), dtype=np.float32)
+    for index, frame in enumerate(frames):
+        if isinstance(frame, np.ndarray):
+            image = Image.fromarray(frame)
+        else:
+            image = (load_image(frame) if isinstance(frame, str) else frame).convert("L")
+        stack[index] = np.asarray(image.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.LANCZOS))
+    return stack
+
+def phash_batch(frames, chunk_size=CHUNK_SIZE):
+    """
+    Perceptual hashes of many frames at once
+
+    The DCT of every thumbnail is one batched matrix multiply (only the 8x8
+    low-frequency block is computed), followed by one median and one bit-pack over
+    the whole batch.
+
+    Args:
+        frames: uint8 grayscale array of shape (frames, height, width), or a list
+                of PIL images / image paths (sizes may differ)
+        chunk_size: Frames per batched DCT, bounding the thumbnail array
+
+    Returns:
+        uint64 array of 64-bit hashes in input order, equal to int(str(imagehash.phash(frame)), 16)
+    """
+    hashes = np.zeros(len(frames), dtype=np.uint64)
+    dct = dct_matrix(THUMBNAIL_SIZE)[:HASH_SIZE]
+    for start in range(0, len(frames), chunk_size):
+        chunk = frames[start:start + chunk_size]
+        low_frequencies = (dct @ thumbnails(chunk) @ dct.T).reshape(len(chunk), HASH_SIZE * HASH_SIZE)
+        bits = low_frequencies > np.median(low_frequencies, axis=1, keepdims=True)
+        hashes[start:start + len(chunk)] = np.packbits(bits, axis=1).view(">u8").ravel()
+    return hashes
+
+def popcount(values):
+    """
+    Number of set bits in each element of a uint64 array
+
+    Args:
+        values: uint64 array of any shape
+
+    Returns:
+        uint8 array of the same shape
+    """
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return POPCOUNT_TABLE[values.view(np.uint8)].reshape(values.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+def hamming_distances(hashes, query):
+    """
+    Hamming distance from one 64-bit hash to each hash in an array
+
+    Args:
+        hashes: uint64 array
+        query: int hash
+
+    Returns:
+        uint8 array of distances
+    """
+    return popcount(np.bitwise_xor(hashes, np.uint64(query)))
+
+def pairwise_distances(hashes, block_size=1024):
+    """
+    Hamming distances between all pairs of hashes
+
+    Args:
+        hashes: uint64 array of n hashes
+        block_size: Rows computed per step, bounding the temporary XOR array
+
+    Returns:
+        uint8 array of shape (n, n)
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    distances = np.empty((len(hashes), len(hashes)), dtype=np.uint8)
+    for start in range(0, len(hashes), block_size):
+        block = hashes[start:start + block_size]
+        distances[start:start + len(block)] = popcount(np.bitwise_xor(block[:, None], hashes[None, :]))
+    return distances
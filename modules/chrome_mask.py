@@ -0,0 +1,204 @@
+"""
+Chrome Mask Module
+Learns the static UI rows (status bar, top bar, bottom buttons) per window geometry and crops them out
+"""
+
+import io
+import logging
+from collections import deque
+from config import CHROME_MASK
+from screenshot_writer import load_image, image_file_bytes
+
+try:
+    import numpy as np
+    from PIL import Image
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy or PIL not available. Chrome masking will be disabled.")
+
+
+# Grayscale difference (0-255) above which a pixel counts as changed
+PIXEL_TOLERANCE = 8
+
+
+def geometry_key(size):
+    """
+    Config key for an image size, e.g. (1080, 1920) -> "1080x1920"
+    """
+    return f"{size[0]}x{size[1]}"
+
+
+class ChromeMask:
+    """
+    Rows at the top and bottom of the screen that never change while a profile scrolls
+
+    Masks are kept per frame size. A configured override wins; otherwise the mask is
+    learned from each scrolled profile as the leading and trailing rows that stay
+    constant across all of its frames. A row is constant when only a small fraction
+    of its pixels change, so a ticking status-bar clock does not break it. The mask
+    in use is the median of the last few profiles, so one unusual profile cannot
+    move it far in either direction.
+    """
+
+    def __init__(self, enabled=None, learn=None, changed_fraction=None, history=None, overrides=None):
+        """
+        Initialize the mask registry
+
+        Args:
+            enabled: Apply masks at all
+            learn: Learn masks from profile frames
+            changed_fraction: Largest fraction of changed pixels for a row to count as constant
+            history: Number of recent profiles the learned mask is the median of
+            overrides: Dict of "WxH" -> {"top": rows, "bottom": rows}
+        """
+        self.enabled = enabled if enabled is not None else CHROME_MASK.get("enabled", True)
+        self.learn_enabled = learn if learn is not None else CHROME_MASK.get("learn", True)
+        self.changed_fraction = (changed_fraction if changed_fraction is not None
+                                 else CHROME_MASK.get("changed_fraction", 0.05))
+        self.history = history or CHROME_MASK.get("history", 5)
+        self.overrides = overrides if overrides is not None else CHROME_MASK.get("overrides", {})
+        self.observations = {}
+        self.learned = {}
+
+    def get(self, size):
+        """
+        Get the mask for a frame size
+
+        Args:
+            size: (width, height) of the frame
+
+        Returns:
+            tuple: (top_rows, bottom_rows), or None if no mask is known
+        """
+        if not self.enabled:
+            return None
+        override = self.overrides.get(geometry_key(size))
+        if override:
+            return override.get("top", 0), override.get("bottom", 0)
+        return self.learned.get(tuple(size))
+
+    def learn(self, frames):
+        """
+        Learn the static rows from the frames of one scrolled profile
+
+        Args:
+            frames: List of PIL images or image paths of one profile, in scroll order
+
+        Returns:
+            tuple: (top_rows, bottom_rows) now stored for the frame size, or None if
+                   the frames could not be used
+        """
+        if not (self.enabled and self.learn_enabled and NUMPY_AVAILABLE) or len(frames) < 2:
+            return None
+
+        try:
+            images = [load_image(frame) if isinstance(frame, str) else frame for frame in frames]
+            size = images[0].size
+            if any(image.size != size for image in images):
+                return None
+
+            gray = [np.asarray(image.convert("L"), dtype=np.int16) for image in images]
+            static = np.ones(size[1], dtype=bool)
+            for previous, current in zip(gray, gray[1:]):
+                changed = np.abs(previous - current) > PIXEL_TOLERANCE
+                static &= changed.mean(axis=1) <= self.changed_fraction
+
+            # Frames that never moved say nothing about where the chrome ends
+            if static.all():
+                return None
+
+            observations = self.observations.setdefault(size, deque(maxlen=self.history))
+            observations.append((int(np.argmin(static)), int(np.argmin(static[::-1]))))
+            top = sorted(o[0] for o in observations)[(len(observations) - 1) // 2]
+            bottom = sorted(o[1] for o in observations)[(len(observations) - 1) // 2]
+
+            known = self.learned.get(size)
+            if known != (top, bottom):
+                logging.info(f"Chrome mask for {geometry_key(size)}: top {top} rows, bottom {bottom} rows")
+            self.learned[size] = (top, bottom)
+            return top, bottom
+
+        except Exception as e:
+            logging.warning(f"Could not learn chrome mask: {e}")
+            return None
+
+    def apply(self, image):
+        """
+        Crop the chrome rows off an image
+
+        Args:
+            image: PIL image
+
+        Returns:
+            PIL image without the masked rows (the image itself if no mask is known)
+        """
+        mask = self.get(image.size)
+        if not mask or not any(mask):
+            return image
+        top, bottom = mask
+        if top + bottom >= image.size[1]:
+            return image
+        return image.crop((0, top, image.size[0], image.size[1] - bottom))
+
+    def image_bytes(self, path):
+        """
+        Read an image file for an LLM request, cropped when a mask is known
+
+        Without chrome rows for the frame's size the saved bytes are sent unchanged
+        (once the screenshot writer has written them), so no PNG is encoded per call.
+        Only a cropped frame, or one saved as WebP or a raw array, is encoded here.
+
+        Args:
+            path: Image file path
+
+        Returns:
+            bytes: PNG data of the cropped image, or the file contents unchanged
+        """
+        masked = self.enabled and NUMPY_AVAILABLE and (self.learned or self.overrides)
+        convert = path.endswith((".npy", ".webp"))
+        if masked or convert:
+            try:
+                # The size is read without decoding, so frames without chrome rows stay cheap
+                image = load_image(path)
+                cropped = self.apply(image)
+                if cropped is not image or convert:
+                    buffer = io.BytesIO()
+                    cropped.save(buffer, format="PNG", compress_level=1)
+                    return buffer.getvalue()
+            except (OSError, ValueError):
+                # Not a readable image: send the file as it is
+                pass
+
+        return image_file_bytes(path)
+
+
+# Global instance for easy access
+_chrome_mask = None
+
+def get_chrome_mask():
+    """
+    Get the global chrome mask registry
+
+    Returns:
+        ChromeMask instance
+    """
+    global _chrome_mask
+    if _chrome_mask is None:
+        _chrome_mask = ChromeMask()
+    return _chrome_mask
+
+def set_chrome_mask(chrome_mask):
+    """
+    Replace the global chrome mask registry (e.g. for replay runs)
+
+    Args:
+        chrome_mask: ChromeMask instance to use from now on, or None to create a
+            fresh registry on next use
+
+    Returns:
+        The previous ChromeMask instance, or None
+    """
+    global _chrome_mask
+    previous, _chrome_mask = _chrome_mask, chrome_mask
+    return previous
@@ -5,16 +5,71 @@ Handles witty comment creation and posting for Step 7
 
 import logging
 import time
-from typing import Dict, Any
-from config import MAX_COMMENT_LENGTH
-from modules.ai.ai_manager import get_llm
+from typing import Dict, Any, List, Optional
+from config import MAX_COMMENT_LENGTH, TWO_PHASE_ANALYSIS
+from ai.ai_manager import get_llm
+from ai.prompts import get_comment_prompt
+from instrumentation import timed
 
 class CommentGenerator:
     def __init__(self, llm=None, interaction_handler=None):
         self.api_key = None  # For LLM API if used
-        self.llm = llm or get_llm()
+        self.llm = llm or get_llm("full_analysis")
         self.interaction_handler = interaction_handler
 
+    @timed("comment_generation")
+    def generate_comment(self, screenshots: List[str], reason: Optional[str] = None) -> Optional[str]:
+        """
+        Generate a comment for a profile with the LLM
+
+        Args:
+            screenshots: List of screenshot file paths
+            reason: Optional reason from the decision phase to focus the comment
+
+        Returns:
+            str: A comment that passed validate_comment, or None if none did
+        """
+        prompt = get_comment_prompt(MAX_COMMENT_LENGTH, reason)
+
+        for attempt in range(TWO_PHASE_ANALYSIS.get("comment_attempts", 2)):
+            try:
+                response = self.llm.generate(
+                    prompt=prompt,
+                    images=screenshots,
+                    options=TWO_PHASE_ANALYSIS.get("comment_options"),
+                    purpose="comment"
+                )
+            except Exception as e:
+                logging.error(f"Comment generation failed: {e}")
+                return None
+
+            comment = self._clean_comment(response)
+            logging.info(f"Generated comment (attempt {attempt + 1}): {comment}")
+            if self.validate_comment(comment):
+                return comment
+            logging.warning(f"Generated comment failed validation: {comment}")
+
+        return None
+
+    def _clean_comment(self, response: str) -> str:
+        """
+        Reduce an LLM response to the bare comment text
+
+        Args:
+            response: Raw LLM response
+
+        Returns:
+            str: First non-empty line without surrounding quotes or a 'Comment:' label
+        """
+        lines = [line.strip() for line in (response or "").strip().splitlines() if line.strip()]
+        if not lines:
+            return ""
+
+        comment = lines[0]
+        if comment.lower().startswith("comment:"):
+            comment = comment[len("comment:"):].strip()
+        return comment.strip('"\'').strip()
+
     def validate_comment(self, comment: str) -> bool:
         """
         Validate comment length and content
@@ -36,4 +91,3 @@ class CommentGenerator:
             return False
 
         return True
-
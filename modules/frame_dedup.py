@@ -0,0 +1,195 @@
+"""
+Frame Dedup Module
+Clusters a profile's near-duplicate frames with a BK-tree so each image is analysed once
+"""
+
+import logging
+from config import FRAME_DEDUP
+from instrumentation import timed
+from chrome_mask import get_chrome_mask
+from batch_hash import NUMPY_AVAILABLE, phash_batch
+from screenshot_writer import load_image
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+    from PIL import Image
+
+
+# Downscale factor of the thumbnails compared to confirm a hash match
+CONFIRM_SCALE = 4
+
+
+def hamming_distance(hash1, hash2):
+    """
+    Number of differing bits between two integer hashes
+    """
+    return bin(hash1 ^ hash2).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes with Hamming distance
+
+    Each child edge is labelled with its distance to the parent, so a radius search
+    only descends into edges within [d - radius, d + radius] of the query's distance
+    to the node (triangle inequality) instead of comparing against every hash.
+    """
+
+    def __init__(self):
+        # Node: [hash, item, {distance: child node}]
+        self.root = None
+        self.size = 0
+
+    def add(self, hash_value, item):
+        """
+        Insert a hash with its associated item
+        """
+        self.size += 1
+        if self.root is None:
+            self.root = [hash_value, item, {}]
+            return
+
+        node = self.root
+        while True:
+            distance = hamming_distance(hash_value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [hash_value, item, {}]
+                return
+            node = child
+
+    def search(self, hash_value, radius):
+        """
+        Find all items whose hash is within radius of the query
+
+        Returns:
+            list of (distance, item) sorted by distance
+        """
+        matches = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(hash_value, node[0])
+            if distance <= radius:
+                matches.append((distance, node[1]))
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(matches, key=lambda match: match[0])
+
+    def __len__(self):
+        return self.size
+
+
+class FrameDeduplicator:
+    """
+    Keeps one representative per cluster of perceptually similar frames
+
+    Frames are hashed (perceptual hash, with the static UI chrome cropped off) in
+    capture order. A frame within max_distance of an earlier representative joins
+    that cluster; otherwise it starts a new cluster and becomes its representative.
+
+    A 64-bit phash barely sees text, so two prompt cards of the same template with
+    different answers can hash within max_distance. Every hash match is therefore
+    confirmed on quarter-size grayscale thumbnails, where a changed line of text
+    still differs by far more than confirm_tolerance.
+    """
+
+    def __init__(self, max_distance=None, confirm_tolerance=None):
+        """
+        Initialize the deduplicator
+
+        Args:
+            max_distance: Largest Hamming distance between 64-bit phashes treated as a duplicate
+            confirm_tolerance: Largest grayscale difference (0-255) between the thumbnails
+                of a confirmed duplicate
+        """
+        self.max_distance = max_distance if max_distance is not None else FRAME_DEDUP.get("max_distance", 4)
+        self.confirm_tolerance = (confirm_tolerance if confirm_tolerance is not None
+                                  else FRAME_DEDUP.get("confirm_tolerance", 32))
+
+    def _same_content(self, image1, image2):
+        """
+        Confirm a hash match by comparing downscaled grayscale pixels
+
+        Args:
+            image1, image2: Chrome-cropped PIL images
+
+        Returns:
+            bool: True if no thumbnail pixel differs by more than confirm_tolerance
+        """
+        if image1.size != image2.size:
+            return False
+        size = (max(1, image1.width // CONFIRM_SCALE), max(1, image1.height // CONFIRM_SCALE))
+        thumb1 = np.asarray(image1.convert("L").resize(size, Image.BOX), dtype=np.int16)
+        thumb2 = np.asarray(image2.convert("L").resize(size, Image.BOX), dtype=np.int16)
+        return int(np.abs(thumb1 - thumb2).max()) <= self.confirm_tolerance
+
+    @timed("frame_dedup")
+    def deduplicate(self, frames):
+        """
+        Drop near-duplicate frames
+
+        Args:
+            frames: List of image paths (or PIL images) in capture order
+
+        Returns:
+            tuple: (kept, clusters) where kept lists the representatives in capture
+                   order and clusters maps each representative to its duplicates
+        """
+        if not NUMPY_AVAILABLE or len(frames) < 2:
+            return list(frames), {}
+
+        # Hash every readable frame in one batch; unreadable frames are kept as they are
+        chrome_mask = get_chrome_mask()
+        images = {}
+        for index, frame in enumerate(frames):
+            try:
+                image = load_image(frame) if isinstance(frame, str) else frame
+                image.load()
+                images[index] = chrome_mask.apply(image)
+            except Exception as e:
+                logging.warning(f"Could not hash frame {frame}: {e}")
+        hashes = dict(zip(images, (int(value) for value in phash_batch(list(images.values())))))
+
+        tree = BKTree()
+        kept = []
+        clusters = {}
+        for index, frame in enumerate(frames):
+            if index not in hashes:
+                kept.append(frame)
+                continue
+
+            matches = tree.search(hashes[index], self.max_distance)
+            match = next(((distance, rep) for distance, rep in matches
+                          if self._same_content(images[rep], images[index])), None)
+            if match:
+                representative = frames[match[1]]
+                clusters[representative].append(frame)
+                logging.info(f"Frame {frame} duplicates {representative} (distance {match[0]})")
+            else:
+                if matches:
+                    logging.debug(f"Frame {frame} hashes close to an earlier frame but its content differs")
+                tree.add(hashes[index], index)
+                kept.append(frame)
+                clusters[frame] = []
+
+        if len(kept) < len(frames):
+            logging.info(f"Frame dedup kept {len(kept)} of {len(frames)} frames")
+        return kept, {rep: dups for rep, dups in clusters.items() if dups}
+
+
+# Global instance for easy access
+_frame_deduplicator = None
+
+def get_frame_deduplicator():
+    """
+    Get the global frame deduplicator instance
+
+    Returns:
+        FrameDeduplicator instance
+    """
+    global _frame_deduplicator
+    if _frame_deduplicator is None:
+        _frame_deduplicator = FrameDeduplicator()
+    return _frame_deduplicator
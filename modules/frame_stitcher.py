@@ -0,0 +1,241 @@
+"""
+Frame Stitcher Module
+Joins overlapping profile screenshots into one composite and re-slices it into model-sized tiles
+"""
+
+import logging
+import os
+from config import STITCHING
+from instrumentation import timed
+from screenshot_writer import load_image
+
+try:
+    import numpy as np
+    from PIL import Image
+    STITCHING_AVAILABLE = True
+except ImportError:
+    STITCHING_AVAILABLE = False
+    logging.warning("numpy or PIL not available. Frame stitching will be disabled.")
+
+
+class FrameStitcher:
+    """
+    Stitches consecutive scroll frames into a single tall profile image
+
+    Every frame is reduced to a row profile: the mean grayscale of a few vertical
+    column bands for each row. The scroll offset between two frames is the shift
+    that minimises the mean squared difference of their overlapping profiles,
+    evaluated for every shift at once with an FFT cross-correlation. Rows that stay
+    identical at the top and bottom of all frames (status bar, header, action bar)
+    are treated as static chrome: the header is kept once and the footer dropped.
+    """
+
+    def __init__(self, tile_size=None, bands=None, min_overlap=None, max_error=None,
+                 static_tolerance=None, keep_footer=None):
+        """
+        Initialize the stitcher
+
+        Args:
+            tile_size: Model input size in pixels; tiles are tile_size wide and at most tile_size tall
+            bands: Number of column bands in each row profile
+            min_overlap: Minimum overlap between frames as a fraction of the content height
+            max_error: Largest mean squared profile difference accepted as a match
+            static_tolerance: Mean absolute difference (0-255) below which a row counts as static
+            keep_footer: Keep the static footer once at the bottom of the composite
+        """
+        self.tile_size = tile_size or STITCHING.get("tile_size", 896)
+        self.bands = bands or STITCHING.get("bands", 16)
+        self.min_overlap = min_overlap if min_overlap is not None else STITCHING.get("min_overlap", 0.05)
+        self.max_error = max_error if max_error is not None else STITCHING.get("max_error", 25.0)
+        self.static_tolerance = (static_tolerance if static_tolerance is not None
+                                 else STITCHING.get("static_tolerance", 1.0))
+        self.keep_footer = keep_footer if keep_footer is not None else STITCHING.get("keep_footer", False)
+
+    def row_profile(self, pixels):
+        """
+        Reduce an RGB frame to per-row band means
+
+        Args:
+            pixels: uint8 array of shape (height, width, 3)
+
+        Returns:
+            float64 array of shape (height, bands)
+        """
+        gray = pixels.astype(np.float32).mean(axis=2)
+        bands = np.array_split(gray, min(self.bands, gray.shape[1]), axis=1)
+        return np.stack([band.mean(axis=1) for band in bands], axis=1).astype(np.float64)
+
+    def find_static_rows(self, frames):
+        """
+        Count the rows at the top and bottom that never change between frames
+
+        Args:
+            frames: List of uint8 arrays of equal shape
+
+        Returns:
+            tuple: (header_rows, footer_rows)
+        """
+        height = frames[0].shape[0]
+        if len(frames) < 2:
+            return 0, 0
+
+        static = np.ones(height, dtype=bool)
+        for previous, current in zip(frames, frames[1:]):
+            diff = np.abs(previous.astype(np.int16) - current.astype(np.int16)).mean(axis=(1, 2))
+            static &= diff <= self.static_tolerance
+
+        # Identical frames (end of profile) would make every row static
+        if static.all():
+            return 0, 0
+
+        header = int(np.argmin(static))
+        footer = int(np.argmin(static[::-1]))
+        return header, footer
+
+    def estimate_offset(self, previous, current):
+        """
+        Estimate how many rows the content moved up between two profiles
+
+        Args:
+            previous: Row profile of the earlier frame, shape (rows, bands)
+            current: Row profile of the later frame, same shape
+
+        Returns:
+            tuple: (offset, error) where offset is None if no overlap matched
+        """
+        rows = previous.shape[0]
+        max_offset = rows - max(int(rows * self.min_overlap), 1)
+        if max_offset < 0:
+            return None, None
+
+        # SSD(d) = sum(prev[d:]^2) + sum(cur[:rows-d]^2) - 2 * sum(prev[d+i] * cur[i])
+        size = 1 << (2 * rows - 1).bit_length()
+        cross = np.fft.irfft(np.fft.rfft(previous, size, axis=0) * np.conj(np.fft.rfft(current, size, axis=0)),
+                             size, axis=0).sum(axis=1)[:rows]
+        previous_sq = np.cumsum((previous ** 2).sum(axis=1)[::-1])[::-1]
+        current_sq = np.cumsum((current ** 2).sum(axis=1))[::-1]
+        overlap = np.arange(rows, 0, -1)
+        error = (previous_sq + current_sq - 2 * cross) / (overlap * previous.shape[1])
+
+        # Ties go to the larger offset, which duplicates rows rather than dropping them
+        candidates = error[:max_offset + 1][::-1]
+        offset = max_offset - int(np.argmin(candidates))
+        best = float(max(error[offset], 0.0))
+        if best > self.max_error:
+            return None, best
+        return offset, best
+
+    @timed("stitching")
+    def stitch(self, frames):
+        """
+        Stitch scroll frames into one composite image
+
+        Args:
+            frames: List of PIL images or image paths, in scroll order
+
+        Returns:
+            dict: composite (PIL image), offsets (rows appended per frame after the first,
+                  None where no overlap matched), errors, header_rows, footer_rows
+        """
+        images = [load_image(frame) if isinstance(frame, str) else frame for frame in frames]
+        pixels = [np.asarray(image.convert("RGB")) for image in images]
+        if any(p.shape != pixels[0].shape for p in pixels):
+            raise ValueError("All frames must have the same size to be stitched")
+
+        header, footer = self.find_static_rows(pixels)
+        height = pixels[0].shape[0]
+        content = [p[header:height - footer] for p in pixels]
+
+        parts = [pixels[0][:header], content[0]]
+        offsets, errors = [], []
+        previous_profile = self.row_profile(content[0])
+        for frame in content[1:]:
+            profile = self.row_profile(frame)
+            offset, error = self.estimate_offset(previous_profile, profile)
+            offsets.append(offset)
+            errors.append(error)
+            if offset is None:
+                # No reliable overlap: keep the whole frame rather than risk losing content
+                parts.append(frame)
+            elif offset > 0:
+                parts.append(frame[frame.shape[0] - offset:])
+            previous_profile = profile
+
+        if self.keep_footer and footer:
+            parts.append(pixels[0][height - footer:])
+
+        composite = Image.fromarray(np.concatenate(parts, axis=0))
+        logging.info(f"Stitched {len(frames)} frames into {composite.size[0]}x{composite.size[1]} "
+                     f"(header {header}, footer {footer}, offsets {offsets})")
+        return {
+            'composite': composite,
+            'offsets': offsets,
+            'errors': errors,
+            'header_rows': header,
+            'footer_rows': footer
+        }
+
+    def tile(self, composite):
+        """
+        Scale a composite to the model input width and cut it into non-overlapping tiles
+
+        Args:
+            composite: PIL image
+
+        Returns:
+            list of PIL images, each tile_size wide and at most tile_size tall
+        """
+        width, height = composite.size
+        scaled_height = max(round(height * self.tile_size / width), 1)
+        scaled = composite.resize((self.tile_size, scaled_height), Image.LANCZOS)
+        return [scaled.crop((0, top, self.tile_size, min(top + self.tile_size, scaled_height)))
+                for top in range(0, scaled_height, self.tile_size)]
+
+    def stitch_to_tiles(self, screenshots, output_dir=None, prefix="profile"):
+        """
+        Stitch profile screenshots and save the tiles for analysis
+
+        Args:
+            screenshots: List of screenshot paths in scroll order
+            output_dir: Directory for the tiles (defaults to the screenshots' directory)
+            prefix: File name prefix for the composite and tiles
+
+        Returns:
+            list: Tile paths, or the original screenshots if stitching is unavailable or fails
+        """
+        if not STITCHING_AVAILABLE or len(screenshots) < 2:
+            return screenshots
+
+        try:
+            result = self.stitch(screenshots)
+            output_dir = output_dir or os.path.dirname(screenshots[0]) or "."
+            if STITCHING.get("save_composite", False):
+                result['composite'].save(os.path.join(output_dir, f"{prefix}_composite.png"))
+
+            tiles = []
+            for index, tile in enumerate(self.tile(result['composite']), 1):
+                path = os.path.join(output_dir, f"{prefix}_tile_{index:02d}.png")
+                tile.save(path)
+                tiles.append(path)
+
+            logging.info(f"Replaced {len(screenshots)} screenshots with {len(tiles)} tiles for analysis")
+            return tiles
+        except Exception as e:
+            logging.error(f"Frame stitching failed, analysing raw screenshots: {e}")
+            return screenshots
+
+
+# Global instance for easy access
+_frame_stitcher = None
+
+def get_frame_stitcher():
+    """
+    Get the global frame stitcher instance
+
+    Returns:
+        FrameStitcher instance
+    """
+    global _frame_stitcher
+    if _frame_stitcher is None:
+        _frame_stitcher = FrameStitcher()
+    return _frame_stitcher
@@ -0,0 +1,282 @@
+"""
+Instrumentation Module
+Lightweight latency spans per profile and stage with JSONL export
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from config import INSTRUMENTATION, LOG_DIR
+
+
+def percentile(values, pct):
+    """
+    Compute a percentile with linear interpolation
+
+    Args:
+        values: List of numbers
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class Instrumentation:
+    """
+    Records wall time of named stages, grouped per profile
+
+    Stages are recorded with span() / timed() and accumulate into the profile that
+    is currently open. Spans may nest (e.g. an "ocr" span inside "posting"), so
+    stage totals are not additive. Each finished profile is appended as one JSON
+    line, and finish() appends a p50/p95 summary record at the end of the run.
+    """
+
+    def __init__(self, enabled=None, output_dir=None, run_id=None):
+        """
+        Initialize instrumentation
+
+        Args:
+            enabled: Whether spans are recorded (defaults to INSTRUMENTATION config)
+            output_dir: Directory for the JSONL file (defaults to LOG_DIR)
+            run_id: Identifier of this run (defaults to a timestamp)
+        """
+        self.enabled = INSTRUMENTATION.get("enabled", True) if enabled is None else enabled
+        self.output_dir = output_dir or INSTRUMENTATION.get("output_dir") or LOG_DIR
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.output_path = os.path.join(self.output_dir, f"profile_timings_{self.run_id}.jsonl")
+
+        self.current_profile = None
+        self.profile_records = []
+        self.stage_samples = {}
+        self.listeners = []
+        # Multiplier applied to sleep() durations (replay runs use 0 to skip waits)
+        self.sleep_scale = 1.0
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """
+        Register a callback notified of every finished span
+
+        Args:
+            listener: Callable invoked as listener(stage, start, duration, args) in the
+                      thread that ran the span; start is a time.perf_counter() value
+        """
+        self.listeners.append(listener)
+
+    def begin_profile(self, profile_number):
+        """
+        Start collecting stages for a new profile (closes any profile left open)
+
+        Args:
+            profile_number: Sequence number of the profile in this run
+        """
+        if self.current_profile is not None:
+            self.end_profile(outcome="incomplete")
+
+        with self._lock:
+            self.current_profile = {
+                'profile': profile_number,
+                'started_at': time.time(),
+                'stages': {}
+            }
+
+    def record(self, stage, duration):
+        """
+        Record one sample of a stage
+
+        Args:
+            stage: Stage name (e.g. "capture", "sleep.scroll_wait")
+            duration: Wall time in seconds
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.stage_samples.setdefault(stage, []).append(duration)
+            if self.current_profile is not None:
+                stats = self.current_profile['stages'].setdefault(stage, {'total_s': 0.0, 'count': 0})
+                stats['total_s'] += duration
+                stats['count'] += 1
+
+    @contextmanager
+    def span(self, stage, **args):
+        """
+        Context manager measuring the wall time of a block
+
+        Args:
+            stage: Stage name
+            **args: Extra details passed to listeners (e.g. model, image count)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.record(stage, duration)
+            for listener in self.listeners:
+                try:
+                    listener(stage, start, duration, args)
+                except Exception as e:
+                    logging.debug(f"Span listener failed for '{stage}': {e}")
+
+    def sleep(self, seconds, reason):
+        """
+        Sleep and record the wait as a "sleep.<reason>" stage
+
+        Args:
+            seconds: Time to sleep
+            reason: Short name of what is being waited for
+        """
+        with self.span(f"sleep.{reason}", requested_s=seconds):
+            time.sleep(seconds * self.sleep_scale)
+
+    def end_profile(self, **fields):
+        """
+        Close the current profile and append its record to the JSONL file
+
+        Args:
+            **fields: Extra fields stored on the record (e.g. outcome, rating)
+
+        Returns:
+            dict: The profile record, or None if no profile was open
+        """
+        with self._lock:
+            profile = self.current_profile
+            self.current_profile = None
+
+        if profile is None:
+            return None
+
+        total = time.time() - profile['started_at']
+        record = {
+            'type': 'profile',
+            'run_id': self.run_id,
+            'profile': profile['profile'],
+            'started_at': datetime.fromtimestamp(profile['started_at']).isoformat(),
+            'total_s': round(total, 4),
+            'stages': {name: {'total_s': round(stats['total_s'], 4), 'count': stats['count']}
+                       for name, stats in profile['stages'].items()},
+            **fields
+        }
+        self.profile_records.append(record)
+        self.stage_samples.setdefault('profile_total', []).append(total)
+
+        if self.enabled:
+            self._write(record)
+            logging.info(f"Profile #{record['profile']} took {total:.2f}s")
+        return record
+
+    def summary(self):
+        """
+        Summarise all recorded samples
+
+        Returns:
+            dict: Stage name -> count, total, p50 and p95 in seconds
+        """
+        with self._lock:
+            samples = {stage: list(values) for stage, values in self.stage_samples.items()}
+
+        return {
+            stage: {
+                'count': len(values),
+                'total_s': round(sum(values), 4),
+                'p50_s': round(percentile(values, 50), 4),
+                'p95_s': round(percentile(values, 95), 4)
+            }
+            for stage, values in sorted(samples.items())
+        }
+
+    def finish(self):
+        """
+        Close any open profile, append the run summary and log it
+
+        Returns:
+            dict: The run summary
+        """
+        if self.current_profile is not None:
+            self.end_profile(outcome="incomplete")
+
+        summary = self.summary()
+        if self.enabled:
+            self._write({'type': 'summary', 'run_id': self.run_id,
+                         'profiles': len(self.profile_records), 'stages': summary})
+            logging.info(f"Stage latency summary ({len(self.profile_records)} profiles):")
+            for stage, stats in summary.items():
+                logging.info(f"  {stage:<28} n={stats['count']:<4} p50={stats['p50_s']:.3f}s "
+                             f"p95={stats['p95_s']:.3f}s total={stats['total_s']:.2f}s")
+            logging.info(f"Timing records written to: {self.output_path}")
+        return summary
+
+    def _write(self, record):
+        """
+        Append one JSON record to the output file
+        """
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.output_path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logging.warning(f"Could not write timing record: {e}")
+
+
+# Global instance for easy access
+_instrumentation = None
+
+def get_instrumentation():
+    """
+    Get the global instrumentation instance
+
+    Returns:
+        Instrumentation instance
+    """
+    global _instrumentation
+    if _instrumentation is None:
+        _instrumentation = Instrumentation()
+    return _instrumentation
+
+def set_instrumentation(instrumentation):
+    """
+    Replace the global instrumentation instance (e.g. for replay runs)
+
+    Args:
+        instrumentation: Instrumentation instance to use from now on
+    """
+    global _instrumentation
+    _instrumentation = instrumentation
+
+def span(stage, **args):
+    """
+    Measure a block with the global instrumentation instance
+    """
+    return get_instrumentation().span(stage, **args)
+
+def timed(stage):
+    """
+    Decorator measuring every call of a function as the given stage
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_instrumentation().span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def timed_sleep(seconds, reason):
+    """
+    Sleep and record the wait with the global instrumentation instance
+    """
+    get_instrumentation().sleep(seconds, reason)
@@ -6,6 +6,7 @@ Handles GUI interactions (clicks, swipes, typing)
 import logging
 import time
 from config import TIMEOUTS
+from instrumentation import timed, timed_sleep
 
 try:
     import pyautogui
@@ -17,6 +18,7 @@ except ImportError:
 class InteractionHandler:
     def __init__(self):
         self.window_bounds = None
+        self.recorder = None
         if PYAUTOGUI_AVAILABLE:
             pyautogui.FAILSAFE = True
             pyautogui.PAUSE = TIMEOUTS["interaction_delay"]
@@ -27,6 +29,16 @@ class InteractionHandler:
         """
         self.window_bounds = bounds
 
+    def set_recorder(self, recorder):
+        """
+        Log every successful action to a session archive
+
+        Args:
+            recorder: SessionRecorder receiving the actions, or None to stop recording
+        """
+        self.recorder = recorder
+
+    @timed("click")
     def click_at(self, x, y):
         """
         Click at specified coordinates (relative to window)
@@ -46,12 +58,15 @@ class InteractionHandler:
 
             logging.info(f"Clicking at screen coordinates: ({screen_x}, {screen_y})")
             pyautogui.click(screen_x, screen_y)
-            time.sleep(TIMEOUTS["interaction_delay"])
+            if self.recorder:
+                self.recorder.record_action("click", x=x, y=y)
+            timed_sleep(TIMEOUTS["interaction_delay"], "interaction_delay")
             return True
         except Exception as e:
             logging.error(f"Error clicking at ({x}, {y}): {e}")
             return False
 
+    @timed("swipe")
     def swipe(self, start_x, start_y, end_x, end_y, duration=0.5):
         """
         Perform swipe gesture from start to end coordinates
@@ -74,12 +89,16 @@ class InteractionHandler:
             logging.info(f"Swiping from ({start_screen_x}, {start_screen_y}) to ({end_screen_x}, {end_screen_y})")
             pyautogui.moveTo(start_screen_x, start_screen_y)
             pyautogui.dragTo(end_screen_x, end_screen_y, duration=duration, button='left')
-            time.sleep(TIMEOUTS["interaction_delay"])
+            if self.recorder:
+                self.recorder.record_action("swipe", start=[start_x, start_y], end=[end_x, end_y],
+                                            duration=duration)
+            timed_sleep(TIMEOUTS["interaction_delay"], "interaction_delay")
             return True
         except Exception as e:
             logging.error(f"Error swiping: {e}")
             return False
 
+    @timed("type")
     def type_text(self, text):
         """
         Type text input
@@ -91,7 +110,9 @@ class InteractionHandler:
         try:
             logging.info(f"Typing text: {text}")
             pyautogui.typewrite(text)
-            time.sleep(TIMEOUTS["interaction_delay"])
+            if self.recorder:
+                self.recorder.record_action("type", text=text)
+            timed_sleep(TIMEOUTS["interaction_delay"], "interaction_delay")
             return True
         except Exception as e:
             logging.error(f"Error typing text: {e}")
@@ -0,0 +1,149 @@
+"""
+OCR Engine Module
+Persistent OCR engine shared by the screen checks and the profile pre-filter
+"""
+
+import logging
+import threading
+from config import OCR_CONFIG
+from screenshot_writer import load_image
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logging.warning("PIL not available. OCR is disabled.")
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+
+if not (TESSEROCR_AVAILABLE or PYTESSERACT_AVAILABLE):
+    logging.warning("Neither tesserocr nor pytesseract available. OCR is disabled.")
+
+
+class OCREngine:
+    """
+    Tesseract OCR behind one long-lived handle
+
+    With tesserocr installed, a single PyTessBaseAPI is created once and reused,
+    so language data is loaded only on the first call. Without it, pytesseract is
+    used, which starts a tesseract process per call.
+    """
+
+    def __init__(self, lang=None, psm=None):
+        """
+        Initialize the engine (the tesseract handle is created on first use)
+
+        Args:
+            lang: Tesseract language code (defaults to OCR_CONFIG)
+            psm: Tesseract page segmentation mode (defaults to OCR_CONFIG, tesseract default if None)
+        """
+        self.lang = lang or OCR_CONFIG.get("lang", "eng")
+        self.psm = psm if psm is not None else OCR_CONFIG.get("psm")
+        self.backend = "tesserocr" if TESSEROCR_AVAILABLE else "pytesseract" if PYTESSERACT_AVAILABLE else None
+        self._api = None
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        """
+        Check whether an OCR backend is installed
+        """
+        return PIL_AVAILABLE and self.backend is not None
+
+    def _get_api(self):
+        """
+        Create the persistent tesserocr handle on first use
+        """
+        if self._api is None:
+            kwargs = {'lang': self.lang}
+            if self.psm is not None:
+                kwargs['psm'] = self.psm
+            self._api = tesserocr.PyTessBaseAPI(**kwargs)
+        return self._api
+
+    def image_to_string(self, image):
+        """
+        Extract text from an image
+
+        Args:
+            image: PIL image or path to an image file
+
+        Returns:
+            str: Recognised text
+
+        Raises:
+            RuntimeError: If no OCR backend is available
+        """
+        if not self.is_available():
+            raise RuntimeError("No OCR backend available (install tesserocr or pytesseract)")
+
+        if isinstance(image, str):
+            image = load_image(image)
+
+        if self.backend == "tesserocr":
+            # PyTessBaseAPI is not thread safe
+            with self._lock:
+                api = self._get_api()
+                api.SetImage(image)
+                return api.GetUTF8Text()
+
+        config = f"--psm {self.psm}" if self.psm is not None else ""
+        return pytesseract.image_to_string(image, lang=self.lang, config=config)
+
+    def version(self):
+        """
+        Get the tesseract version string
+        """
+        if self.backend == "tesserocr":
+            return tesserocr.tesseract_version().split("\n")[0]
+        return str(pytesseract.get_tesseract_version())
+
+    def warm_up(self):
+        """
+        Load the OCR engine so the first real call does not pay start-up cost
+
+        Returns:
+            bool: True if the engine is ready
+        """
+        try:
+            self.image_to_string(Image.new("RGB", (64, 32), "white"))
+            logging.info(f"OCR engine ready ({self.backend}, {self.version()})")
+            return True
+        except Exception as e:
+            logging.warning(f"OCR engine warm-up failed: {e}")
+            return False
+
+    def close(self):
+        """
+        Release the tesserocr handle
+        """
+        with self._lock:
+            if self._api is not None:
+                self._api.End()
+                self._api = None
+
+
+# Global instance for easy access
+_ocr_engine = None
+
+def get_ocr_engine():
+    """
+    Get the global OCR engine instance
+
+    Returns:
+        OCREngine instance
+    """
+    global _ocr_engine
+    if _ocr_engine is None:
+        _ocr_engine = OCREngine()
+    return _ocr_engine
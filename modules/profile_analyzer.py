@@ -6,17 +6,56 @@ Handles image/text analysis and rating logic for Step 7
 import logging
 import re
 import json
-from typing import List, Dict, Any
-from config import RATING_THRESHOLD, MAX_RATING
+from typing import List, Dict, Any, Optional
+from config import RATING_THRESHOLD, MAX_RATING, ANALYSIS_MODE, TWO_PHASE_ANALYSIS, OCR_PREFILTER
 from ai.ai_manager import get_llm
-from ai.prompts import get_step7_analysis_prompt
+from ai.prompts import get_step7_analysis_prompt, get_step7_decision_prompt
+from comment_generator import CommentGenerator
 from user_preferences import has_red_flag, get_quick_rating_threshold
+from instrumentation import timed
+from ocr_engine import get_ocr_engine
 
 class ProfileAnalyzer:
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, quick_llm=None, repair_llm=None, analysis_mode=None, comment_generator=None,
+                 ocr_prefilter=None):
+        """
+        Initialize the analyzer with one LLM per model role
+
+        Args:
+            llm: LLM for full analysis (defaults to the 'full_analysis' role)
+            quick_llm: LLM for the quick filter (defaults to llm if given, else the 'quick_filter' role)
+            repair_llm: LLM for JSON repair (defaults to llm if given, else the 'json_repair' role)
+            analysis_mode: 'single' or 'two_phase' (defaults to ANALYSIS_MODE)
+            comment_generator: CommentGenerator used in two-phase mode (defaults to one using llm)
+            ocr_prefilter: Reject on OCR'd red flags before the quick LLM call (defaults to OCR_PREFILTER)
+        """
         self.current_profile = None
-        self.llm = llm or get_llm()
+        self.llm = llm or get_llm("full_analysis")
+        self.quick_llm = quick_llm or (llm if llm else get_llm("quick_filter"))
+        self.repair_llm = repair_llm or (llm if llm else get_llm("json_repair"))
+        self.analysis_mode = analysis_mode or ANALYSIS_MODE
+        self.comment_generator = comment_generator or CommentGenerator(llm=self.llm)
+        self.ocr_prefilter_enabled = OCR_PREFILTER["enabled"] if ocr_prefilter is None else ocr_prefilter
+
+    def warm_up(self) -> bool:
+        """
+        Warm up the role LLMs so the first profile analysis does not pay the model load cost
 
+        Returns:
+            bool: True if every warm-up succeeded or is not supported by the LLM
+        """
+        results = []
+        warmed = set()
+        for llm in (self.quick_llm, self.llm, self.repair_llm):
+            key = getattr(llm, 'model', None) or id(llm)
+            if key in warmed:
+                continue
+            warmed.add(key)
+            if hasattr(llm, 'warm_up'):
+                results.append(llm.warm_up())
+        return all(results)
+
+    @timed("full_analysis")
     def analyze_profile(self, screenshots: List[str]) -> Dict[str, Any]:
         """
         Analyze profile from screenshots using vision LLM
@@ -30,6 +69,7 @@ class ProfileAnalyzer:
             - decision: str ('ENGAGE' or 'NEXT_PROFILE')
             - comment: str (witty comment or 'N/A')
             - reason: str (explanation of rating)
+            - error: True if the LLM call or response parsing failed (absent otherwise)
         """
         if not screenshots:
             return {
@@ -39,6 +79,9 @@ class ProfileAnalyzer:
                 'reason': 'No screenshots provided'
             }
 
+        if self.analysis_mode == "two_phase":
+            return self._analyze_two_phase(screenshots)
+
         try:
             # Get the Step 7 analysis prompt
             prompt = get_step7_analysis_prompt()
@@ -48,7 +91,8 @@ class ProfileAnalyzer:
             response = self.llm.generate(
                 prompt=prompt,
                 images=screenshots,
-                options={"temperature": 0.7, "num_predict": 300}
+                options={"temperature": 0.7, "num_predict": 300},
+                purpose="full"
             )
 
             # Log the raw LLM response
@@ -63,9 +107,54 @@ class ProfileAnalyzer:
                 'rating': 0,
                 'decision': 'NEXT_PROFILE',
                 'comment': 'N/A',
-                'reason': f'Analysis failed: {str(e)}'
+                'reason': f'Analysis failed: {str(e)}',
+                'error': True
+            }
+
+    def _analyze_two_phase(self, screenshots: List[str]) -> Dict[str, Any]:
+        """
+        Decide with a short, token-budgeted call, then write a comment only for ENGAGE
+
+        Args:
+            screenshots: List of screenshot file paths
+
+        Returns:
+            Dict with the same fields as analyze_profile
+        """
+        try:
+            logging.info(f"Two-phase analysis: sending {len(screenshots)} screenshots for a decision")
+            response = self.llm.generate(
+                prompt=get_step7_decision_prompt(),
+                images=screenshots,
+                options=TWO_PHASE_ANALYSIS.get("decision_options"),
+                purpose="decision"
+            )
+            logging.info(f"Decision LLM Raw Response: {response}")
+            result = self._parse_analysis_response(response)
+            result['comment'] = 'N/A'
+
+        except Exception as e:
+            logging.error(f"Profile decision failed: {e}")
+            return {
+                'rating': 0,
+                'decision': 'NEXT_PROFILE',
+                'comment': 'N/A',
+                'reason': f'Analysis failed: {str(e)}',
+                'error': True
             }
 
+        if result['decision'] != 'ENGAGE' or result['rating'] < RATING_THRESHOLD:
+            return result
+
+        comment = self.comment_generator.generate_comment(screenshots, result['reason'])
+        if comment:
+            result['comment'] = comment
+        else:
+            logging.warning("No valid comment generated - skipping profile")
+            result['decision'] = 'NEXT_PROFILE'
+            result['reason'] = f"{result['reason']} (no valid comment generated)"
+        return result
+
     def _extract_json_with_ai_retry(self, response: str, max_retries: int = 2) -> Dict[str, Any]:
         """
         Extract JSON from malformed response using AI retry
@@ -87,9 +176,10 @@ class ProfileAnalyzer:
 
 Return ONLY the JSON object, no explanations or additional text."""
 
-                retry_response = self.llm.generate(
+                retry_response = self.repair_llm.generate(
                     prompt=retry_prompt,
-                    options={"temperature": 0.1, "num_predict": 200}
+                    options={"temperature": 0.1, "num_predict": 200},
+                    purpose="json_retry"
                 )
 
                 # Manually Clean the response - remove markdown code blocks if present
@@ -204,12 +294,15 @@ Return ONLY the JSON object, no explanations or additional text."""
                 result['reason'] = 'Successfully parsed using AI retry'
             else:
                 result['reason'] = f'JSON parse error after AI retry: {str(e)}'
+                result['error'] = True
         except Exception as e:
             logging.error(f"Unexpected error parsing analysis response: {e}")
             result['reason'] = f'Parse error: {str(e)}'
+            result['error'] = True
 
         return result
 
+    @timed("quick_analysis")
     def quick_analyze_profile(self, screenshots: List[str]) -> Dict[str, Any]:
         """
         Quick analysis of profile using first screenshot only
@@ -224,6 +317,7 @@ Return ONLY the JSON object, no explanations or additional text."""
             - has_red_flags: bool
             - red_flag_details: dict or None
             - reason: str (brief explanation)
+            - error: True if the LLM call or response parsing failed (absent otherwise)
         """
         if not screenshots:
             return {
@@ -233,6 +327,11 @@ Return ONLY the JSON object, no explanations or additional text."""
                 'reason': 'No screenshots provided'
             }
 
+        if self.ocr_prefilter_enabled:
+            prefilter_result = self.ocr_prefilter(screenshots[0])
+            if prefilter_result:
+                return prefilter_result
+
         try:
             # Use the same Step 7 analysis prompt for consistency
             prompt = get_step7_analysis_prompt()
@@ -245,10 +344,11 @@ Return ONLY the JSON object, no explanations or additional text."""
 
             # Generate quick analysis using vision capabilities
             logging.info(f"Quick analysis: Sending {len(screenshots)} screenshot to LLM")
-            response = self.llm.generate(
+            response = self.quick_llm.generate(
                 prompt=prompt,
                 images=screenshots,
-                options=quick_options
+                options=quick_options,
+                purpose="quick"
             )
 
             # Log the raw LLM response
@@ -270,8 +370,39 @@ Return ONLY the JSON object, no explanations or additional text."""
                 'rating': 0,
                 'has_red_flags': False,
                 'red_flag_details': None,
-                'reason': f'Quick analysis failed: {str(e)}'
+                'reason': f'Quick analysis failed: {str(e)}',
+                'error': True
+            }
+
+    @timed("ocr_prefilter")
+    def ocr_prefilter(self, screenshot: str) -> Optional[Dict[str, Any]]:
+        """
+        OCR the screenshot locally and reject on red-flag keywords printed on the profile
+
+        Args:
+            screenshot: Path of the first profile screenshot
+
+        Returns:
+            Quick analysis result rejecting the profile, or None if it should go on to the LLM
+        """
+        try:
+            text = get_ocr_engine().image_to_string(screenshot)
+        except Exception as e:
+            logging.warning(f"OCR pre-filter skipped: {e}")
+            return None
+
+        has_red, red_details = has_red_flag(text)
+        if has_red and red_details['severity'] in OCR_PREFILTER.get("reject_severities", ["high"]):
+            logging.info(f"🚫 OCR pre-filter: '{red_details['keyword_found']}' found on profile - "
+                         f"skipping quick LLM analysis")
+            return {
+                'rating': 0,
+                'has_red_flags': True,
+                'red_flag_details': red_details,
+                'reason': f"OCR pre-filter: {red_details['reason']}",
+                'source': 'ocr_prefilter'
             }
+        return None
 
     def _parse_quick_analysis_response(self, response: str) -> Dict[str, Any]:
         """
@@ -330,9 +461,11 @@ Return ONLY the JSON object, no explanations or additional text."""
                 result['reason'] = 'Successfully parsed using AI retry'
             else:
                 result['reason'] = f'JSON parse error after AI retry: {str(e)}'
+                result['error'] = True
         except Exception as e:
             logging.error(f"Unexpected error parsing quick analysis response: {e}")
             result['reason'] = f'Parse error: {str(e)}'
+            result['error'] = True
 
         return result
 
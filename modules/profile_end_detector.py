@@ -0,0 +1,130 @@
+"""
+Profile End Detector Module
+Decides after each scroll whether the bottom of the profile has been reached
+"""
+
+import logging
+from config import END_OF_PROFILE
+from ocr_engine import get_ocr_engine
+from ui_detector import PROFILE_END_MARKERS
+
+
+class ProfileEndDetector:
+    """
+    Combines scroll and screen signals into an end-of-profile confidence
+
+    Signals, each with its own confidence:
+    - still: the swipe moved the content by (almost) nothing, so the new capture
+      repeats the previous one and is discarded
+    - short_scroll: the content moved clearly less than the swipe should have
+      moved it, because the list hit its bottom
+    - markers: the buttons shown below the last prompt were read by OCR (by default
+      only when the scroll signals are inconclusive, since OCR is the expensive signal)
+
+    Confidences are combined as 1 - prod(1 - c), so independent weak signals add up.
+    """
+
+    def __init__(self, ui_detector=None, min_confidence=None, still_threshold=None, still_confidence=None,
+                 short_scroll_confidence=None, ocr_markers=None, marker_shortfall=None, marker_region=None,
+                 marker_confidence=None):
+        """
+        Initialize the detector
+
+        Args:
+            ui_detector: UIDetector used for marker OCR (marker checks are skipped if None)
+            min_confidence: Combined confidence at which scrolling stops
+            still_threshold: Displacement, as a fraction of content rows, treated as no movement
+            still_confidence: Confidence of the still signal
+            short_scroll_confidence: Confidence of a swipe that moved nothing of what was expected
+            ocr_markers: OCR new captures for end-of-profile markers: True after every
+                         scroll, "uncertain" only after an inconclusive scroll, False never
+            marker_shortfall: Fraction of the expected displacement a scroll must fall short by
+                              to be inconclusive in "uncertain" mode
+            marker_region: Bottom fraction of the capture searched for markers
+            marker_confidence: Confidence when every marker is found
+        """
+        self.ui_detector = ui_detector
+        self.min_confidence = min_confidence if min_confidence is not None else END_OF_PROFILE.get("min_confidence", 0.6)
+        self.still_threshold = (still_threshold if still_threshold is not None
+                                else END_OF_PROFILE.get("still_threshold", 0.02))
+        self.still_confidence = (still_confidence if still_confidence is not None
+                                 else END_OF_PROFILE.get("still_confidence", 0.95))
+        self.short_scroll_confidence = (short_scroll_confidence if short_scroll_confidence is not None
+                                        else END_OF_PROFILE.get("short_scroll_confidence", 0.9))
+        self.ocr_markers = ocr_markers if ocr_markers is not None else END_OF_PROFILE.get("ocr_markers", "uncertain")
+        self.marker_shortfall = (marker_shortfall if marker_shortfall is not None
+                                 else END_OF_PROFILE.get("marker_shortfall", 0.1))
+        self.marker_region = marker_region or END_OF_PROFILE.get("marker_region", 0.4)
+        self.marker_confidence = (marker_confidence if marker_confidence is not None
+                                  else END_OF_PROFILE.get("marker_confidence", 0.85))
+
+    @staticmethod
+    def _combine(signals):
+        """
+        Combine signal confidences as 1 - prod(1 - c)
+        """
+        remaining = 1.0
+        for confidence in signals.values():
+            remaining *= 1 - confidence
+        return round(1 - remaining, 3)
+
+    def _wants_markers(self, signals, displacement, expected):
+        """
+        Decide whether a new capture is worth an OCR pass for the end markers
+
+        In "uncertain" mode only a scroll that fell clearly short without ending the
+        profile on its own, or whose displacement could not be measured, is checked; a
+        full-length scroll is followed by another swipe that settles the question cheaply.
+        """
+        if self.ocr_markers != "uncertain":
+            return bool(self.ocr_markers)
+        if displacement is None or not expected:
+            return True
+        return (displacement < expected * (1 - self.marker_shortfall)
+                and self._combine(signals) < self.min_confidence)
+
+    def check(self, measurement, screenshot, identical=None):
+        """
+        Score one scroll for the end of the profile
+
+        Args:
+            measurement: Result of ScrollController.measure for the scroll
+            screenshot: Path to the capture taken after the scroll
+            identical: Optional callable returning True if the capture repeats the previous
+                       one, used when the displacement could not be measured
+
+        Returns:
+            dict: end (bool), confidence (0-1), duplicate (capture adds nothing and
+                  should be dropped), signals (name -> confidence)
+        """
+        signals = {}
+        displacement = measurement.get('displacement')
+        content_rows = measurement.get('content_rows')
+        expected = measurement.get('expected')
+
+        if displacement is not None and content_rows:
+            if displacement <= content_rows * self.still_threshold:
+                signals['still'] = self.still_confidence
+            elif expected and displacement < expected:
+                signals['short_scroll'] = round(self.short_scroll_confidence * (1 - displacement / expected), 3)
+        elif content_rows is None and identical is not None and identical():
+            signals['still'] = self.still_confidence
+
+        # A repeated capture has nothing new to read, so markers are only searched on new content
+        if 'still' not in signals and self._wants_markers(signals, displacement, expected) and self.ui_detector \
+                and get_ocr_engine().is_available():
+            found = self.ui_detector.find_profile_end_markers(screenshot, self.marker_region)
+            if found:
+                signals['markers'] = round(self.marker_confidence * len(found) / len(PROFILE_END_MARKERS), 3)
+
+        confidence = self._combine(signals)
+
+        result = {
+            'end': confidence >= self.min_confidence,
+            'confidence': confidence,
+            'duplicate': 'still' in signals,
+            'signals': signals
+        }
+        if result['end']:
+            logging.info(f"End of profile detected (confidence {confidence}, signals {signals})")
+        return result
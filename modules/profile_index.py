@@ -0,0 +1,224 @@
+"""
+Profile Index Module
+Persistent index of already-evaluated profiles keyed by the perceptual hash of their first frame
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+from config import PROFILE_INDEX
+from batch_hash import hamming_distances, phash_batch
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy not available. Profile index will be disabled.")
+
+# Index layout:
+#   header   MAGIC
+#   records  fixed-width RECORD per evaluated profile (hash, unix timestamp, decision, rating)
+# Records are appended as profiles are decided; expired records are dropped by
+# rewriting the file to a temporary path and renaming it over the original.
+MAGIC = b"HNGIDX01"
+RECORD = struct.Struct("<Qdbb")
+
+# Stored decisions
+DECISIONS = {"SKIP": 0, "ENGAGE": 1}
+DECISION_NAMES = {code: name for name, code in DECISIONS.items()}
+
+if NUMPY_AVAILABLE:
+    RECORD_DTYPE = np.dtype([("hash", "<u8"), ("timestamp", "<f8"), ("decision", "i1"), ("rating", "i1")])
+
+
+def first_frame_hash(frame):
+    """
+    Perceptual hash identifying a profile by its first frame
+
+    The whole frame is hashed, without the learned chrome mask, so the same profile
+    hashes the same way in every run.
+
+    Args:
+        frame: PIL image or image path
+
+    Returns:
+        int: 64-bit perceptual hash
+    """
+    return int(phash_batch([frame])[0])
+
+
+class ProfileIndex:
+    """
+    On-disk map from first-frame hash to the decision made for that profile
+
+    Only hashes, timestamps, decisions and ratings are stored, never images. The
+    records are held in a numpy array so a lookup computes the Hamming distance to
+    every stored hash in one vectorised pass.
+    """
+
+    def __init__(self, path=None, max_distance=None, max_age_days=None):
+        """
+        Open (or create) the index and drop expired records
+
+        Args:
+            path: Index file path
+            max_distance: Largest Hamming distance accepted as the same profile
+            max_age_days: Records older than this are ignored and removed
+        """
+        self.path = path or PROFILE_INDEX.get("path", os.path.join("data", "profile_index.hidx"))
+        self.max_distance = max_distance if max_distance is not None else PROFILE_INDEX.get("max_distance", 4)
+        self.max_age_days = max_age_days if max_age_days is not None else PROFILE_INDEX.get("max_age_days", 30)
+        self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """
+        Read the records from disk and remove expired ones
+        """
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError("not a profile index file")
+                data = f.read()
+            usable = len(data) - len(data) % RECORD.size
+            self.records = np.frombuffer(data[:usable], dtype=RECORD_DTYPE).copy()
+            if usable < len(data):
+                # Drop a partially written trailing record (interrupted append) so new records stay aligned
+                with open(self.path, 'r+b') as f:
+                    f.truncate(len(MAGIC) + usable)
+            logging.info(f"Loaded {len(self.records)} profiles from index {self.path}")
+        except Exception as e:
+            logging.warning(f"Could not read profile index {self.path}: {e}")
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+            return
+
+        self.expire()
+
+    def lookup(self, frame_hash, now=None):
+        """
+        Find the closest unexpired record for a first-frame hash
+
+        Args:
+            frame_hash: 64-bit perceptual hash of the profile's first frame
+            now: Current unix time (defaults to time.time())
+
+        Returns:
+            dict: decision, rating, timestamp and distance of the best match within
+                  max_distance, or None
+        """
+        with self._lock:
+            records = self.records
+        if not len(records):
+            return None
+
+        distances = hamming_distances(records["hash"], frame_hash)
+        cutoff = (now or time.time()) - self.max_age_days * 86400
+        candidates = (distances <= self.max_distance) & (records["timestamp"] >= cutoff)
+        if not candidates.any():
+            return None
+
+        # Closest match, most recent on ties
+        order = np.lexsort((-records["timestamp"], distances))
+        best = next(i for i in order if candidates[i])
+        record = records[best]
+        return {
+            'decision': DECISION_NAMES.get(int(record["decision"]), "SKIP"),
+            'rating': None if record["rating"] < 0 else int(record["rating"]),
+            'timestamp': float(record["timestamp"]),
+            'distance': int(distances[best])
+        }
+
+    def add(self, frame_hash, decision, rating=None, timestamp=None):
+        """
+        Record the decision for a profile
+
+        Args:
+            frame_hash: 64-bit perceptual hash of the profile's first frame
+            decision: 'SKIP' or 'ENGAGE'
+            rating: Optional 0-10 rating
+            timestamp: Unix time of the decision (defaults to time.time())
+        """
+        record = (frame_hash, timestamp or time.time(), DECISIONS[decision],
+                  -1 if rating is None else int(rating))
+        with self._lock:
+            self.records = np.append(self.records, np.array([record], dtype=RECORD_DTYPE))
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                new_file = not os.path.exists(self.path)
+                with open(self.path, 'ab') as f:
+                    if new_file:
+                        f.write(MAGIC)
+                    f.write(RECORD.pack(*record))
+            except Exception as e:
+                logging.warning(f"Could not write to profile index {self.path}: {e}")
+
+    def expire(self, now=None):
+        """
+        Remove records older than max_age_days and rewrite the file
+
+        Args:
+            now: Current unix time (defaults to time.time())
+
+        Returns:
+            int: Number of records removed
+        """
+        cutoff = (now or time.time()) - self.max_age_days * 86400
+        with self._lock:
+            keep = self.records["timestamp"] >= cutoff
+            removed = int((~keep).sum())
+            if not removed:
+                return 0
+            self.records = self.records[keep]
+            try:
+                temp_path = self.path + ".tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(MAGIC)
+                    f.write(self.records.tobytes())
+                os.replace(temp_path, self.path)
+                logging.info(f"Expired {removed} profiles from index {self.path}")
+            except Exception as e:
+                logging.warning(f"Could not rewrite profile index {self.path}: {e}")
+        return removed
+
+    def __len__(self):
+        return len(self.records)
+
+
+# Global instance for easy access
+_profile_index = None
+
+def get_profile_index():
+    """
+    Get the global profile index instance
+
+    Returns:
+        ProfileIndex instance
+    """
+    global _profile_index
+    if _profile_index is None:
+        _profile_index = ProfileIndex()
+    return _profile_index
+
+def set_profile_index(profile_index):
+    """
+    Replace the global profile index instance (e.g. for replay runs)
+
+    Args:
+        profile_index: ProfileIndex instance to use from now on, or None to open the
+            configured index on next use
+
+    Returns:
+        The previous ProfileIndex instance, or None
+    """
+    global _profile_index
+    previous, _profile_index = _profile_index, profile_index
+    return previous
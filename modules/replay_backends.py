@@ -0,0 +1,382 @@
+"""
+Replay Backends Module
+Fake device, window, capture, interaction and LLM backends for offline replay runs
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from screenshot_handler import ScreenshotHandler
+from instrumentation import span, timed
+from session_recorder import SessionArchive
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logging.warning("PIL not available. Replay frames cannot be loaded.")
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Stub responses used when no recorded responses are supplied (one per call purpose)
+DEFAULT_STUB_RESPONSES = {
+    "quick": '{"rating": 7, "reason": "Replay stub", "decision": "ENGAGE", "comment": "N/A"}',
+    "full": '{"rating": 7, "reason": "Replay stub", "decision": "ENGAGE", "comment": "Replay stub comment"}',
+    "json_retry": '{"rating": 5, "reason": "Replay stub", "decision": "NEXT_PROFILE", "comment": "N/A"}',
+    "decision": '{"rating": 7, "reason": "Replay stub", "decision": "ENGAGE"}',
+    "comment": "Replay stub comment"
+}
+
+
+class ReplaySession:
+    """
+    A recorded session: a list of profiles, each with its frames in scroll order
+
+    A directory may contain a session.json manifest:
+        {"profiles": [{"frames": ["p1_001.png", "p1_002.png"], "post_click": ["p1_comment.png"]}]}
+    Without a manifest, every image in the directory (sorted by name) is treated as
+    one frame of a single profile, so any folder of screenshots can seed a replay.
+    A session archive written by SessionRecorder can be loaded with from_archive;
+    its frames are then archive frame indices.
+    """
+
+    def __init__(self, profiles, root="", archive=None):
+        """
+        Initialize the session
+
+        Args:
+            profiles: List of dicts with 'frames' and optional 'post_click' image paths
+            root: Directory that relative frame paths are resolved against
+            archive: Optional SessionArchive the frames are read from
+        """
+        if not profiles or not all(profile.get('frames') for profile in profiles):
+            raise ValueError("Replay session needs at least one profile with frames")
+
+        self.root = root
+        self.profiles = profiles
+        self.archive = archive
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, path):
+        """
+        Load a session from a directory of frames (with optional session.json)
+
+        Args:
+            path: Session directory
+
+        Returns:
+            ReplaySession
+        """
+        manifest_path = os.path.join(path, "session.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            return cls(manifest['profiles'], root=path)
+
+        frames = sorted(f for f in os.listdir(path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        return cls([{'frames': frames}], root=path)
+
+    @classmethod
+    def from_archive(cls, path):
+        """
+        Load a session from a SessionRecorder archive
+
+        Args:
+            path: Archive file path
+
+        Returns:
+            ReplaySession
+        """
+        archive = SessionArchive(path)
+        return cls(archive.profiles(), archive=archive)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a session from a directory or an archive file
+        """
+        if os.path.isdir(path):
+            return cls.from_directory(path)
+        return cls.from_archive(path)
+
+    def load_frame(self, frame):
+        """
+        Load a frame image (cached after the first load)
+
+        Args:
+            frame: Frame path relative to the session root
+
+        Returns:
+            PIL.Image in RGB mode
+        """
+        with self._lock:
+            if frame not in self._cache:
+                if self.archive:
+                    self._cache[frame] = self.archive.frame_image(frame)
+                else:
+                    self._cache[frame] = Image.open(os.path.join(self.root, frame)).convert("RGB")
+            return self._cache[frame]
+
+    def window_size(self):
+        """
+        Get the size of the recorded frames
+
+        Returns:
+            Tuple of (width, height)
+        """
+        return self.load_frame(self.profiles[0]['frames'][0]).size
+
+
+class ReplayDevice:
+    """
+    Simulated phone screen driven by the recorded session
+
+    A swipe advances to the next frame of the current profile (staying on the last
+    one at the end), a click shows the profile's next recorded post-click frame and
+    marks the profile as finished, and the following "profile_load" wait moves to
+    the next profile. Register on_span as an instrumentation listener.
+    """
+
+    def __init__(self, session, repeat=1):
+        """
+        Initialize the simulated device
+
+        Args:
+            session: ReplaySession to play back
+            repeat: Number of times the session's profiles are played
+        """
+        self.session = session
+        self.total_profiles = len(session.profiles) * repeat
+        self.profile_position = 0
+        self.frame_index = 0
+        self.post_click_index = 0
+        self.overlay = None
+        self.profile_finished = False
+        self.actions = []
+
+    @property
+    def exhausted(self):
+        """
+        Whether every profile has been played
+        """
+        return self.profile_position >= self.total_profiles
+
+    @property
+    def profile(self):
+        """
+        The profile currently on screen
+        """
+        return self.session.profiles[self.profile_position % len(self.session.profiles)]
+
+    def current_frame(self):
+        """
+        Get the frame currently on screen
+
+        Returns:
+            PIL.Image copy, or None once the session is exhausted
+        """
+        if self.exhausted:
+            return None
+        frame = self.overlay if self.overlay is not None else self.profile['frames'][self.frame_index]
+        return self.session.load_frame(frame).copy()
+
+    def scroll(self):
+        """
+        Advance to the next recorded frame of the current profile
+        """
+        self.actions.append(('swipe', time.time()))
+        self.overlay = None
+        self.frame_index = min(self.frame_index + 1, len(self.profile['frames']) - 1)
+
+    def click(self, x, y):
+        """
+        Show the next post-click frame and mark the profile as finished
+        """
+        self.actions.append(('click', time.time(), x, y))
+        post_click = self.profile.get('post_click', [])
+        if self.post_click_index < len(post_click):
+            self.overlay = post_click[self.post_click_index]
+            self.post_click_index += 1
+        self.profile_finished = True
+
+    def next_profile(self):
+        """
+        Move to the first frame of the next profile
+        """
+        self.profile_position += 1
+        self.frame_index = 0
+        self.post_click_index = 0
+        self.overlay = None
+        self.profile_finished = False
+
+    def on_span(self, stage, start, duration, args):
+        """
+        Instrumentation listener: the profile load wait brings up the next profile
+        """
+        if stage == "sleep.profile_load" and self.profile_finished:
+            self.next_profile()
+
+
+class ReplayGrabber(ScreenshotHandler):
+    """
+    Screenshot handler returning frames from the replay device
+    """
+
+    def __init__(self, device, screenshot_dir):
+        """
+        Initialize the grabber
+
+        Args:
+            device: ReplayDevice providing frames
+            screenshot_dir: Directory where captures are written
+        """
+        super().__init__()
+        self.device = device
+        self.screenshot_dir = screenshot_dir
+        os.makedirs(self.screenshot_dir, exist_ok=True)
+
+    def grab_frame(self):
+        """
+        Grab the frame currently shown by the replay device
+        """
+        return self.device.current_frame()
+
+    def poll_frame(self):
+        """
+        Grab the frame currently shown by the replay device
+        """
+        return self.device.current_frame()
+
+
+class FakeScrcpyManager:
+    """
+    scrcpy manager that never launches a process
+    """
+
+    def start_scrcpy(self, extra_options=None):
+        return True
+
+    def stop_scrcpy(self):
+        pass
+
+    def is_running(self):
+        return True
+
+
+class FakeWindowDetector:
+    """
+    Window detector reporting a fixed window matching the recorded frame size
+    """
+
+    def __init__(self, width, height):
+        self.dimensions = {
+            'left': 0,
+            'top': 0,
+            'width': width,
+            'height': height,
+            'right': width,
+            'bottom': height
+        }
+
+    def wait_for_window(self, title=None, timeout=None, poll_interval=0.25):
+        return True
+
+    def get_active_window(self):
+        return True
+
+    def get_dimensions(self):
+        return self.dimensions
+
+    def refresh_if_moved(self):
+        return False
+
+
+class FakeInteractionHandler:
+    """
+    Interaction handler forwarding clicks and swipes to the replay device
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.window_bounds = None
+        self.recorder = None
+        self.typed_text = []
+
+    def set_window_bounds(self, bounds):
+        self.window_bounds = bounds
+
+    def set_recorder(self, recorder):
+        self.recorder = recorder
+
+    def _record(self, action, **args):
+        if self.recorder:
+            self.recorder.record_action(action, **args)
+
+    @timed("click")
+    def click_at(self, x, y):
+        self.device.click(x, y)
+        self._record("click", x=x, y=y)
+        return True
+
+    @timed("swipe")
+    def swipe(self, start_x, start_y, end_x, end_y, duration=0.5):
+        self.device.scroll()
+        self._record("swipe", start=[start_x, start_y], end=[end_x, end_y], duration=duration)
+        return True
+
+    @timed("type")
+    def type_text(self, text):
+        self.typed_text.append(text)
+        self._record("type", text=text)
+        return True
+
+
+class StubLLM:
+    """
+    LLM stand-in returning recorded responses per call purpose
+    """
+
+    def __init__(self, responses=None, latency_s=0.0):
+        """
+        Initialize the stub
+
+        Args:
+            responses: Dict purpose -> response string or list of strings (cycled)
+            latency_s: Simulated inference time per call
+        """
+        self.responses = {**DEFAULT_STUB_RESPONSES, **(responses or {})}
+        self.latency_s = latency_s
+        self.model = "replay-stub"
+        self.calls = []
+
+    @classmethod
+    def from_file(cls, path, latency_s=0.0):
+        """
+        Load recorded responses from a JSON file mapping purpose to response(s)
+        """
+        with open(path) as f:
+            return cls(json.load(f), latency_s=latency_s)
+
+    def warm_up(self):
+        return True
+
+    def generate(self, prompt, system=None, options=None, images=None, purpose=None):
+        """
+        Return the next recorded response for the call's purpose
+        """
+        key = purpose if purpose in self.responses else "full"
+        recorded = self.responses[key]
+        if isinstance(recorded, list):
+            count = sum(1 for call in self.calls if call == key)
+            recorded = recorded[count % len(recorded)]
+        self.calls.append(key)
+
+        with span("llm.generate", model=self.model, purpose=purpose, images=len(images or [])):
+            if self.latency_s:
+                time.sleep(self.latency_s)
+        return recorded
@@ -13,12 +13,15 @@ class ScrcpyManager:
     def __init__(self):
         self.process = None
 
-    def start_scrcpy(self):
+    def start_scrcpy(self, extra_options=None):
         """
         Launch scrcpy process
+
+        Args:
+            extra_options: Additional command line options appended to SCRCPY_OPTIONS
         """
         try:
-            cmd = ['scrcpy'] + SCRCPY_OPTIONS
+            cmd = ['scrcpy'] + SCRCPY_OPTIONS + list(extra_options or [])
             logging.info("Starting scrcpy...")
             # Set environment to ensure GUI window creation
             env = os.environ.copy()
@@ -0,0 +1,249 @@
+"""
+Screen Watcher Module
+Background capture service that keeps recent frames in memory and publishes change events
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from config import SCREEN_WATCHER
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("numpy not available. Screen watcher will be disabled.")
+
+# Size of the grayscale thumbnail used for change scoring (width, height)
+CHANGE_THUMBNAIL_SIZE = (36, 64)
+
+
+class ScreenWatcher:
+    """
+    Grabs frames at a fixed rate on a background thread
+
+    Each frame is scored against the previous one using the mean absolute difference
+    of small grayscale thumbnails (0-255). Subscribers receive a "changed" event when
+    the screen starts moving and a "stable" event once it has settled again, so callers
+    can read the latest frame or wait for a transition instead of triggering a blocking
+    grab themselves.
+    """
+
+    def __init__(self, grabber, fps=None, buffer_size=None, change_threshold=None, stable_frames=None):
+        """
+        Initialize the screen watcher
+
+        Args:
+            grabber: Object exposing poll_frame() or grab_frame() -> PIL.Image
+                     (e.g. ScreenshotHandler, whose poll_frame() does not activate the window)
+            fps: Capture rate in frames per second
+            buffer_size: Number of recent frames kept in the ring buffer
+            change_threshold: Minimum change score for a frame to count as changed
+            stable_frames: Consecutive unchanged frames needed before the screen is stable
+        """
+        self.grabber = grabber
+        # A polling grab skips the window lookup, activation delay and INFO logging of grab_frame()
+        self._grab = getattr(grabber, 'poll_frame', None) or grabber.grab_frame
+        self.fps = fps or SCREEN_WATCHER.get("fps", 5)
+        self.buffer_size = buffer_size or SCREEN_WATCHER.get("buffer_size", 30)
+        self.change_threshold = (change_threshold if change_threshold is not None
+                                 else SCREEN_WATCHER.get("change_threshold", 2.0))
+        self.stable_frames = stable_frames or SCREEN_WATCHER.get("stable_frames", 3)
+
+        # Ring buffer entries: (timestamp, PIL.Image, change_score)
+        self.frames = deque(maxlen=self.buffer_size)
+        self.subscribers = []
+        self.is_stable = True
+        self.last_change_time = 0.0
+        self.last_stable_time = 0.0
+
+        self._previous_thumbnail = None
+        self._unchanged_count = 0
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        """
+        Register a callback for screen events
+
+        Args:
+            callback: Callable invoked as callback(event, info) where event is
+                      "changed" or "stable" and info holds timestamp and score
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Remove a previously registered callback
+        """
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def start(self):
+        """
+        Start the background capture thread
+
+        Returns:
+            bool: True if the watcher is running
+        """
+        if not NUMPY_AVAILABLE:
+            logging.error("numpy not available. Cannot start screen watcher.")
+            return False
+
+        if self._thread and self._thread.is_alive():
+            return True
+
+        logging.info(f"Starting screen watcher at {self.fps} FPS")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._capture_loop, name="screen-watcher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop the background capture thread
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def is_running(self):
+        """
+        Check if the capture thread is alive
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def _capture_loop(self):
+        """
+        Grab frames at the configured rate until stopped
+        """
+        interval = 1.0 / self.fps
+        while not self._stop_event.is_set():
+            started = time.time()
+            try:
+                frame = self._grab()
+                if frame is not None:
+                    self._process_frame(frame, started)
+            except Exception as e:
+                logging.error(f"Screen watcher capture failed: {e}")
+
+            remaining = interval - (time.time() - started)
+            if remaining > 0:
+                self._stop_event.wait(remaining)
+
+    def _process_frame(self, frame, timestamp):
+        """
+        Score a new frame, store it and publish any state transition
+        """
+        thumbnail = np.asarray(frame.convert("L").resize(CHANGE_THUMBNAIL_SIZE), dtype=np.int16)
+        if self._previous_thumbnail is None:
+            score = 0.0
+        else:
+            score = float(np.abs(thumbnail - self._previous_thumbnail).mean())
+        self._previous_thumbnail = thumbnail
+
+        event = None
+        with self._condition:
+            self.frames.append((timestamp, frame, score))
+
+            if score >= self.change_threshold:
+                self._unchanged_count = 0
+                self.last_change_time = timestamp
+                if self.is_stable:
+                    self.is_stable = False
+                    event = "changed"
+            else:
+                self._unchanged_count += 1
+                if not self.is_stable and self._unchanged_count >= self.stable_frames:
+                    self.is_stable = True
+                    self.last_stable_time = timestamp
+                    event = "stable"
+
+            self._condition.notify_all()
+
+        if event:
+            self._publish(event, {"timestamp": timestamp, "score": score})
+
+    def _publish(self, event, info):
+        """
+        Deliver an event to all subscribers
+        """
+        for callback in list(self.subscribers):
+            try:
+                callback(event, info)
+            except Exception as e:
+                logging.warning(f"Screen watcher subscriber failed on '{event}': {e}")
+
+    def latest_frame(self):
+        """
+        Get the most recent frame without triggering a capture
+
+        Returns:
+            PIL.Image or None if nothing has been captured yet
+        """
+        with self._condition:
+            if not self.frames:
+                return None
+            return self.frames[-1][1]
+
+    def frame_after(self, since=None, timeout=None):
+        """
+        Wait for a frame whose grab started after a given moment
+
+        latest_frame() may predate a click or swipe that was just sent; this returns
+        the first frame that cannot.
+
+        Args:
+            since: Timestamp (time.time()) after which the grab must start (defaults to now)
+            timeout: Maximum time to wait in seconds (defaults to two capture intervals)
+
+        Returns:
+            PIL.Image or None if no such frame arrived before the timeout
+        """
+        since = time.time() if since is None else since
+        timeout = 2.0 / self.fps if timeout is None else timeout
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.frames and self.frames[-1][0] > since, timeout=timeout):
+                return None
+            return self.frames[-1][1]
+
+    def wait_for_change(self, since=None, timeout=1.0):
+        """
+        Wait until the screen changes after a given moment
+
+        Args:
+            since: Timestamp (time.time()) after which a change must occur (defaults to now)
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            bool: True if a change was observed
+        """
+        since = time.time() if since is None else since
+        with self._condition:
+            return self._condition.wait_for(lambda: self.last_change_time > since, timeout=timeout)
+
+    def wait_for_stable(self, since=None, timeout=2.0):
+        """
+        Wait until the last stable_frames frames captured after a given moment are unchanged
+
+        Args:
+            since: Timestamp (time.time()) after which the frames must be captured (defaults to now)
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            bool: True if the screen settled before the timeout
+        """
+        since = time.time() if since is None else since
+
+        def settled():
+            if len(self.frames) < self.stable_frames:
+                return False
+            recent = list(self.frames)[-self.stable_frames:]
+            return all(ts > since and score < self.change_threshold for ts, _, score in recent)
+
+        with self._condition:
+            return self._condition.wait_for(settled, timeout=timeout)
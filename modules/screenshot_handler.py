@@ -7,7 +7,10 @@ import os
 import logging
 import time
 from datetime import datetime
-from config import SCREENSHOT_DIR, SCREENSHOT_FORMAT, TIMEOUTS
+from config import SCREENSHOT_DIR, SCREENSHOT_FORMAT, TIMEOUTS, COMPARE_CASCADE
+from instrumentation import timed
+from chrome_mask import get_chrome_mask
+from screenshot_writer import get_screenshot_writer, load_image
 
 try:
     import pyautogui
@@ -23,11 +26,45 @@ except ImportError:
     PIL_AVAILABLE = False
     logging.warning("PIL not available. Image processing will be limited.")
 
+
+def difference_hash(image, hash_size=16):
+    """
+    Difference hash of an image along the scroll direction
+
+    Each bit records whether a pixel of a hash_size x (hash_size + 1) grayscale
+    thumbnail is brighter than the pixel below it, so content moving vertically
+    flips bits. The thumbnail is box-filtered straight from the full image, which
+    costs a fraction of a perceptual hash.
+
+    Args:
+        image: PIL image (converted to grayscale if needed)
+        hash_size: Columns (and bits per column) of the hash
+
+    Returns:
+        int: hash_size * hash_size bit hash
+    """
+    if image.mode != "L":
+        image = image.convert("L")
+    pixels = list(image.resize((hash_size, hash_size + 1), Image.BOX).getdata())
+    value = 0
+    for index in range(hash_size * hash_size):
+        value = (value << 1) | (pixels[index + hash_size] > pixels[index])
+    return value
+
+def hamming_distance(hash1, hash2):
+    """
+    Number of differing bits between two integer hashes
+    """
+    return bin(hash1 ^ hash2).count("1")
+
+
 class ScreenshotHandler:
     def __init__(self):
         self.screenshot_dir = SCREENSHOT_DIR
         os.makedirs(self.screenshot_dir, exist_ok=True)
         self.window_bounds = None
+        self.watcher = None
+        self.recorder = None
 
     def set_window_bounds(self, bounds):
         """
@@ -35,9 +72,34 @@ class ScreenshotHandler:
         """
         self.window_bounds = bounds
 
+    def attach_watcher(self, watcher):
+        """
+        Serve captures from a running ScreenWatcher instead of grabbing on demand
+
+        Args:
+            watcher: ScreenWatcher whose latest frame is used, or None to detach
+        """
+        self.watcher = watcher
+
+    def set_recorder(self, recorder):
+        """
+        Store every captured frame in a session archive
+
+        Args:
+            recorder: SessionRecorder receiving the saved frames, or None to stop recording
+        """
+        self.recorder = recorder
+
+    @timed("capture")
     def capture_screenshot(self, filename=None):
         """
-        Capture screenshot of the window or full screen using pygetwindow + ImageGrab
+        Capture screenshot of the window or full screen and queue it to be saved
+
+        The frame is written in the background by the screenshot writer; use
+        load_image() to read it, which serves it from memory until it is on disk.
+
+        Returns:
+            str: Path of the screenshot (extension set by SCREENSHOT_FORMAT), or None on failure
         """
         try:
             if filename is None:
@@ -46,101 +108,139 @@ class ScreenshotHandler:
 
             filepath = os.path.join(self.screenshot_dir, filename)
 
-            if self.window_bounds:
-                # Use pygetwindow + ImageGrab approach as suggested
+            # Only a frame grabbed after this request can show the result of the last input
+            screenshot = self.watcher.frame_after(time.time()) if self.watcher else None
+            if screenshot is None:
+                screenshot = self.grab_frame()
+            if screenshot is None:
+                return None
+
+            writer = get_screenshot_writer()
+            # The recorder logs the frame now and stores the writer's encoding of it
+            store_frame = None
+            if self.recorder:
+                saved_path = writer.path_for(filepath)
+                store_frame = self.recorder.reserve_frame(name=os.path.basename(saved_path), path=saved_path)
+            try:
+                filepath = writer.submit(screenshot, filepath, on_encoded=store_frame)
+            except Exception:
+                if store_frame:
+                    store_frame(None)
+                raise
+            logging.info(f"Screenshot queued: {filepath}")
+            return filepath
+
+        except Exception as e:
+            logging.error(f"Error capturing screenshot: {e}")
+            return None
+
+    def grab_frame(self):
+        """
+        Grab the current frame of the window (or full screen) using pygetwindow + ImageGrab
+
+        Returns:
+            PIL.Image or None if no capture method is available
+        """
+        if self.window_bounds:
+            # Use pygetwindow + ImageGrab approach as suggested
+            try:
+                import pygetwindow as gw
+
+                # Get the active window title from our window bounds
+                # Since we have the bounds, let's try to find the window by position
+                left = int(self.window_bounds['left'])
+                top = int(self.window_bounds['top'])
+                width = int(self.window_bounds['width'])
+                height = int(self.window_bounds['height'])
+
+                logging.info(f"Capturing screenshot of region: ({left}, {top}, {width}, {height})")
+
+                # Try to find the window at these coordinates
                 try:
-                    import pygetwindow as gw
-
-                    # Get the active window title from our window bounds
-                    # Since we have the bounds, let's try to find the window by position
-                    left = int(self.window_bounds['left'])
-                    top = int(self.window_bounds['top'])
-                    width = int(self.window_bounds['width'])
-                    height = int(self.window_bounds['height'])
-
-                    logging.info(f"Capturing screenshot of region: ({left}, {top}, {width}, {height})")
-
-                    # Try to find the window at these coordinates
-                    try:
-                        windows = gw.getAllWindows()
-                        target_window = None
-
-                        for win in windows:
-                            # Check if window bounds match our target region
-                            if (abs(win.left - left) < 10 and  # Allow small tolerance
-                                abs(win.top - top) < 10 and
-                                abs(win.width - width) < 10 and
-                                abs(win.height - height) < 10):
-                                target_window = win
-                                logging.info(f"Found matching window: {win.title}")
-                                break
-
-                        # If we found a matching window, activate it first
-                        if target_window:
-                            target_window.activate()
-                            time.sleep(0.5)  # Wait for activation
-
-                    except Exception as e:
-                        logging.warning(f"Could not find/activate window: {e}")
-
-                    # Take screenshot using ImageGrab (more reliable than pyautogui on macOS)
-                    if PIL_AVAILABLE:
-                        # Use ImageGrab.grab() with bbox parameter for region capture
-                        bbox = (left, top, left + width, top + height)
-                        screenshot = ImageGrab.grab(bbox=bbox)
-                        logging.info(f"Captured screenshot size: {screenshot.size}")
-
-                        # Save the screenshot
-                        screenshot.save(filepath)
-                        logging.info(f"Screenshot saved to: {filepath}")
-                        return filepath
-                    else:
-                        logging.error("PIL not available. Cannot capture screenshot.")
-                        return None
-
-                except ImportError:
-                    logging.warning("pygetwindow not available, falling back to pyautogui")
-
-                # Fallback to pyautogui if pygetwindow approach fails
-                if PYAUTOGUI_AVAILABLE:
-                    logging.info("Falling back to pyautogui")
-                    left = int(self.window_bounds['left'])
-                    top = int(self.window_bounds['top'])
-                    width = int(self.window_bounds['width'])
-                    height = int(self.window_bounds['height'])
-
-                    region = (left, top, width, height)
-                    screenshot = pyautogui.screenshot(region=region)
+                    windows = gw.getAllWindows()
+                    target_window = None
+
+                    for win in windows:
+                        # Check if window bounds match our target region
+                        if (abs(win.left - left) < 10 and  # Allow small tolerance
+                            abs(win.top - top) < 10 and
+                            abs(win.width - width) < 10 and
+                            abs(win.height - height) < 10):
+                            target_window = win
+                            logging.info(f"Found matching window: {win.title}")
+                            break
+
+                    # If we found a matching window, activate it first
+                    if target_window:
+                        target_window.activate()
+                        time.sleep(0.5)  # Wait for activation
+
+                except Exception as e:
+                    logging.warning(f"Could not find/activate window: {e}")
+
+                # Take screenshot using ImageGrab (more reliable than pyautogui on macOS)
+                if PIL_AVAILABLE:
+                    # Use ImageGrab.grab() with bbox parameter for region capture
+                    bbox = (left, top, left + width, top + height)
+                    screenshot = ImageGrab.grab(bbox=bbox)
                     logging.info(f"Captured screenshot size: {screenshot.size}")
-
-                    if PIL_AVAILABLE:
-                        screenshot.save(filepath)
-                        logging.info(f"Screenshot saved with pyautogui: {filepath}")
-                        return filepath
+                    return screenshot
                 else:
-                    logging.error("No screenshot method available.")
+                    logging.error("PIL not available. Cannot capture screenshot.")
                     return None
+
+            except ImportError:
+                logging.warning("pygetwindow not available, falling back to pyautogui")
+
+            # Fallback to pyautogui if pygetwindow approach fails
+            if PYAUTOGUI_AVAILABLE:
+                logging.info("Falling back to pyautogui")
+                left = int(self.window_bounds['left'])
+                top = int(self.window_bounds['top'])
+                width = int(self.window_bounds['width'])
+                height = int(self.window_bounds['height'])
+
+                region = (left, top, width, height)
+                screenshot = pyautogui.screenshot(region=region)
+                logging.info(f"Captured screenshot size: {screenshot.size}")
+                return screenshot
             else:
-                # Capture full screen
-                logging.warning("Capturing full screen screenshot")
-                if PIL_AVAILABLE:
-                    screenshot = ImageGrab.grab()
-                    screenshot.save(filepath)
-                    logging.info(f"Full screenshot saved to: {filepath}")
-                    return filepath
-                elif PYAUTOGUI_AVAILABLE:
-                    screenshot = pyautogui.screenshot()
-                    if PIL_AVAILABLE:
-                        screenshot.save(filepath)
-                        logging.info(f"Full screenshot saved to: {filepath}")
-                        return filepath
-                else:
-                    logging.error("No screenshot method available.")
-                    return None
+                logging.error("No screenshot method available.")
+                return None
+        else:
+            # Capture full screen
+            logging.warning("Capturing full screen screenshot")
+            if PIL_AVAILABLE:
+                return ImageGrab.grab()
+            elif PYAUTOGUI_AVAILABLE:
+                return pyautogui.screenshot()
+            else:
+                logging.error("No screenshot method available.")
+                return None
 
-        except Exception as e:
-            logging.error(f"Error capturing screenshot: {e}")
+    def poll_frame(self):
+        """
+        Grab the window region for continuous polling (used by ScreenWatcher)
+
+        Unlike grab_frame(), the window is not looked up or activated and there is no
+        activation delay, so this can run several times a second without stealing
+        focus. Logging is at DEBUG level.
+
+        Returns:
+            PIL.Image or None if PIL is not available
+        """
+        if not PIL_AVAILABLE:
+            logging.debug("PIL not available. Cannot poll screen frames.")
             return None
+        if not self.window_bounds:
+            logging.debug("No window bounds set - polling the full screen")
+            return ImageGrab.grab()
+
+        left = int(self.window_bounds['left'])
+        top = int(self.window_bounds['top'])
+        bbox = (left, top, left + int(self.window_bounds['width']), top + int(self.window_bounds['height']))
+        logging.debug(f"Polling screen region {bbox}")
+        return ImageGrab.grab(bbox=bbox)
 
     def save_screenshot(self, image, filename):
         """
@@ -165,34 +265,68 @@ class ScreenshotHandler:
         Uses efficient hash-based comparison to detect end of profile
         Returns True if identical, False otherwise
         """
+        return self.compare_screenshots_detailed(screenshot1_path, screenshot2_path)['identical']
+
+    @timed("compare")
+    def compare_screenshots_detailed(self, screenshot1_path, screenshot2_path):
+        """
+        Compare two screenshots through a cascade of increasingly expensive checks
+
+        A difference hash of a tiny thumbnail settles clearly identical and clearly
+        different frames. Only a distance in the uncertain band between them falls
+        through to the perceptual hash, or to pixel sampling without imagehash.
+
+        Args:
+            screenshot1_path: Path to the first screenshot
+            screenshot2_path: Path to the second screenshot
+
+        Returns:
+            dict: identical (bool), stage that settled it ('size', 'dhash', 'phash',
+                  'sampling' or 'error'), distance at that stage and the dhash distance
+        """
+        result = {'identical': False, 'stage': 'error', 'distance': None, 'dhash_distance': None}
         if not PIL_AVAILABLE:
             logging.error("PIL not available. Cannot compare screenshots.")
-            return False
+            return result
 
         try:
-            img1 = Image.open(screenshot1_path)
-            img2 = Image.open(screenshot2_path)
+            img1 = load_image(screenshot1_path)
+            img2 = load_image(screenshot2_path)
 
             # Check if images are identical in size
             if img1.size != img2.size:
-                return False
-
-            # Use perceptual hash for efficient comparison
-            # This is much faster than pixel-by-pixel comparison
+                result['stage'] = 'size'
+                return result
+
+            # Compare content only: static status/top/bottom bars would dilute the difference
+            chrome_mask = get_chrome_mask()
+            img1 = chrome_mask.apply(img1)
+            img2 = chrome_mask.apply(img2)
+
+            gray1 = img1.convert("L")
+            gray2 = img2.convert("L")
+
+            # Stage 1: difference hash on a 16x17 box-filtered thumbnail
+            distance = hamming_distance(difference_hash(gray1), difference_hash(gray2))
+            result['dhash_distance'] = distance
+            identical_max = COMPARE_CASCADE.get("identical_max", 4)
+            if distance <= identical_max or distance >= COMPARE_CASCADE.get("different_min", 96):
+                result.update(identical=distance <= identical_max, stage='dhash', distance=distance)
+                logging.info(f"Screenshot comparison (dhash): distance {distance}, identical: {result['identical']}")
+                return result
+
+            # Stage 2: perceptual hash for the uncertain band
             try:
                 import imagehash
-                hash1 = imagehash.phash(img1)
-                hash2 = imagehash.phash(img2)
-
-                # Calculate hamming distance between hashes
-                hash_diff = hash1 - hash2
+                hash_diff = imagehash.phash(gray1) - imagehash.phash(gray2)
 
                 # If hash difference is very small (less than 5), consider identical
                 # This indicates we've reached the end of scrollable content
-                is_identical = hash_diff < 5
-
-                logging.info(f"Screenshot comparison: hash difference {hash_diff}, identical: {is_identical}")
-                return is_identical
+                result.update(identical=hash_diff < COMPARE_CASCADE.get("phash_threshold", 5),
+                              stage='phash', distance=hash_diff)
+                logging.info(f"Screenshot comparison (phash): hash difference {hash_diff}, "
+                             f"dhash distance {distance}, identical: {result['identical']}")
+                return result
 
             except ImportError:
                 # Fallback to simple pixel sampling if imagehash not available
@@ -211,31 +345,37 @@ class ScreenshotHandler:
 
                 # If less than 2% of sampled pixels differ, consider identical
                 diff_percentage = diff_pixels / total_samples if total_samples > 0 else 0
-                is_identical = diff_percentage < 0.02
+                result.update(identical=diff_percentage < 0.02, stage='sampling', distance=diff_percentage)
 
-                logging.info(f"Screenshot comparison (sampling): {diff_percentage:.2%} difference, identical: {is_identical}")
-                return is_identical
+                logging.info(f"Screenshot comparison (sampling): {diff_percentage:.2%} difference, "
+                             f"identical: {result['identical']}")
+                return result
 
         except Exception as e:
             logging.error(f"Error comparing screenshots: {e}")
-            return False
+            return result
 
     def cleanup_old_screenshots(self, keep_recent=10):
         """
-        Remove old screenshot files, keeping the most recent ones
+        Remove old screenshot files of this run, keeping the most recent ones
+
+        Previous runs are archived and expired as whole directories by the artifact
+        store; this only trims the current run's directory. The directory is read in
+        one scandir pass and frames are dropped through the screenshot writer, which
+        also cancels any write still queued for them.
         """
         try:
-            files = [f for f in os.listdir(self.screenshot_dir) if f.endswith(f".{SCREENSHOT_FORMAT}")]
+            with os.scandir(self.screenshot_dir) as entries:
+                files = [(entry.stat().st_mtime, entry.path) for entry in entries
+                         if entry.name.endswith(f".{SCREENSHOT_FORMAT}")]
             if len(files) <= keep_recent:
                 return
 
-            files.sort(key=lambda x: os.path.getmtime(os.path.join(self.screenshot_dir, x)))
-            files_to_delete = files[:-keep_recent]
-
-            for file in files_to_delete:
-                filepath = os.path.join(self.screenshot_dir, file)
-                os.remove(filepath)
-                logging.info(f"Deleted old screenshot: {filepath}")
+            files.sort()
+            writer = get_screenshot_writer()
+            for _, filepath in files[:-keep_recent]:
+                writer.discard(filepath)
+            logging.info(f"Deleted {len(files) - keep_recent} old screenshot(s) from {self.screenshot_dir}")
 
         except Exception as e:
             logging.error(f"Error cleaning up screenshots: {e}")
@@ -0,0 +1,403 @@
+"""
+Screenshot Writer Module
+Encodes and saves captured frames on background threads, off the automation's critical path
+"""
+
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from config import SCREENSHOT_FORMAT, SCREENSHOT_WRITER
+from instrumentation import get_instrumentation, percentile
+
+try:
+    import numpy as np
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logging.warning("PIL or numpy not available. Screenshots cannot be saved.")
+
+
+# Supported SCREENSHOT_FORMAT values
+FORMATS = ("png", "webp", "npy")
+
+
+def encode(image, f, image_format, compress_level=1, webp_method=0):
+    """
+    Write an image to an open binary file in one of FORMATS
+
+    Args:
+        image: PIL image
+        f: File object opened for binary writing
+        image_format: "png", "webp" (lossless) or "npy" (raw pixel array)
+        compress_level: zlib level for PNG (0 = store, 9 = smallest)
+        webp_method: Lossless WebP effort (0 = fastest, 6 = smallest)
+    """
+    if image_format == "png":
+        image.save(f, format="PNG", compress_level=compress_level)
+    elif image_format == "webp":
+        image.save(f, format="WEBP", lossless=True, method=webp_method)
+    elif image_format == "npy":
+        np.save(f, np.asarray(image))
+    else:
+        raise ValueError(f"Unsupported screenshot format: {image_format}")
+
+
+class ScreenshotWriter:
+    """
+    Background pool persisting captured frames
+
+    submit() keeps the frame in memory and queues it; worker threads encode it to a
+    temporary file and rename it into place, so a reader never sees a partial file.
+    Frames stay available through cached() / load_image() while they are queued and
+    for a while after, so consumers do not wait for the disk. The queue is bounded:
+    when it is full, submit() blocks until a worker frees a slot and counts a stall.
+    """
+
+    def __init__(self, image_format=None, asynchronous=None, workers=None, queue_size=None,
+                 compress_level=None, webp_method=None, cache_size=None):
+        """
+        Initialize the writer (worker threads start on the first submit)
+
+        Args:
+            image_format: One of FORMATS (defaults to SCREENSHOT_FORMAT)
+            asynchronous: Write on worker threads (False writes inside submit())
+            workers: Number of worker threads
+            queue_size: Frames that may wait for a worker before submit() blocks
+            compress_level: zlib level for PNG
+            webp_method: Lossless WebP effort
+            cache_size: Recently submitted frames kept in memory
+        """
+        self.image_format = (image_format or SCREENSHOT_FORMAT).lower()
+        if self.image_format not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {self.image_format} (use one of {FORMATS})")
+        self.asynchronous = (asynchronous if asynchronous is not None
+                             else SCREENSHOT_WRITER.get("asynchronous", True))
+        self.workers = workers or SCREENSHOT_WRITER.get("workers", 2)
+        self.compress_level = (compress_level if compress_level is not None
+                               else SCREENSHOT_WRITER.get("png_compress_level", 1))
+        self.webp_method = webp_method if webp_method is not None else SCREENSHOT_WRITER.get("webp_method", 0)
+        self.cache_size = cache_size if cache_size is not None else SCREENSHOT_WRITER.get("cache_size", 32)
+
+        self._queue = queue.Queue(maxsize=queue_size or SCREENSHOT_WRITER.get("queue_size", 16))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        # path -> (sequence, Event) of the newest submitted frame not yet on disk
+        self._pending = {}
+        # path -> sequence of the newest submit() or discard(); older queued writes are skipped
+        self._latest = {}
+        # path -> lock serialising writes and deletes, and the number of queued writes and
+        # discards using it; both entries (and _latest) are dropped when that reaches zero
+        self._path_locks = {}
+        self._path_users = {}
+        self._sequence = 0
+
+        self.written = 0
+        self.failed = 0
+        self.stalls = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=1000)
+
+    def path_for(self, path):
+        """
+        Give a path the extension of the configured format
+        """
+        return os.path.splitext(path)[0] + "." + self.image_format
+
+    def submit(self, image, path, on_encoded=None):
+        """
+        Queue a frame to be saved
+
+        Args:
+            image: PIL image (must not be modified afterwards)
+            path: Destination path; its extension is replaced by the configured format
+            on_encoded: Optional callable receiving the encoded bytes (None if encoding
+                        failed) on the worker thread, even if the write is skipped
+
+        Returns:
+            str: Path the frame will be written to
+        """
+        path = self.path_for(path)
+        submitted = time.perf_counter()
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            self._latest[path] = sequence
+            self._pending[path] = (sequence, threading.Event())
+            self._acquire_path(path)
+            self._cache[path] = image
+            self._cache.move_to_end(path)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        item = (image, path, sequence, submitted, on_encoded)
+        if not self.asynchronous:
+            self._write(*item)
+            return path
+
+        self._start_workers()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.stalls += 1
+            logging.warning(f"Screenshot write queue full ({self._queue.maxsize}), waiting for a worker")
+            stall_start = time.perf_counter()
+            self._queue.put(item)
+            get_instrumentation().record("screenshot_queue_stall", time.perf_counter() - stall_start)
+
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return path
+
+    def _acquire_path(self, path):
+        """
+        Register a user of a path's lock (call with self._lock held)
+
+        Returns:
+            threading.Lock: The path's lock
+        """
+        self._path_users[path] = self._path_users.get(path, 0) + 1
+        return self._path_locks.setdefault(path, threading.Lock())
+
+    def _release_path(self, path):
+        """
+        Unregister a user of a path's lock, forgetting the path once unused (call with self._lock held)
+        """
+        self._path_users[path] -= 1
+        if not self._path_users[path]:
+            del self._path_users[path]
+            del self._path_locks[path]
+            self._latest.pop(path, None)
+
+    def _start_workers(self):
+        """
+        Start the worker threads if they are not running
+        """
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"screenshot-writer-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self):
+        """
+        Write queued frames until a None sentinel arrives
+        """
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, image, path, sequence, submitted, on_encoded=None):
+        """
+        Encode one frame and write it to a temporary file renamed into place
+
+        Frames for the same path are written one at a time, and a frame superseded by
+        a newer submission (or a discard) for its path is not written (it is still
+        encoded if on_encoded wants the bytes).
+        """
+        with self._lock:
+            path_lock = self._path_locks[path]
+
+        data = None
+        try:
+            with path_lock:
+                with self._lock:
+                    superseded = self._latest.get(path, sequence) > sequence
+                if not superseded or on_encoded:
+                    buffer = io.BytesIO()
+                    encode(image, buffer, self.image_format, self.compress_level, self.webp_method)
+                    data = buffer.getvalue()
+                if not superseded:
+                    directory = os.path.dirname(path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    temp_path = f"{path}.{sequence}.tmp"
+                    with open(temp_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(temp_path, path)
+                    with self._lock:
+                        self.written += 1
+        except Exception as e:
+            logging.error(f"Error saving screenshot {path}: {e}")
+            with self._lock:
+                self.failed += 1
+        finally:
+            latency = time.perf_counter() - submitted
+            get_instrumentation().record("screenshot_write", latency)
+            with self._lock:
+                self.latencies.append(latency)
+                pending = self._pending.get(path)
+                if pending and pending[0] == sequence:
+                    del self._pending[path]
+                    pending[1].set()
+                self._release_path(path)
+            if on_encoded:
+                try:
+                    on_encoded(data)
+                except Exception as e:
+                    logging.error(f"Error handing encoded screenshot {path} on: {e}")
+
+    def discard(self, path):
+        """
+        Drop a frame that is no longer wanted
+
+        A queued write for the path is cancelled, and the file is deleted once any
+        write in progress has finished.
+
+        Args:
+            path: Screenshot path returned by submit()
+        """
+        with self._lock:
+            self._sequence += 1
+            self._latest[path] = self._sequence
+            self._cache.pop(path, None)
+            pending = self._pending.pop(path, None)
+            path_lock = self._acquire_path(path)
+
+        try:
+            with path_lock:
+                if os.path.exists(path):
+                    os.remove(path)
+        finally:
+            with self._lock:
+                self._release_path(path)
+            if pending:
+                pending[1].set()
+
+    def cached(self, path):
+        """
+        Get a recently submitted frame from memory
+
+        Returns:
+            PIL image, or None if the path is not cached
+        """
+        with self._lock:
+            return self._cache.get(path)
+
+    def wait_for(self, path, timeout=None):
+        """
+        Wait until the newest frame submitted for a path is on disk
+
+        Args:
+            path: Screenshot path returned by submit()
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            bool: True if nothing is pending for the path any more
+        """
+        with self._lock:
+            pending = self._pending.get(path)
+        return pending is None or pending[1].wait(timeout)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every submitted frame is on disk
+
+        Returns:
+            bool: True if all writes finished within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            events = [event for _, event in self._pending.values()]
+        for event in events:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not event.wait(remaining):
+                return False
+        return True
+
+    def stats(self):
+        """
+        Summarise writer activity
+
+        Returns:
+            dict: frames written/failed, frames still pending, current and maximum
+                  queue depth, stalls and p50/p95 submit-to-disk latency in seconds
+        """
+        with self._lock:
+            latencies = list(self.latencies)
+            return {
+                'format': self.image_format,
+                'written': self.written,
+                'failed': self.failed,
+                'pending': len(self._pending),
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'stalls': self.stalls,
+                'write_p50_s': round(percentile(latencies, 50), 4),
+                'write_p95_s': round(percentile(latencies, 95), 4)
+            }
+
+    def close(self, timeout=None):
+        """
+        Write everything still queued and stop the worker threads
+        """
+        self.flush(timeout)
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+
+def load_image(path):
+    """
+    Open a screenshot, from memory if it was submitted recently
+
+    Frames still being written are served from the writer's cache; older ones are
+    read from disk (after any pending write for the path has finished).
+
+    Args:
+        path: Screenshot path
+
+    Returns:
+        PIL image
+    """
+    writer = get_screenshot_writer()
+    image = writer.cached(path)
+    if image is not None:
+        return image
+    writer.wait_for(path)
+    if path.endswith(".npy"):
+        return Image.fromarray(np.load(path))
+    return Image.open(path)
+
+def image_file_bytes(path):
+    """
+    Read a screenshot file once any pending write for it has finished
+
+    Returns:
+        bytes: File contents
+    """
+    get_screenshot_writer().wait_for(path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+# Global instance for easy access
+_screenshot_writer = None
+
+def get_screenshot_writer():
+    """
+    Get the global screenshot writer instance
+
+    Returns:
+        ScreenshotWriter instance
+    """
+    global _screenshot_writer
+    if _screenshot_writer is None:
+        _screenshot_writer = ScreenshotWriter()
+    return _screenshot_writer
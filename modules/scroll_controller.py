@@ -0,0 +1,181 @@
+"""
+Scroll Controller Module
+Adapts the profile swipe length to the scroll displacement measured between captures
+"""
+
+import logging
+from config import SCROLLING
+from frame_stitcher import FrameStitcher, STITCHING_AVAILABLE
+from screenshot_writer import load_image
+
+if STITCHING_AVAILABLE:
+    import numpy as np
+
+# Factor applied to the gain's lower bound after a swipe moved past the overlap
+OVERSHOOT_BACKOFF = 1.5
+
+# A swipe moving less than this fraction of the expected rows was stopped by the profile end
+SHORT_SCROLL_RATIO = 0.5
+
+class ScrollController:
+    """
+    Plans profile swipes so consecutive captures overlap by a small target amount
+
+    After every swipe the content displacement between the previous and the new
+    capture is measured with the frame stitcher's offset estimation. The ratio of
+    displacement (frame pixels) to swipe length (window pixels) is the scroll gain
+    for this device and window scale; the next swipe is sized so the expected
+    displacement leaves target_overlap of the content visible in both frames.
+    Swipe duration follows the length at a constant drag speed.
+    """
+
+    def __init__(self, stitcher=None, target_overlap=None, initial_fraction=None, min_fraction=None,
+                 max_fraction=None, start_fraction=None, speed=None, min_duration=None, max_duration=None,
+                 smoothing=None):
+        """
+        Initialize the scroll controller
+
+        Args:
+            stitcher: FrameStitcher used for offset estimation (a default one if None)
+            target_overlap: Fraction of the content height shared by consecutive captures
+            initial_fraction: Swipe length before any measurement, as a fraction of window height
+            min_fraction: Shortest swipe as a fraction of window height
+            max_fraction: Longest swipe as a fraction of window height
+            start_fraction: Swipe start position as a fraction of window height from the top
+            speed: Drag speed in window heights per second (sets the swipe duration)
+            min_duration: Shortest swipe duration in seconds
+            max_duration: Longest swipe duration in seconds
+            smoothing: Weight of the newest gain measurement (1.0 keeps only the latest)
+        """
+        self.stitcher = stitcher or FrameStitcher()
+        self.target_overlap = target_overlap if target_overlap is not None else SCROLLING.get("target_overlap", 0.1)
+        self.initial_fraction = initial_fraction or SCROLLING.get("initial_fraction", 0.8)
+        self.min_fraction = min_fraction or SCROLLING.get("min_fraction", 0.3)
+        self.max_fraction = max_fraction or SCROLLING.get("max_fraction", 0.85)
+        self.start_fraction = start_fraction or SCROLLING.get("start_fraction", 0.9)
+        self.speed = speed or SCROLLING.get("speed", 1.6)
+        self.min_duration = min_duration if min_duration is not None else SCROLLING.get("min_duration", 0.2)
+        self.max_duration = max_duration if max_duration is not None else SCROLLING.get("max_duration", 1.5)
+        self.smoothing = smoothing if smoothing is not None else SCROLLING.get("smoothing", 0.5)
+
+        # Frame pixels of content movement per window pixel of swipe, learned across profiles
+        self.gain = None
+        self._gain_before_last_update = None
+        self.content_rows = None
+        self.last_swipe = None
+        self.profile_stats = None
+        self.begin_profile()
+
+    def begin_profile(self):
+        """
+        Reset the per-profile capture counters (the learned gain is kept)
+        """
+        self.profile_stats = {'captures': 0, 'swipes': 0, 'displacements': [], 'overlaps': []}
+
+    def record_first_capture(self):
+        """
+        Count the capture taken before the first swipe
+        """
+        self.profile_stats['captures'] += 1
+
+    def next_swipe(self, dimensions):
+        """
+        Plan the next swipe
+
+        Args:
+            dimensions: Window dimensions dict with 'width' and 'height'
+
+        Returns:
+            tuple: (start_x, start_y, end_x, end_y, duration)
+        """
+        height = dimensions['height']
+        fraction = self.initial_fraction
+        if self.gain and self.content_rows:
+            target_rows = self.content_rows * (1 - self.target_overlap)
+            fraction = target_rows / self.gain / height
+        fraction = min(max(fraction, self.min_fraction), self.max_fraction, self.start_fraction)
+
+        length = int(height * fraction)
+        start_y = int(height * self.start_fraction)
+        center_x = dimensions['width'] // 2
+        duration = min(max(fraction / self.speed, self.min_duration), self.max_duration)
+
+        self.last_swipe = length
+        self.profile_stats['swipes'] += 1
+        return center_x, start_y, center_x, start_y - length, round(duration, 3)
+
+    def measure(self, previous, current):
+        """
+        Measure the scroll displacement between two captures and update the gain
+
+        Args:
+            previous: Capture before the swipe (PIL image or path)
+            current: Capture after the swipe (PIL image or path)
+
+        Returns:
+            dict: displacement (content rows moved, None if no overlap matched),
+                  expected (rows the swipe should have moved, None before the gain is known),
+                  overlap (fraction of content shared), content_rows, gain
+        """
+        self.profile_stats['captures'] += 1
+        unmeasured = {'displacement': None, 'expected': None, 'overlap': None, 'content_rows': None,
+                      'gain': self.gain}
+        if not STITCHING_AVAILABLE:
+            return unmeasured
+
+        frames = [np.asarray((load_image(f) if isinstance(f, str) else f).convert("RGB"))
+                  for f in (previous, current)]
+        if frames[0].shape != frames[1].shape:
+            logging.warning("Capture size changed between swipes; scroll displacement not measured")
+            return unmeasured
+        header, footer = self.stitcher.find_static_rows(frames)
+        height = frames[0].shape[0]
+        rows = height - header - footer
+        self.content_rows = rows
+
+        profiles = [self.stitcher.row_profile(frame[header:height - footer]) for frame in frames]
+        displacement, _ = self.stitcher.estimate_offset(*profiles)
+        expected = round(self.gain * self.last_swipe) if self.gain and self.last_swipe else None
+
+        overlap = None
+        if displacement is None:
+            # Moved past the overlap limit: the gain is at least content / swipe length, and
+            # probably well above it, so back off firmly to avoid skipping content again
+            if self.last_swipe:
+                self.gain = max(self.gain or 0.0, rows / self.last_swipe) * OVERSHOOT_BACKOFF
+        else:
+            overlap = round(1 - displacement / rows, 4)
+            if displacement > 0:
+                self.profile_stats['overlaps'].append(overlap)
+                # A swipe cut short by the end of the profile says nothing about the gain
+                cut_short = expected is not None and displacement < expected * SHORT_SCROLL_RATIO
+                if self.last_swipe and not cut_short:
+                    measured = displacement / self.last_swipe
+                    self._gain_before_last_update = self.gain
+                    self.gain = measured if self.gain is None else (
+                        self.smoothing * measured + (1 - self.smoothing) * self.gain)
+            elif self.profile_stats['displacements'] and self.profile_stats['displacements'][-1]:
+                # The profile stopped moving: the swipe before this one was cut short by the
+                # bottom of the profile, so its measurement understates the gain
+                if self._gain_before_last_update is not None:
+                    self.gain = self._gain_before_last_update
+
+        self.profile_stats['displacements'].append(displacement)
+        logging.info(f"Scroll moved {displacement} of {rows} content rows (overlap {overlap}, "
+                     f"swipe {self.last_swipe}px, gain {self.gain and round(self.gain, 3)})")
+        return {'displacement': displacement, 'expected': expected, 'overlap': overlap, 'content_rows': rows,
+                'gain': self.gain}
+
+    def end_profile(self):
+        """
+        Summarise the captures and swipes used for the current profile
+
+        Returns:
+            dict: captures, swipes, mean_overlap
+        """
+        overlaps = self.profile_stats['overlaps']
+        return {
+            'captures': self.profile_stats['captures'],
+            'swipes': self.profile_stats['swipes'],
+            'mean_overlap': round(sum(overlaps) / len(overlaps), 4) if overlaps else None
+        }
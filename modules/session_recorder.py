@@ -0,0 +1,526 @@
+"""
+Session Recorder Module
+Writes a run (frames, actions, LLM calls) into a single indexed archive file
+"""
+
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+from config import RECORDING
+from screenshot_writer import image_file_bytes
+
+try:
+    import numpy as np
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logging.warning("PIL not available. Archive frames can only be read as bytes.")
+
+# Archive layout:
+#   header  MAGIC
+#   chunks  CHUNK (kind, length) followed by its payload, appended while recording:
+#           FRAME_CHUNK   an encoded frame image, each stored once (deduplicated by sha256)
+#           EVENTS_CHUNK  UTF-8 JSON list of the events settled since the previous one
+#   events  UTF-8 JSON list of all timestamped events
+#   index   one fixed-width INDEX_RECORD per unique frame (sha256, offset, length)
+#   footer  FOOTER (magic, index offset, frame count, events offset, events length)
+# Events, index and footer are written by close(). The chunks alone are enough to
+# rebuild a session whose recorder never closed (crash or kill).
+MAGIC = b"HNGREC01"
+CHUNK = struct.Struct("<cI")
+FRAME_CHUNK = b"F"
+EVENTS_CHUNK = b"E"
+INDEX_RECORD = struct.Struct("<32sQQ")
+FOOTER = struct.Struct("<8sQQQQ")
+ARCHIVE_EXTENSION = ".hrec"
+
+# Frames may also be stored as raw .npy arrays (SCREENSHOT_FORMAT = "npy")
+NPY_MAGIC = b"\x93NUMPY"
+
+# Seconds close() waits for frames still being encoded
+FRAME_TIMEOUT = 30
+
+
+def request_digest(prompt, system=None, images=None, frame_digest=None):
+    """
+    Hash an LLM request (prompt, system and image bytes) for later matching
+
+    Args:
+        prompt: Prompt text
+        system: Optional system message
+        images: Optional list of image file paths
+        frame_digest: Optional callable returning the sha256 digest of an image
+            path's bytes, or None to read and hash the file
+
+    Returns:
+        str: Hex sha256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(prompt.encode("utf-8"))
+    digest.update((system or "").encode("utf-8"))
+    for path in images or []:
+        image_digest = frame_digest(path) if frame_digest else None
+        if image_digest is None:
+            try:
+                image_digest = hashlib.sha256(image_file_bytes(path)).digest()
+            except OSError:
+                image_digest = str(path).encode("utf-8")
+        digest.update(image_digest)
+    return digest.hexdigest()
+
+
+class SessionRecorder:
+    """
+    Streams a session into an archive file while the automation runs
+
+    Frames are appended as they are captured; identical frames (same sha256)
+    are stored once and referenced by index. A frame event is logged at capture
+    time and its frame index filled in once the frame has been encoded, off the
+    capture thread. Events are appended to the file in order as they settle (a
+    frame event once its frame is stored), so a killed run loses at most the
+    events after the first frame still being encoded. close() adds the full
+    event list, the frame index and the footer.
+    """
+
+    def __init__(self, output_path=None):
+        """
+        Initialize the recorder and open the archive file
+
+        Args:
+            output_path: Archive path (defaults to RECORDING output_dir)
+        """
+        if output_path is None:
+            run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = os.path.join(RECORDING.get("output_dir", "logs"), f"session_{run_id}{ARCHIVE_EXTENSION}")
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        self.output_path = output_path
+        self.start_time = time.time()
+        self.events = []
+        self.frame_index = {}
+        self.frame_entries = []
+        self.closed = False
+        self._file = open(output_path, 'wb')
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        # Ids of frame events whose bytes have not been stored yet
+        self._pending = set()
+        self._frames_stored = threading.Condition(self._lock)
+        # Number of events already appended as chunks
+        self._journaled = 0
+        # Path -> frame event of the latest capture saved to that path
+        self._latest_frames = {}
+        self._frames = queue.Queue()
+        self._frame_thread = None
+
+    def _event(self, event_type, **fields):
+        """
+        Append a timestamped event
+
+        Returns:
+            dict: The event
+        """
+        event = {'t': round(time.time() - self.start_time, 4), 'type': event_type, **fields}
+        self.events.append(event)
+        return event
+
+    def _write_chunk(self, kind, payload):
+        """
+        Append one chunk to the archive
+
+        Returns:
+            int: File offset of the payload
+        """
+        self._file.write(CHUNK.pack(kind, len(payload)))
+        offset = self._file.tell()
+        self._file.write(payload)
+        return offset
+
+    def _journal(self):
+        """
+        Append the events settled since the last chunk and hand the file to the OS
+
+        Events are written in order, up to the first frame event whose frame is still
+        being encoded. Frame events without a frame (encoding failed) are left out.
+        """
+        if self.closed:
+            return
+        settled = []
+        while self._journaled < len(self.events):
+            event = self.events[self._journaled]
+            if id(event) in self._pending:
+                break
+            if not (event['type'] == 'frame' and event['frame'] is None):
+                settled.append(event)
+            self._journaled += 1
+        if settled:
+            self._write_chunk(EVENTS_CHUNK, json.dumps(settled).encode("utf-8"))
+        self._file.flush()
+
+    def begin_profile(self, profile_number):
+        """
+        Mark the start of a profile
+        """
+        with self._lock:
+            self._event('profile', profile=profile_number)
+            self._journal()
+
+    def reserve_frame(self, name=None, path=None):
+        """
+        Log a frame event now and store the frame's bytes later
+
+        The event keeps its place among actions and LLM calls; the returned callback
+        stores the encoded frame (deduplicated) and fills in the event's frame index.
+        The screenshot writer calls it with the bytes it encodes for the capture.
+
+        Args:
+            name: Capture name (e.g. the screenshot filename)
+            path: File the frame is saved to, whose digest frame_digest() then returns
+
+        Returns:
+            callable: Takes the encoded image bytes (None if encoding failed)
+        """
+        with self._lock:
+            event = self._event('frame', frame=None, name=name)
+            self._pending.add(id(event))
+            if path is not None:
+                self._latest_frames[path] = event
+        return lambda data: self._store_frame(event, data)
+
+    def _store_frame(self, event, data):
+        """
+        Store encoded frame bytes once and point a reserved frame event at them
+        """
+        digest = hashlib.sha256(data).digest() if data is not None else None
+        with self._lock:
+            if digest is not None and not self.closed:
+                index = self.frame_index.get(digest)
+                if index is None:
+                    index = len(self.frame_entries)
+                    self.frame_entries.append((digest, self._write_chunk(FRAME_CHUNK, data), len(data)))
+                    self.frame_index[digest] = index
+                event['frame'] = index
+            self._pending.discard(id(event))
+            self._journal()
+            self._frames_stored.notify_all()
+
+    def frame_digest(self, path):
+        """
+        Get the sha256 digest of the frame last captured to a path
+
+        The digest was computed when the frame was stored, so LLM requests are
+        fingerprinted without reading and hashing their images again.
+
+        Args:
+            path: Screenshot path passed to reserve_frame()
+
+        Returns:
+            bytes: sha256 digest of the saved bytes, or None if the path has no stored frame
+        """
+        with self._lock:
+            event = self._latest_frames.get(path)
+            if event is None:
+                return None
+            self._frames_stored.wait_for(lambda: id(event) not in self._pending, timeout=FRAME_TIMEOUT)
+            if event['frame'] is None:
+                return None
+            return self.frame_entries[event['frame']][0]
+
+    def record_frame(self, data, name=None):
+        """
+        Log a frame event and store the frame on a background thread
+
+        Args:
+            data: Encoded image bytes, a PIL image, or a path to an image file
+            name: Capture name (e.g. the screenshot filename)
+        """
+        store = self.reserve_frame(name)
+        with self._lock:
+            if self._frame_thread is None:
+                self._frame_thread = threading.Thread(target=self._frame_worker, name="recorder-frames",
+                                                      daemon=True)
+                self._frame_thread.start()
+        self._frames.put((store, data))
+
+    def _frame_worker(self):
+        """
+        Encode queued frames until a None sentinel arrives
+        """
+        while True:
+            item = self._frames.get()
+            if item is None:
+                return
+            store, data = item
+            try:
+                if isinstance(data, str):
+                    with open(data, 'rb') as f:
+                        data = f.read()
+                elif not isinstance(data, (bytes, bytearray)):
+                    buffer = io.BytesIO()
+                    data.save(buffer, format="PNG", compress_level=1)
+                    data = buffer.getvalue()
+            except Exception as e:
+                logging.error(f"Error encoding recorded frame: {e}")
+                data = None
+            store(data)
+
+    def record_action(self, action, **args):
+        """
+        Log a device action (click, swipe, type)
+        """
+        with self._lock:
+            self._event('action', action=action, args=args)
+            self._journal()
+
+    def record_llm(self, purpose, digest, response, duration_s, images=0):
+        """
+        Log an LLM request digest and its response
+        """
+        with self._lock:
+            self._event('llm', purpose=purpose, digest=digest, response=response,
+                        duration_s=round(duration_s, 4), images=images)
+            self._journal()
+
+    def close(self):
+        """
+        Write events, frame index and footer, then close the archive
+
+        Returns:
+            str: Path of the archive
+        """
+        with self._lock:
+            if self.closed:
+                return self.output_path
+
+            if not self._frames_stored.wait_for(lambda: not self._pending, timeout=FRAME_TIMEOUT):
+                logging.warning(f"{len(self._pending)} recorded frame(s) not stored before closing the archive")
+            if self._frame_thread is not None:
+                self._frames.put(None)
+
+            # Frames that could not be encoded are left out
+            events = [event for event in self.events if not (event['type'] == 'frame' and event['frame'] is None)]
+            events_offset = self._file.tell()
+            events_data = json.dumps(events).encode("utf-8")
+            self._file.write(events_data)
+
+            index_offset = self._file.tell()
+            for digest, offset, length in self.frame_entries:
+                self._file.write(INDEX_RECORD.pack(digest, offset, length))
+
+            self._file.write(FOOTER.pack(MAGIC, index_offset, len(self.frame_entries),
+                                         events_offset, len(events_data)))
+            self._file.close()
+            self.closed = True
+
+        logging.info(f"Session archive written to: {self.output_path} "
+                     f"({len(self.frame_entries)} unique frames, {len(events)} events)")
+        return self.output_path
+
+
+class SessionArchive:
+    """
+    Random-access reader for a session archive
+
+    The file is memory-mapped; only the footer and the events are parsed up
+    front, and each frame is sliced out of the map on demand through the
+    fixed-width index. An archive whose recorder never closed has no footer; its
+    events and frames are recovered from the chunks written during the run.
+    """
+
+    def __init__(self, path):
+        """
+        Open an archive
+
+        Args:
+            path: Archive file path
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Index records rebuilt from the chunks when the footer is missing
+        self._entries = None
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a session archive: {path}")
+
+        footer = None
+        if len(self._map) >= len(MAGIC) + FOOTER.size:
+            footer = FOOTER.unpack_from(self._map, len(self._map) - FOOTER.size)
+        if footer is None or footer[0] != MAGIC:
+            self._recover()
+            return
+
+        _, self._index_offset, self.frame_count, events_offset, events_length = footer
+        self.events = json.loads(self._map[events_offset:events_offset + events_length].decode("utf-8"))
+
+    def _recover(self):
+        """
+        Rebuild events and frame index from the chunks of an unclosed archive
+
+        Chunks are read in order up to the first one that is incomplete.
+        """
+        self._entries = []
+        self.events = []
+        position = len(MAGIC)
+        while position + CHUNK.size <= len(self._map):
+            kind, length = CHUNK.unpack_from(self._map, position)
+            start = position + CHUNK.size
+            if kind not in (FRAME_CHUNK, EVENTS_CHUNK) or start + length > len(self._map):
+                break
+            payload = self._map[start:start + length]
+            if kind == FRAME_CHUNK:
+                self._entries.append((hashlib.sha256(payload).digest(), start, length))
+            else:
+                try:
+                    self.events.extend(json.loads(payload.decode("utf-8")))
+                except ValueError:
+                    break
+            position = start + length
+
+        self.frame_count = len(self._entries)
+        logging.warning(f"Session archive {self.path} was not closed - recovered "
+                        f"{len(self.events)} events and {self.frame_count} frames")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map and file handle
+        """
+        self._map.close()
+        self._file.close()
+
+    def _entry(self, index):
+        """
+        Read one index record
+        """
+        if not 0 <= index < self.frame_count:
+            raise IndexError(f"Frame {index} out of range (archive has {self.frame_count})")
+        if self._entries is not None:
+            return self._entries[index]
+        return INDEX_RECORD.unpack_from(self._map, self._index_offset + index * INDEX_RECORD.size)
+
+    def frame_digest(self, index):
+        """
+        Get the sha256 hex digest of a stored frame
+        """
+        return self._entry(index)[0].hex()
+
+    def frame_bytes(self, index):
+        """
+        Get the encoded bytes of a stored frame
+
+        Args:
+            index: Frame index as referenced by frame events
+
+        Returns:
+            bytes
+        """
+        _, offset, length = self._entry(index)
+        return self._map[offset:offset + length]
+
+    def frame_image(self, index):
+        """
+        Decode a stored frame
+
+        Returns:
+            PIL.Image in RGB mode
+        """
+        data = self.frame_bytes(index)
+        if data[:len(NPY_MAGIC)] == NPY_MAGIC:
+            return Image.fromarray(np.load(io.BytesIO(data))).convert("RGB")
+        return Image.open(io.BytesIO(data)).convert("RGB")
+
+    def events_of_type(self, event_type):
+        """
+        Get all events of one type, in recording order
+        """
+        return [event for event in self.events if event['type'] == event_type]
+
+    def llm_responses(self):
+        """
+        Group recorded LLM responses by purpose
+
+        Returns:
+            dict: purpose -> list of responses in call order
+        """
+        responses = {}
+        for event in self.events_of_type('llm'):
+            responses.setdefault(event['purpose'] or 'unspecified', []).append(event['response'])
+        return responses
+
+    def profiles(self):
+        """
+        Split frame events into per-profile replay sequences
+
+        Frames captured before the profile's first click are its scroll frames
+        (consecutive duplicates collapsed); frames captured after a click are
+        the post-click frames.
+
+        Returns:
+            list of dicts with 'frames' and 'post_click' frame indices
+        """
+        profiles = []
+        current = None
+        for event in self.events:
+            if event['type'] == 'profile':
+                current = {'frames': [], 'post_click': [], 'clicked': False}
+                profiles.append(current)
+            elif current is None:
+                continue
+            elif event['type'] == 'action' and event['action'] == 'click':
+                current['clicked'] = True
+            elif event['type'] == 'frame':
+                target = current['post_click'] if current['clicked'] else current['frames']
+                if not target or target[-1] != event['frame']:
+                    target.append(event['frame'])
+
+        return [{'frames': p['frames'], 'post_click': p['post_click']} for p in profiles if p['frames']]
+
+
+class RecordingLLM:
+    """
+    LLM wrapper logging every request digest and response to a SessionRecorder
+    """
+
+    def __init__(self, llm, recorder):
+        """
+        Wrap an LLM
+
+        Args:
+            llm: LLM implementing generate()
+            recorder: SessionRecorder receiving the calls
+        """
+        self.llm = llm
+        self.recorder = recorder
+        self.model = getattr(llm, 'model', None)
+
+    def warm_up(self):
+        if hasattr(self.llm, 'warm_up'):
+            return self.llm.warm_up()
+        return True
+
+    def generate(self, prompt, system=None, options=None, images=None, purpose=None):
+        """
+        Generate with the wrapped LLM and record the call
+        """
+        start = time.time()
+        response = self.llm.generate(prompt=prompt, system=system, options=options,
+                                     images=images, purpose=purpose)
+        digest = request_digest(prompt, system, images, frame_digest=self.recorder.frame_digest)
+        self.recorder.record_llm(purpose, digest, response, time.time() - start, images=len(images or []))
+        return response
@@ -0,0 +1,144 @@
+"""
+Startup Orchestrator Module
+Runs independent startup tasks concurrently and reports a timing breakdown
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from instrumentation import span
+
+
+class StartupOrchestrator:
+    """
+    Runs named startup tasks in parallel, honouring simple dependencies
+
+    A task succeeds when its function returns a truthy value (or None) without
+    raising. Tasks whose dependencies failed are skipped. The run fails only if
+    a required task fails or is skipped.
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Initialize the orchestrator
+
+        Args:
+            max_workers: Maximum number of tasks running at once (defaults to one per task)
+        """
+        self.max_workers = max_workers
+        self.tasks = {}
+        self.results = {}
+        self.timings = {}
+        self.total_time = 0.0
+
+    def add_task(self, name, func, depends_on=None, required=True):
+        """
+        Register a startup task
+
+        Args:
+            name: Unique task name used in the timing report
+            func: Callable taking no arguments
+            depends_on: Names of tasks that must succeed before this one starts
+            required: Whether startup fails if this task fails
+        """
+        self.tasks[name] = {
+            'func': func,
+            'depends_on': list(depends_on or []),
+            'required': required
+        }
+
+    def succeeded(self, name):
+        """
+        Check whether a task completed successfully
+        """
+        return self.timings.get(name, {}).get('status') == 'ok'
+
+    def _run_task(self, name, started_at):
+        """
+        Execute a single task and record its timing
+        """
+        start = time.time()
+        status = 'ok'
+        result = None
+        try:
+            with span(f"startup.{name}"):
+                result = self.tasks[name]['func']()
+            if result is False:
+                status = 'failed'
+        except Exception as e:
+            logging.error(f"Startup task '{name}' raised: {e}")
+            status = 'failed'
+
+        self.results[name] = result
+        self.timings[name] = {
+            'start_offset': start - started_at,
+            'duration': time.time() - start,
+            'status': status,
+            'thread': threading.current_thread().name
+        }
+        return name
+
+    def run(self):
+        """
+        Run all registered tasks, starting each as soon as its dependencies succeed
+
+        Returns:
+            bool: True if every required task succeeded
+        """
+        started_at = time.time()
+        pending = dict(self.tasks)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers or max(len(self.tasks), 1),
+                                thread_name_prefix="startup") as executor:
+            while pending or running:
+                for name in list(pending):
+                    deps = pending[name]['depends_on']
+                    if any(dep in self.timings and not self.succeeded(dep) for dep in deps):
+                        logging.warning(f"Skipping startup task '{name}' - dependency failed")
+                        self.timings[name] = {'start_offset': time.time() - started_at, 'duration': 0.0,
+                                              'status': 'skipped', 'thread': None}
+                        del pending[name]
+                    elif all(self.succeeded(dep) for dep in deps):
+                        running[executor.submit(self._run_task, name, started_at)] = name
+                        del pending[name]
+
+                if not running:
+                    # Remaining tasks depend on unknown task names
+                    for name in pending:
+                        logging.error(f"Startup task '{name}' has unresolved dependencies")
+                        self.timings[name] = {'start_offset': 0.0, 'duration': 0.0,
+                                              'status': 'skipped', 'thread': None}
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+
+        self.total_time = time.time() - started_at
+        self.log_report()
+
+        return all(self.succeeded(name) for name, task in self.tasks.items() if task['required'])
+
+    def report(self):
+        """
+        Build a human readable timing breakdown
+
+        Returns:
+            str: Multi-line report with start offset, duration and status per task
+        """
+        serial_time = sum(t['duration'] for t in self.timings.values())
+        lines = [f"Startup timing breakdown: total {self.total_time:.2f}s "
+                 f"(serial would be {serial_time:.2f}s)"]
+        for name, timing in sorted(self.timings.items(), key=lambda item: item[1]['start_offset']):
+            lines.append(f"  {name:<20} +{timing['start_offset']:6.2f}s  "
+                         f"{timing['duration']:6.2f}s  {timing['status']}")
+        return "\n".join(lines)
+
+    def log_report(self):
+        """
+        Log the timing breakdown
+        """
+        for line in self.report().split("\n"):
+            logging.info(line)
@@ -0,0 +1,183 @@
+"""
+Stream Frame Source Module
+Captures frames by decoding scrcpy's video output instead of grabbing the desktop window
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from config import STREAM_CONFIG, TIMEOUTS
+from screenshot_handler import ScreenshotHandler
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+    logging.warning("opencv not available. Stream frame capture will be disabled.")
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+    logging.warning("PIL not available. Image processing will be limited.")
+
+
+class StreamFrameSource(ScreenshotHandler):
+    """
+    Screenshot handler backed by a decoded video stream
+
+    scrcpy can publish the device screen to a v4l2 sink (Linux) or any other source
+    readable by OpenCV. A background thread decodes that stream continuously into a
+    ring buffer of NumPy frames at device resolution, so captures never need the
+    mirror window to be on top and are free of desktop scaling artefacts.
+    """
+
+    def __init__(self, source=None, buffer_size=None, realtime=None):
+        """
+        Initialize the stream frame source
+
+        Args:
+            source: Video source understood by cv2.VideoCapture (device path, file, URL)
+            buffer_size: Number of recent frames kept in the ring buffer
+            realtime: Pace decoding at the stream's FPS (useful for recorded files)
+        """
+        super().__init__()
+        self.source = source if source is not None else STREAM_CONFIG.get("source")
+        self.buffer_size = buffer_size or STREAM_CONFIG.get("buffer_size", 8)
+        self.realtime = STREAM_CONFIG.get("realtime", False) if realtime is None else realtime
+        self.frames = deque(maxlen=self.buffer_size)
+        self.frame_count = 0
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._capture = None
+
+    def start(self):
+        """
+        Open the video source and start the background decode thread
+
+        Returns:
+            bool: True if the source was opened successfully
+        """
+        if not CV2_AVAILABLE:
+            logging.error("opencv not available. Cannot decode video stream.")
+            return False
+
+        if self._thread and self._thread.is_alive():
+            return True
+
+        self._capture = cv2.VideoCapture(self.source)
+        if not self._capture.isOpened():
+            logging.error(f"Could not open video source: {self.source}")
+            self._capture = None
+            return False
+
+        logging.info(f"Decoding video stream from: {self.source}")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._decode_loop, name="stream-decoder", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop the decode thread and release the video source
+        """
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def is_running(self):
+        """
+        Check if the decode thread is still consuming the stream
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def _decode_loop(self):
+        """
+        Continuously decode frames into the ring buffer until stopped or the stream ends
+        """
+        frame_interval = 0
+        if self.realtime:
+            fps = self._capture.get(cv2.CAP_PROP_FPS) or 0
+            frame_interval = 1.0 / fps if fps > 0 else 0
+
+        while not self._stop_event.is_set():
+            ok, frame = self._capture.read()
+            if not ok:
+                logging.info("Video stream ended or could not be read")
+                break
+
+            # OpenCV decodes to BGR; keep frames in RGB to match ImageGrab output
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with self._new_frame:
+                self.frames.append((time.time(), rgb))
+                self.frame_count += 1
+                self._new_frame.notify_all()
+
+            if frame_interval:
+                time.sleep(frame_interval)
+
+    def wait_for_frame(self, timeout=None):
+        """
+        Block until at least one frame has been decoded
+
+        Args:
+            timeout: Maximum time to wait in seconds (defaults to screenshot_capture timeout)
+
+        Returns:
+            bool: True if a frame is available
+        """
+        if timeout is None:
+            timeout = TIMEOUTS["screenshot_capture"]
+
+        with self._new_frame:
+            return self._new_frame.wait_for(lambda: len(self.frames) > 0, timeout=timeout)
+
+    def latest_array(self):
+        """
+        Get the most recently decoded frame
+
+        Returns:
+            numpy.ndarray (H, W, 3) in RGB order, or None if no frame is available
+        """
+        with self._lock:
+            if not self.frames:
+                return None
+            return self.frames[-1][1]
+
+    def poll_frame(self):
+        """
+        Grab the latest decoded frame for continuous polling (same as grab_frame)
+        """
+        return self.grab_frame()
+
+    def grab_frame(self):
+        """
+        Grab the latest decoded frame at device resolution
+
+        Returns:
+            PIL.Image or None if no frame is available
+        """
+        if not PIL_AVAILABLE:
+            logging.error("PIL not available. Cannot convert stream frame.")
+            return None
+
+        frame = self.latest_array()
+        if frame is None and self.is_running() and self.wait_for_frame():
+            frame = self.latest_array()
+
+        if frame is None:
+            logging.error("No decoded stream frame available")
+            return None
+
+        screenshot = Image.fromarray(frame)
+        logging.info(f"Captured stream frame size: {screenshot.size}")
+        return screenshot
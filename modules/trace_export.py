@@ -0,0 +1,97 @@
+"""
+Trace Export Module
+Records instrumentation spans as Chrome / Perfetto trace events
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from config import TRACE
+
+
+class TraceRecorder:
+    """
+    Collects spans as Chrome trace-event "complete" events
+
+    Register on_span as an Instrumentation listener; every capture, compare,
+    click, swipe, sleep, OCR and LLM call then appears on the thread that ran it.
+    The written file opens in chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self, output_path=None, process_name="hinge-automation"):
+        """
+        Initialize the trace recorder
+
+        Args:
+            output_path: Path of the JSON trace file (defaults to TRACE output_dir)
+            process_name: Name shown for the process in the trace viewer
+        """
+        if output_path is None:
+            run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = os.path.join(TRACE.get("output_dir", "logs"), f"trace_{run_id}.json")
+        self.output_path = output_path
+        self.pid = os.getpid()
+        self.base_time = time.perf_counter()
+        self.events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+            'args': {'name': process_name}
+        }]
+        self._known_threads = set()
+        self._lock = threading.Lock()
+
+    def on_span(self, stage, start, duration, args):
+        """
+        Instrumentation listener converting a finished span into a trace event
+
+        Args:
+            stage: Stage name
+            start: time.perf_counter() value when the span started
+            duration: Span duration in seconds
+            args: Extra span details
+        """
+        thread = threading.current_thread()
+        tid = threading.get_ident()
+        event = {
+            'name': stage,
+            'cat': stage.split('.')[0],
+            'ph': 'X',
+            'ts': round((start - self.base_time) * 1e6, 1),
+            'dur': round(duration * 1e6, 1),
+            'pid': self.pid,
+            'tid': tid,
+            'args': {key: value for key, value in args.items() if value is not None}
+        }
+
+        with self._lock:
+            if tid not in self._known_threads:
+                self._known_threads.add(tid)
+                self.events.append({
+                    'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                    'args': {'name': thread.name}
+                })
+            self.events.append(event)
+
+    def write(self):
+        """
+        Write all collected events to the trace file
+
+        Returns:
+            str: Path of the written trace, or None on failure
+        """
+        with self._lock:
+            events = list(self.events)
+
+        try:
+            directory = os.path.dirname(self.output_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.output_path, 'w') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+            logging.info(f"Trace with {len(events)} events written to: {self.output_path}")
+            return self.output_path
+        except Exception as e:
+            logging.error(f"Could not write trace file: {e}")
+            return None
@@ -4,10 +4,15 @@ Handles detection and location of UI elements like buttons on the screen
 """
 
 import logging
-from typing import Dict, Tuple, Optional
-import pytesseract
-from PIL import Image
+import re
+from typing import Dict, List, Tuple, Optional
 from config import UI_TEXT_STRINGS
+from instrumentation import timed
+from ocr_engine import get_ocr_engine
+from screenshot_writer import load_image
+
+# UI_TEXT_STRINGS keys (and defaults) of the buttons below the last prompt of a profile
+PROFILE_END_MARKERS = [("profile_end_hide", "hide"), ("profile_end_report", "report")]
 
 class UIDetector:
     """
@@ -24,6 +29,15 @@ class UIDetector:
             'ai_send_like': (1015, 518)  # Send like button on AI enabled reply options screen
         }
 
+    def warm_up(self) -> bool:
+        """
+        Initialise the OCR engine so the first screen check does not pay start-up cost
+
+        Returns:
+            bool: True if the OCR engine is ready
+        """
+        return get_ocr_engine().warm_up()
+
     def find_button_coordinates(self, button_name: str) -> Optional[Tuple[int, int]]:
         """
         Find coordinates of a specific button
@@ -144,6 +158,7 @@ class UIDetector:
             logging.warning("Using fallback coordinates for AI send like button")
             return (1015, 518)
 
+    @timed("ocr")
     def is_send_rose_screen(self, intermediate_screenshot: str) -> bool:
         """
         Check if the screenshot contains "send a rose instead" text using OCR
@@ -156,10 +171,10 @@ class UIDetector:
         """
         try:
             # Open the image
-            image = Image.open(intermediate_screenshot)
+            image = load_image(intermediate_screenshot)
 
             # Perform OCR on the image
-            ocr_text = pytesseract.image_to_string(image)
+            ocr_text = get_ocr_engine().image_to_string(image)
 
             # Log the OCR result for debugging
             # logging.info(f"OCR text from screenshot: {ocr_text}")
@@ -185,6 +200,7 @@ class UIDetector:
             return False
 
     # Doesn't seem to work reliably, disabling for now, OCR does not parse small text
+    @timed("ocr")
     def is_ai_enabled_reply_screen(self, screenshot: str) -> bool:
         """
         Check if the screenshot contains AI enabled reply options text using OCR
@@ -197,10 +213,10 @@ class UIDetector:
         """
         try:
             # Open the image
-            image = Image.open(screenshot)
+            image = load_image(screenshot)
 
             # Perform OCR on the image
-            ocr_text = pytesseract.image_to_string(image)
+            ocr_text = get_ocr_engine().image_to_string(image)
 
             # Log the OCR result for debugging
             logging.info(f"OCR text from screenshot: {ocr_text}")
@@ -231,7 +247,33 @@ class UIDetector:
             return False
 
 
+    @timed("ocr")
+    def find_profile_end_markers(self, screenshot: str, region: float = 0.4) -> Optional[List[str]]:
+        """
+        Look for the buttons shown at the bottom of a profile using OCR
+
+        Args:
+            screenshot: Path to the screenshot file to analyze
+            region: Bottom fraction of the screenshot to search
+
+        Returns:
+            List of marker texts found (possibly empty), or None if OCR failed
+        """
+        try:
+            image = load_image(screenshot)
+            width, height = image.size
+            ocr_text = get_ocr_engine().image_to_string(image.crop((0, int(height * (1 - region)), width, height)))
 
+            words = set(re.findall(r"\w+", ocr_text.lower()))
+            markers = [UI_TEXT_STRINGS.get(key, default) for key, default in PROFILE_END_MARKERS]
+            found = [marker for marker in markers if set(marker.lower().split()) <= words]
+            if found:
+                logging.info(f"Found end-of-profile markers {found} in screenshot")
+            return found
+
+        except Exception as e:
+            logging.error(f"Error performing OCR on screenshot {screenshot}: {e}")
+            return None
 
 
 # Global instance for easy access
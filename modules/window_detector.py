@@ -10,10 +10,26 @@ from config import WINDOW_TITLE, TIMEOUTS
 try:
     import pygetwindow as gw
     PYGETWINDOW_AVAILABLE = True
-except ImportError:
+except (ImportError, NotImplementedError):
+    # pygetwindow raises NotImplementedError on unsupported platforms (Linux)
     PYGETWINDOW_AVAILABLE = False
     logging.warning("pygetwindow not available. Window detection will be limited.")
 
+class SimpleWindow:
+    """
+    Simple object holding window title and geometry
+    """
+    def __init__(self, title, left, top, width, height):
+        self.title = title
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.right = left + width
+        self.bottom = top + height
+        self.isActive = True
+        self.visible = True
+
 class WindowDetector:
     def __init__(self):
         self.window = None
@@ -24,7 +40,7 @@ class WindowDetector:
         Get window dimensions and position
         """
         if not self.window:
-            logging.error("No window found. Maybe implement a method to find window by title?")
+            logging.error("No window found. Call find_window_by_title or get_active_window first.")
             return None
 
         try:
@@ -78,19 +94,6 @@ class WindowDetector:
                     except Exception as e:
                         logging.warning(f"Could not get window object geometry, using getWindowGeometry: {e}")
 
-                    # Create a simple object to hold window properties
-                    class SimpleWindow:
-                        def __init__(self, title, left, top, width, height):
-                            self.title = title
-                            self.left = left
-                            self.top = top
-                            self.width = width
-                            self.height = height
-                            self.right = left + width
-                            self.bottom = top + height
-                            self.isActive = True
-                            self.visible = True
-
                     self.window = SimpleWindow(active_title, left, top, width, height)
                     logging.info(f"Active window object created: {self.window.title}")
                     logging.info(f"Final window bounds: left={left}, top={top}, width={width}, height={height}")
@@ -105,3 +108,113 @@ class WindowDetector:
             logging.error(f"Error getting active window: {e}")
             return False
 
+    def _lookup_window(self, title):
+        """
+        Look up a window whose title contains the given text
+
+        Args:
+            title: Window title (or part of it) to search for
+
+        Returns:
+            Tuple of (full_title, left, top, width, height) or None if not found
+        """
+        # Windows implementation returns window objects directly
+        if hasattr(gw, "getWindowsWithTitle"):
+            for win in gw.getWindowsWithTitle(title):
+                if win.width > 0 and win.height > 0:
+                    return (win.title, win.left, win.top, win.width, win.height)
+            return None
+
+        # macOS implementation works with titles and geometry lookups
+        for window_title in gw.getAllTitles():
+            if window_title and title in window_title:
+                geometry = gw.getWindowGeometry(window_title)
+                if geometry:
+                    left, top, width, height = geometry
+                    return (window_title, left, top, width, height)
+        return None
+
+    def find_window_by_title(self, title=None):
+        """
+        Find the scrcpy window by its configured title and cache its geometry
+
+        Args:
+            title: Window title to search for (defaults to config.WINDOW_TITLE)
+
+        Returns:
+            bool: True if the window was found
+        """
+        if not PYGETWINDOW_AVAILABLE:
+            logging.error("pygetwindow not installed. Cannot find window by title.")
+            return False
+
+        title = title or WINDOW_TITLE
+        try:
+            found = self._lookup_window(title)
+        except Exception as e:
+            logging.debug(f"Window lookup for '{title}' failed: {e}")
+            return False
+
+        if not found:
+            return False
+
+        window_title, left, top, width, height = found
+        self.window = SimpleWindow(window_title, left, top, width, height)
+        logging.info(f"Found window '{window_title}': left={left}, top={top}, width={width}, height={height}")
+        return True
+
+    def wait_for_window(self, title=None, timeout=None, poll_interval=0.25):
+        """
+        Poll for the window by title until it appears or the deadline passes
+
+        Args:
+            title: Window title to search for (defaults to config.WINDOW_TITLE)
+            timeout: Maximum time to wait in seconds (defaults to window_discovery timeout)
+            poll_interval: Delay between lookups in seconds
+
+        Returns:
+            bool: True if the window was found before the deadline
+        """
+        title = title or WINDOW_TITLE
+        timeout = TIMEOUTS["window_discovery"] if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        logging.info(f"Waiting up to {timeout}s for window '{title}'...")
+        while True:
+            if self.find_window_by_title(title):
+                return True
+            if not PYGETWINDOW_AVAILABLE or time.time() >= deadline:
+                logging.error(f"Window '{title}' not found within {timeout}s")
+                return False
+            time.sleep(poll_interval)
+
+    def refresh_if_moved(self):
+        """
+        Re-check the cached window geometry and update it if the window moved or resized
+
+        Returns:
+            bool: True if the geometry changed and dimensions were refreshed
+        """
+        if not self.window or not PYGETWINDOW_AVAILABLE:
+            return False
+
+        try:
+            found = self._lookup_window(self.window.title)
+        except Exception as e:
+            logging.debug(f"Window geometry check failed: {e}")
+            return False
+
+        if not found:
+            logging.warning(f"Window '{self.window.title}' no longer found - keeping cached geometry")
+            return False
+
+        window_title, left, top, width, height = found
+        w = self.window
+        if (left, top, width, height) == (w.left, w.top, w.width, w.height):
+            return False
+
+        logging.info(f"Window moved or resized: ({w.left}, {w.top}, {w.width}x{w.height}) -> "
+                     f"({left}, {top}, {width}x{height})")
+        self.window = SimpleWindow(window_title, left, top, width, height)
+        self.get_dimensions()
+        return True
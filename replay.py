@@ -0,0 +1,189 @@
+"""
+Hinge Automation Replay Script
+Runs the full automation loop offline against a recorded session
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from main import run_automation
+from instrumentation import Instrumentation, get_instrumentation, set_instrumentation
+from replay_backends import (ReplaySession, ReplayDevice, ReplayGrabber, FakeScrcpyManager,
+                             FakeWindowDetector, FakeInteractionHandler, StubLLM)
+from session_recorder import SessionRecorder
+from profile_analyzer import ProfileAnalyzer
+from profile_index import ProfileIndex, set_profile_index
+from chrome_mask import ChromeMask, set_chrome_mask
+from ai.ai_manager import create_llm
+from ui_detector import get_ui_detector
+from screenshot_writer import get_screenshot_writer
+from config import LOG_DIR
+
+
+def run_replay(session_path, llm="stub", repeat=1, sleep_scale=0.0, responses=None,
+               stub_latency=0.0, output_dir=None, record=None, role_models=None, role_latency=None,
+               analysis_mode=None):
+    """
+    Replay a recorded session through run_automation and measure throughput
+
+    Args:
+        session_path: Directory with recorded frames (and optional session.json),
+            or a session archive written by SessionRecorder
+        llm: "stub" for recorded responses, "live" for the configured Ollama model
+        repeat: Number of times the session's profiles are played
+        sleep_scale: Multiplier applied to fixed waits (0 skips them)
+        responses: Optional JSON file with stub responses per call purpose
+        stub_latency: Simulated seconds per stub LLM call
+        output_dir: Where timing records are written (defaults to LOG_DIR)
+        record: Optional path of a session archive recording this replay
+        role_models: Optional dict role -> model overriding MODEL_ROLES for live runs
+        role_latency: Optional dict role -> simulated seconds per stub call (overrides stub_latency)
+        analysis_mode: 'single' or 'two_phase' (defaults to ANALYSIS_MODE)
+
+    Returns:
+        dict: profiles, elapsed time, profiles/hour and per-stage latency summary
+    """
+    session = ReplaySession.load(session_path)
+    device = ReplayDevice(session, repeat=repeat)
+    width, height = session.window_size()
+
+    roles = ("full_analysis", "quick_filter", "json_repair")
+    if llm == "stub":
+        if responses:
+            with open(responses) as f:
+                recorded = json.load(f)
+        else:
+            # Archives carry the responses recorded during the original run
+            recorded = session.archive.llm_responses() if session.archive else None
+        role_llms = []
+        for role in roles:
+            stub = StubLLM(recorded, latency_s=(role_latency or {}).get(role, stub_latency))
+            stub.model = f"replay-stub:{role}"
+            role_llms.append(stub)
+    else:
+        role_llms = [create_llm(role, **({'model': role_models[role]} if role in (role_models or {}) else {}))
+                     for role in roles]
+    profile_analyzer = ProfileAnalyzer(*role_llms, analysis_mode=analysis_mode)
+
+    previous = get_instrumentation()
+    instrumentation = Instrumentation(enabled=True, output_dir=output_dir or LOG_DIR,
+                                      run_id=f"replay_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    instrumentation.sleep_scale = sleep_scale
+    instrumentation.add_listener(device.on_span)
+    set_instrumentation(instrumentation)
+
+    # Inference time per model, showing how the role routing splits the cost
+    llm_models = {}
+    def on_llm_span(stage, start, duration, args):
+        if stage == "llm.generate":
+            stats = llm_models.setdefault(args.get('model'), {'calls': 0, 'total_s': 0.0})
+            stats['calls'] += 1
+            stats['total_s'] = round(stats['total_s'] + duration, 4)
+    instrumentation.add_listener(on_llm_span)
+
+    screenshot_dir = tempfile.mkdtemp(prefix="replay_")
+    # Decisions and learned masks from stub or recorded runs must not reach the live ones
+    previous_index = set_profile_index(ProfileIndex(os.path.join(screenshot_dir, "profile_index.hidx")))
+    previous_mask = set_chrome_mask(ChromeMask())
+    try:
+        start = time.time()
+        run_automation(
+            scrcpy_mgr=FakeScrcpyManager(),
+            window_detector=FakeWindowDetector(width, height),
+            interaction_handler=FakeInteractionHandler(device),
+            screenshot_handler=ReplayGrabber(device, screenshot_dir),
+            profile_analyzer=profile_analyzer,
+            ui_detector=get_ui_detector(),
+            max_profiles=device.total_profiles,
+            rotate_screenshots=False,
+            recorder=SessionRecorder(record) if record else None
+        )
+        elapsed = time.time() - start
+    finally:
+        set_instrumentation(previous)
+        set_profile_index(previous_index)
+        set_chrome_mask(previous_mask)
+        shutil.rmtree(screenshot_dir, ignore_errors=True)
+        if session.archive:
+            session.archive.close()
+
+    profiles = len(instrumentation.profile_records)
+    return {
+        'session': session_path,
+        'llm': llm,
+        'profiles': profiles,
+        'outcomes': [record.get('outcome') for record in instrumentation.profile_records],
+        'captures_per_profile': [record.get('captures') for record in instrumentation.profile_records],
+        'elapsed_s': round(elapsed, 3),
+        'profiles_per_hour': round(profiles * 3600 / elapsed, 1) if elapsed > 0 else None,
+        'stages': instrumentation.summary(),
+        'llm_models': llm_models,
+        'screenshot_writes': get_screenshot_writer().stats(),
+        'timings_file': instrumentation.output_path
+    }
+
+def main():
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded session through the automation loop")
+    parser.add_argument("session", nargs="?", default=os.path.join(os.path.dirname(__file__), "screenshots_for_test"),
+                        help="Session directory or .hrec archive (defaults to screenshots_for_test)")
+    parser.add_argument("--repeat", type=int, default=1, help="Times to play the session's profiles")
+    parser.add_argument("--llm", choices=["stub", "live"], default="stub", help="Recorded-response stub or live model")
+    parser.add_argument("--responses", help="JSON file of stub responses per purpose (quick, full, json_retry)")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Simulated seconds per stub LLM call")
+    parser.add_argument("--sleep-scale", type=float, default=0.0,
+                        help="Multiplier for fixed waits (1.0 keeps real timing)")
+    parser.add_argument("--record", help="Write this replay to a session archive")
+    parser.add_argument("--role-model", action="append", default=[], metavar="ROLE=MODEL",
+                        help="Override a MODEL_ROLES model for live runs (repeatable)")
+    parser.add_argument("--analysis-mode", choices=["single", "two_phase"],
+                        help="Override ANALYSIS_MODE from config.py")
+    parser.add_argument("--role-latency", action="append", default=[], metavar="ROLE=SECONDS",
+                        help="Simulated seconds per stub call for one role (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    role_models = dict(item.split("=", 1) for item in args.role_model)
+    role_latency = {role: float(seconds) for role, seconds in (item.split("=", 1) for item in args.role_latency)}
+
+    report = run_replay(args.session, llm=args.llm, repeat=args.repeat, sleep_scale=args.sleep_scale,
+                        responses=args.responses, stub_latency=args.stub_latency, record=args.record,
+                        role_models=role_models, role_latency=role_latency, analysis_mode=args.analysis_mode)
+
+    print("\n" + "="*60)
+    print("REPLAY REPORT")
+    print("="*60)
+    print(f"Profiles: {report['profiles']} in {report['elapsed_s']:.2f}s "
+          f"({report['profiles_per_hour']} profiles/hour)")
+    captures = [c for c in report['captures_per_profile'] if c is not None]
+    if captures:
+        print(f"Captures per profile: {captures} (mean {sum(captures) / len(captures):.2f})")
+    for stage, stats in report['stages'].items():
+        print(f"  {stage:<28} n={stats['count']:<4} p50={stats['p50_s']:.3f}s p95={stats['p95_s']:.3f}s")
+    for model, stats in report['llm_models'].items():
+        print(f"  LLM {model}: {stats['calls']} calls, {stats['total_s']:.2f}s")
+    writes = report['screenshot_writes']
+    print(f"Screenshot writes ({writes['format']}): {writes['written']} written, {writes['failed']} failed, "
+          f"max queue depth {writes['max_queue_depth']}, stalls {writes['stalls']}, "
+          f"latency p50={writes['write_p50_s']:.3f}s p95={writes['write_p95_s']:.3f}s")
+    print(f"Timing records: {report['timings_file']}")
+    print(json.dumps({k: report[k] for k in ('profiles', 'elapsed_s', 'profiles_per_hour')}))
+
+if __name__ == "__main__":
+    main()
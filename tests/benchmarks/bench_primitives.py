@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the hot primitives
+Runs against deterministic fixtures, writes JSON results and compares runs
+
+Usage:
+    python tests/benchmarks/bench_primitives.py --output before.json
+    python tests/benchmarks/bench_primitives.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Add modules to path
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'modules'))
+sys.path.append(os.path.join(ROOT_DIR, 'tests'))
+
+import numpy as np
+from PIL import Image
+
+from instrumentation import percentile
+from screenshot_handler import ScreenshotHandler
+from batch_hash import phash_batch, pairwise_distances
+from ui_detector import UIDetector
+from profile_analyzer import ProfileAnalyzer
+from replay_backends import StubLLM
+from ai.ollama_client import OllamaLLM
+from ai.metrics import InferenceMetrics
+from user_preferences import has_red_flag, calculate_compatibility_score
+from ocr_engine import get_ocr_engine
+from fake_ollama_server import FakeOllamaServer
+
+SEED_IMAGE = os.path.join(ROOT_DIR, 'screenshots_for_test', 'end_screenshot.png')
+OCR_IMAGE = os.path.join(ROOT_DIR, 'screenshots_for_test', 'ocr_test_check_string_hispanic.png')
+
+GOOD_RESPONSE = json.dumps({
+    "rating": 8,
+    "reason": "Shared love of hiking and a thoughtful prompt answer",
+    "decision": "ENGAGE",
+    "comment": "Which trail would you pick for a first hike together?"
+})
+# Markdown-wrapped JSON fails json.loads and goes through the LLM repair path
+BAD_RESPONSE = "Here is my analysis:\n```json\n" + GOOD_RESPONSE + "\n```"
+
+# Regression threshold used by --compare (relative change of the median)
+DEFAULT_THRESHOLD = 0.10
+
+BENCHMARKS = []
+
+
+class SkipBenchmark(Exception):
+    """
+    Raised by a benchmark setup when its dependency is not available
+    """
+
+
+def benchmark(name):
+    """
+    Register a benchmark setup function
+
+    The setup receives the Fixtures and returns the zero-argument callable to time.
+    """
+    def decorator(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return decorator
+
+
+class Fixtures:
+    """
+    Deterministic inputs shared by all benchmarks
+    """
+
+    def __init__(self, work_dir):
+        """
+        Build the fixtures in a working directory
+
+        Args:
+            work_dir: Temporary directory for generated files
+        """
+        self.work_dir = work_dir
+        self.image = Image.open(SEED_IMAGE).convert("RGB")
+        self.size = self.image.size
+
+        self.profile_path = os.path.join(work_dir, "profile.png")
+        self.image.save(self.profile_path)
+        self.profile_copy_path = os.path.join(work_dir, "profile_copy.png")
+        self.image.save(self.profile_copy_path)
+
+        rng = np.random.RandomState(1234)
+        noise = rng.randint(0, 256, size=(self.size[1], self.size[0], 3), dtype=np.uint8)
+        self.noise_path = os.path.join(work_dir, "noise.png")
+        Image.fromarray(noise).save(self.noise_path)
+
+        # Same screen scrolled by a few rows: falls in the compare cascade's uncertain band
+        self.nudged_path = os.path.join(work_dir, "nudged.png")
+        Image.fromarray(np.roll(np.asarray(self.image), -20, axis=0)).save(self.nudged_path)
+
+        # 64 grayscale frames of the same screen at increasing scroll offsets
+        gray = np.asarray(self.image.convert("L"))
+        self.scroll_stack = np.stack([np.roll(gray, -8 * i, axis=0) for i in range(64)])
+
+        # Profile-style analysis text with no red flags, so every keyword is scanned
+        words = ["hiking", "coffee", "travel", "music", "dogs", "cooking", "books", "yoga"]
+        self.clean_text = " ".join(words[i % len(words)] for i in range(400))
+        self.flagged_text = self.clean_text + " weekend smoker"
+
+
+@contextmanager
+def imagehash_unavailable():
+    """
+    Make `import imagehash` fail so compare_screenshots uses its sampling fallback
+    """
+    saved = sys.modules.get('imagehash')
+    sys.modules['imagehash'] = None
+    try:
+        yield
+    finally:
+        if saved is None:
+            sys.modules.pop('imagehash', None)
+        else:
+            sys.modules['imagehash'] = saved
+
+
+@benchmark("compare_screenshots.imagehash.identical")
+def bench_compare_identical(fx):
+    handler = ScreenshotHandler()
+    return lambda: handler.compare_screenshots(fx.profile_path, fx.profile_copy_path)
+
+@benchmark("compare_screenshots.imagehash.different")
+def bench_compare_different(fx):
+    handler = ScreenshotHandler()
+    return lambda: handler.compare_screenshots(fx.profile_path, fx.noise_path)
+
+@benchmark("compare_screenshots.imagehash.uncertain")
+def bench_compare_uncertain(fx):
+    handler = ScreenshotHandler()
+    return lambda: handler.compare_screenshots(fx.profile_path, fx.nudged_path)
+
+@benchmark("compare_screenshots.sampling")
+def bench_compare_sampling(fx):
+    handler = ScreenshotHandler()
+
+    def run():
+        with imagehash_unavailable():
+            handler.compare_screenshots(fx.profile_path, fx.nudged_path)
+    return run
+
+@benchmark("phash")
+def bench_phash(fx):
+    try:
+        import imagehash
+    except ImportError:
+        raise SkipBenchmark("imagehash not installed")
+    return lambda: imagehash.phash(fx.image)
+
+@benchmark("phash.loop64")
+def bench_phash_loop(fx):
+    try:
+        import imagehash
+    except ImportError:
+        raise SkipBenchmark("imagehash not installed")
+    gray = [Image.fromarray(frame) for frame in fx.scroll_stack]
+    return lambda: [imagehash.phash(image) for image in gray]
+
+@benchmark("phash_batch.64")
+def bench_phash_batch(fx):
+    return lambda: phash_batch(fx.scroll_stack)
+
+@benchmark("pairwise_distances.1000")
+def bench_pairwise_distances(fx):
+    hashes = np.random.RandomState(1234).randint(0, 2 ** 63, size=1000, dtype=np.uint64)
+    return lambda: pairwise_distances(hashes)
+
+@benchmark("png.save")
+def bench_png_save(fx):
+    path = os.path.join(fx.work_dir, "save.png")
+    return lambda: fx.image.save(path)
+
+@benchmark("png.load")
+def bench_png_load(fx):
+    return lambda: Image.open(fx.profile_path).load()
+
+@benchmark("ocr.is_send_rose_screen")
+def bench_ocr(fx):
+    if not get_ocr_engine().warm_up():
+        raise SkipBenchmark("tesseract not available")
+    detector = UIDetector()
+    return lambda: detector.is_send_rose_screen(OCR_IMAGE)
+
+@benchmark("has_red_flag.clean")
+def bench_red_flag_clean(fx):
+    return lambda: has_red_flag(fx.clean_text)
+
+@benchmark("has_red_flag.flagged")
+def bench_red_flag_flagged(fx):
+    return lambda: has_red_flag(fx.flagged_text)
+
+@benchmark("calculate_compatibility_score")
+def bench_compatibility_score(fx):
+    return lambda: calculate_compatibility_score(fx.flagged_text)
+
+@benchmark("parse_analysis_response.good")
+def bench_parse_good(fx):
+    analyzer = ProfileAnalyzer(llm=StubLLM())
+    return lambda: analyzer._parse_analysis_response(GOOD_RESPONSE)
+
+@benchmark("parse_analysis_response.bad")
+def bench_parse_bad(fx):
+    analyzer = ProfileAnalyzer(llm=StubLLM({'json_retry': GOOD_RESPONSE}))
+    return lambda: analyzer._parse_analysis_response(BAD_RESPONSE)
+
+@benchmark("ollama.generate.text")
+def bench_ollama_text(fx):
+    llm = OllamaLLM(model="fake", host=fx.ollama_host, max_retries=0)
+    llm.metrics = InferenceMetrics()
+    return lambda: llm.generate("Rate this profile", purpose="bench")
+
+@benchmark("ollama.generate.image")
+def bench_ollama_image(fx):
+    llm = OllamaLLM(model="fake", host=fx.ollama_host, max_retries=0)
+    llm.metrics = InferenceMetrics()
+    return lambda: llm.generate("Rate this profile", images=[fx.profile_path], purpose="bench")
+
+
+def time_callable(func, repeat, warmup):
+    """
+    Time a callable
+
+    Args:
+        func: Zero-argument callable
+        repeat: Number of timed calls
+        warmup: Number of untimed calls first
+
+    Returns:
+        dict: repeat, min, median, mean and p95 in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'repeat': repeat,
+        'min_ms': round(min(samples), 4),
+        'median_ms': round(percentile(samples, 50), 4),
+        'mean_ms': round(sum(samples) / len(samples), 4),
+        'p95_ms': round(percentile(samples, 95), 4)
+    }
+
+def run_benchmarks(repeat=20, warmup=2, name_filter=None):
+    """
+    Run all registered benchmarks
+
+    Args:
+        repeat: Timed calls per benchmark
+        warmup: Untimed calls per benchmark
+        name_filter: Only run benchmarks whose name contains this string
+
+    Returns:
+        dict: 'meta' (environment) and 'results' (name -> stats or skip reason)
+    """
+    work_dir = tempfile.mkdtemp(prefix="bench_")
+    results = {}
+    logging.disable(logging.CRITICAL)
+    try:
+        fixtures = Fixtures(work_dir)
+        with FakeOllamaServer(script=[GOOD_RESPONSE], num_parallel=4) as server:
+            fixtures.ollama_host = server.url
+            for name, setup in BENCHMARKS:
+                if name_filter and name_filter not in name:
+                    continue
+                try:
+                    results[name] = time_callable(setup(fixtures), repeat, warmup)
+                except SkipBenchmark as e:
+                    results[name] = {'skipped': str(e)}
+    finally:
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {'meta': environment_info(repeat), 'results': results}
+
+def environment_info(repeat):
+    """
+    Describe the machine and commit the results were produced on
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pillow': Image.__version__,
+        'repeat': repeat
+    }
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two result sets by median time
+
+    Args:
+        baseline: Results dict from an earlier run
+        current: Results dict from this run
+        threshold: Relative median change counted as a regression / improvement
+
+    Returns:
+        list of dicts: name, baseline_ms, current_ms, change and status
+        ('regression', 'improvement', 'same', 'new', 'removed' or 'skipped')
+    """
+    rows = []
+    names = list(current['results']) + [n for n in baseline['results'] if n not in current['results']]
+    for name in names:
+        base = baseline['results'].get(name)
+        cur = current['results'].get(name)
+        row = {'name': name, 'baseline_ms': None, 'current_ms': None, 'change': None}
+
+        if base is None:
+            row['status'] = 'new'
+        elif cur is None:
+            row['status'] = 'removed'
+        elif 'skipped' in base or 'skipped' in cur:
+            row['status'] = 'skipped'
+        else:
+            row['baseline_ms'] = base['median_ms']
+            row['current_ms'] = cur['median_ms']
+            row['change'] = (cur['median_ms'] - base['median_ms']) / base['median_ms'] if base['median_ms'] else 0.0
+            if row['change'] > threshold:
+                row['status'] = 'regression'
+            elif row['change'] < -threshold:
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'same'
+        rows.append(row)
+    return rows
+
+def print_results(results):
+    """
+    Print one line per benchmark
+    """
+    for name, stats in results['results'].items():
+        if 'skipped' in stats:
+            print(f"  {name:<42} skipped ({stats['skipped']})")
+        else:
+            print(f"  {name:<42} median {stats['median_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms")
+
+def print_comparison(rows):
+    """
+    Print the comparison table
+    """
+    for row in rows:
+        if row['change'] is None:
+            print(f"  {row['name']:<42} {row['status']}")
+        else:
+            print(f"  {row['name']:<42} {row['baseline_ms']:9.3f} -> {row['current_ms']:9.3f} ms "
+                  f"({row['change']:+.1%}) {row['status']}")
+
+def main():
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the hot primitives")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per benchmark")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed calls per benchmark")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--current", help="Compare this results JSON instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative median change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    args = parser.parse_args()
+
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_benchmarks(args.repeat, args.warmup, args.filter)
+        print(f"Benchmarks ({current['meta']['commit']}, repeat={args.repeat}):")
+        print_results(current)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare_results(baseline, current, args.threshold)
+        print(f"\nComparison against {baseline['meta'].get('commit')}:")
+        print_comparison(rows)
+        if args.fail_on_regression and any(row['status'] == 'regression' for row in rows):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
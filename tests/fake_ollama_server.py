@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama Server
+Local stand-in for Ollama's /api/generate with scripted responses and modelled latency
+
+Usage:
+    python tests/fake_ollama_server.py --port 11434 --script valid,malformed --token-ms 25 --image-ms 400
+    # then point OLLAMA_CONFIG["host"] at http://127.0.0.1:11434
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VALID_RESPONSE = json.dumps({
+    "rating": 7,
+    "reason": "Fake server response",
+    "decision": "ENGAGE",
+    "comment": "What got you into rock climbing?"
+})
+
+# Scripted response kinds and the text they return ('slow' adds slow_ms, None sends HTTP 500)
+SCENARIOS = {
+    "valid": VALID_RESPONSE,
+    "malformed": "Sure! Here is the analysis:\n```json\n" + VALID_RESPONSE + "\n```\nHope this helps.",
+    "truncated": VALID_RESPONSE[:len(VALID_RESPONSE) // 2],
+    "slow": VALID_RESPONSE,
+    "error": None
+}
+
+NS_PER_S = 1_000_000_000
+
+
+class LatencyModel:
+    """
+    Simulated Ollama timing
+
+    Prompt evaluation costs a fixed amount per prompt token and per image, token
+    generation a fixed amount per output token, and the first request pays a
+    model load. Each duration is scaled by a random factor drawn from a normal
+    distribution with the given relative jitter (clamped at zero).
+    """
+
+    def __init__(self, load_ms=0.0, prompt_token_ms=0.0, image_ms=0.0, token_ms=0.0,
+                 slow_ms=2000.0, jitter=0.0, seed=None):
+        """
+        Initialize the latency model
+
+        Args:
+            load_ms: Model load time paid by the first request
+            prompt_token_ms: Prompt evaluation time per prompt token
+            image_ms: Prompt evaluation time per image
+            token_ms: Generation time per output token
+            slow_ms: Extra delay for the 'slow' scenario
+            jitter: Relative standard deviation applied to each duration
+            seed: Random seed for reproducible jitter
+        """
+        self.load_ms = load_ms
+        self.prompt_token_ms = prompt_token_ms
+        self.image_ms = image_ms
+        self.token_ms = token_ms
+        self.slow_ms = slow_ms
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _scale(self, ms):
+        """
+        Apply jitter to a duration in milliseconds
+        """
+        if not self.jitter or not ms:
+            return ms
+        with self._lock:
+            factor = self._random.gauss(1.0, self.jitter)
+        return max(ms * factor, 0.0)
+
+    def prompt_eval_ms(self, prompt_tokens, images):
+        return self._scale(prompt_tokens * self.prompt_token_ms + images * self.image_ms)
+
+    def token_delay_ms(self):
+        return self._scale(self.token_ms)
+
+
+def count_tokens(text):
+    """
+    Rough token count (about four characters per token)
+    """
+    return max(len(text) // 4, 1) if text else 0
+
+def split_tokens(text):
+    """
+    Split text into streaming chunks of about four characters
+    """
+    return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+
+class FakeOllamaServer:
+    """
+    Threaded HTTP server speaking the /api/generate protocol
+
+    Requests beyond num_parallel wait for a free slot, like OLLAMA_NUM_PARALLEL.
+    The script is cycled over requests that carry a prompt; an empty prompt is
+    treated as a model load (warm-up) and always succeeds.
+    """
+
+    def __init__(self, script=None, latency=None, num_parallel=1, host="127.0.0.1", port=0):
+        """
+        Initialize the server (not started)
+
+        Args:
+            script: List of scenario names (valid, malformed, truncated, slow, error)
+                    or literal response strings, cycled per request
+            latency: LatencyModel (no simulated latency if None)
+            num_parallel: Number of requests processed at once
+            host: Bind address
+            port: Bind port (0 picks a free port)
+        """
+        self.script = list(script or ["valid"])
+        self.latency = latency or LatencyModel()
+        self.num_parallel = num_parallel
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.max_waiting = 0
+        self.waiting = 0
+        self.model_loaded = False
+        self._script_cycle = itertools.cycle(self.script)
+        self._slots = threading.BoundedSemaphore(num_parallel)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Base URL of the server
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        Serve requests on a background thread
+
+        Returns:
+            str: Base URL of the server
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """
+        Stop serving and close the socket
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def next_scenario(self):
+        """
+        Get the next scripted scenario name or literal response
+        """
+        with self._lock:
+            return next(self._script_cycle)
+
+    def _acquire_slot(self):
+        """
+        Wait for a free processing slot and update the concurrency counters
+        """
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+        self._slots.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _release_slot(self):
+        with self._lock:
+            self.active -= 1
+        self._slots.release()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; avoid Nagle/delayed-ACK stalls on keep-alive
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    self._send_json(200, {"version": "0.0.0-fake"})
+                elif self.path == "/api/tags":
+                    self._send_json(200, {"models": []})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path != "/api/generate":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server._handle_generate(self, json.loads(body or b"{}"))
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _handle_generate(self, handler, request):
+        """
+        Serve one /api/generate request
+        """
+        prompt = request.get("prompt", "")
+        images = len(request.get("images") or [])
+        stream = request.get("stream", True)
+        received = time.time()
+
+        self._acquire_slot()
+        started = time.time()
+        try:
+            load_ms = 0.0
+            with self._lock:
+                if not self.model_loaded:
+                    load_ms = self.latency.load_ms
+                    self.model_loaded = True
+            time.sleep(load_ms / 1000)
+
+            if not prompt:
+                scenario, text = "load", ""
+            else:
+                scenario = self.next_scenario()
+                text = SCENARIOS.get(scenario, scenario)
+
+            with self._lock:
+                self.requests.append({"model": request.get("model"), "scenario": scenario, "images": images,
+                                      "stream": stream, "queued_s": round(started - received, 4)})
+
+            if text is None:
+                handler._send_json(500, {"error": "scripted server error"})
+                return
+
+            prompt_tokens = count_tokens(prompt)
+            prompt_eval_ms = self.latency.prompt_eval_ms(prompt_tokens, images)
+            if scenario == "slow":
+                prompt_eval_ms += self.latency.slow_ms
+            time.sleep(prompt_eval_ms / 1000)
+
+            chunks = split_tokens(text)
+            base = {"model": request.get("model", "fake"),
+                    "created_at": datetime.now(timezone.utc).isoformat()}
+
+            eval_start = time.time()
+            if stream:
+                handler.send_response(200)
+                handler.send_header("Content-Type", "application/x-ndjson")
+                handler.send_header("Transfer-Encoding", "chunked")
+                handler.end_headers()
+                for chunk in chunks:
+                    time.sleep(self.latency.token_delay_ms() / 1000)
+                    self._write_chunk(handler, {**base, "response": chunk, "done": False})
+            else:
+                for _ in chunks:
+                    time.sleep(self.latency.token_delay_ms() / 1000)
+            eval_s = time.time() - eval_start
+
+            final = {
+                **base,
+                "response": "" if stream else text,
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": prompt_tokens + images * 256,
+                "prompt_eval_duration": int(prompt_eval_ms / 1000 * NS_PER_S),
+                "eval_count": len(chunks),
+                "eval_duration": int(eval_s * NS_PER_S),
+                "load_duration": int(load_ms / 1000 * NS_PER_S),
+                "total_duration": int((time.time() - started) * NS_PER_S)
+            }
+            if stream:
+                self._write_chunk(handler, final)
+                handler.wfile.write(b"0\r\n\r\n")
+            else:
+                handler._send_json(200, final)
+        finally:
+            self._release_slot()
+
+    @staticmethod
+    def _write_chunk(handler, payload):
+        """
+        Write one NDJSON line as an HTTP chunk
+        """
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        handler.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        handler.wfile.flush()
+
+
+def main():
+    """
+    Command line entry point
+    """
+    parser = argparse.ArgumentParser(description="Fake Ollama /api/generate server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--script", default="valid",
+                        help="Comma separated scenarios cycled per request: " + ", ".join(SCENARIOS))
+    parser.add_argument("--parallel", type=int, default=1, help="Concurrent requests (like OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--load-ms", type=float, default=0.0, help="Model load time on the first request")
+    parser.add_argument("--prompt-token-ms", type=float, default=0.0, help="Prompt eval time per prompt token")
+    parser.add_argument("--image-ms", type=float, default=0.0, help="Prompt eval time per image")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="Generation time per output token")
+    parser.add_argument("--slow-ms", type=float, default=2000.0, help="Extra delay for the 'slow' scenario")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative standard deviation of each duration")
+    parser.add_argument("--seed", type=int, help="Random seed for the jitter")
+    args = parser.parse_args()
+
+    latency = LatencyModel(load_ms=args.load_ms, prompt_token_ms=args.prompt_token_ms, image_ms=args.image_ms,
+                           token_ms=args.token_ms, slow_ms=args.slow_ms, jitter=args.jitter, seed=args.seed)
+    server = FakeOllamaServer(script=args.script.split(","), latency=latency, num_parallel=args.parallel,
+                              host=args.host, port=args.port)
+    print(f"Fake Ollama server listening on {server.url} (script: {args.script}, parallel: {args.parallel})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
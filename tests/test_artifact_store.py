@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for run-scoped screenshot directories
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.artifact_store import ArtifactStore, RUN_MARKER, DELETING_PREFIX
+
+
+class TestArtifactStore(unittest.TestCase):
+    """
+    Test cases for run rotation and retention
+    """
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.live_dir = os.path.join(self.work_dir, "screenshots")
+        self.runs_dir = os.path.join(self.work_dir, "runs")
+
+    def store(self, run_id, **kwargs):
+        kwargs.setdefault("keep_runs", 3)
+        kwargs.setdefault("legacy_dir", os.path.join(self.work_dir, "screenshots_from_last_run"))
+        return ArtifactStore(live_dir=self.live_dir, runs_dir=self.runs_dir, run_id=run_id, **kwargs)
+
+    def write_files(self, directory, count, size=10):
+        os.makedirs(directory, exist_ok=True)
+        for index in range(count):
+            with open(os.path.join(directory, f"screenshot_{index}.png"), 'wb') as f:
+                f.write(b"x" * size)
+
+    def make_runs(self, names, size=10):
+        for name in names:
+            self.write_files(os.path.join(self.runs_dir, name), 1, size)
+
+    def test_rotation_is_one_rename(self):
+        """Test that the previous run is archived under its run id with a single rename"""
+        first = self.store("20260101_000000")
+        self.assertIsNone(first.rotate())
+        self.write_files(self.live_dir, 200)
+
+        second = self.store("20260102_000000")
+        with patch('modules.artifact_store.os.rename', wraps=os.rename) as rename:
+            archived = second.rotate()
+        self.assertTrue(second.wait(5))
+
+        self.assertEqual(archived, os.path.join(self.runs_dir, "20260101_000000"))
+        self.assertEqual(rename.call_count, 1)
+        self.assertEqual(len(os.listdir(archived)), 201)
+        self.assertEqual(os.listdir(self.live_dir), [RUN_MARKER])
+        with open(os.path.join(self.live_dir, RUN_MARKER)) as f:
+            self.assertEqual(f.read(), "20260102_000000")
+
+    def test_nothing_to_archive(self):
+        """Test that an empty live directory is reused instead of archived"""
+        self.store("20260101_000000").rotate()
+        self.assertIsNone(self.store("20260102_000000").rotate())
+        self.assertEqual(self.store("20260103_000000").runs(), [])
+
+    def test_unmarked_directory_and_name_collision(self):
+        """Test that a live directory without a marker is archived, without overwriting a run"""
+        self.write_files(self.live_dir, 2)
+        store = self.store("20260102_000000")
+        with patch.object(ArtifactStore, '_run_id_of', return_value="20260101_000000"):
+            self.make_runs(["20260101_000000"])
+            archived = store.rotate()
+        store.wait(5)
+        self.assertEqual(os.path.basename(archived), "20260101_000000_1")
+        self.assertEqual(store.runs(), ["20260101_000000_1", "20260101_000000"])
+
+    def test_legacy_directory_migrated(self):
+        """Test that the old layout's previous-run directory joins the archive and expires with it"""
+        legacy = os.path.join(self.work_dir, "screenshots_from_last_run")
+        self.write_files(legacy, 3)
+        os.utime(legacy, (1767225600, 1767225600))  # 2026-01-01
+        self.write_files(self.live_dir, 2)
+        with open(os.path.join(self.live_dir, RUN_MARKER), 'w') as f:
+            f.write("20260102_000000")
+
+        store = self.store("20260103_000000", keep_runs=1)
+        self.assertEqual(store.rotate(), os.path.join(self.runs_dir, "20260102_000000"))
+        self.assertTrue(store.wait(5))
+
+        self.assertFalse(os.path.exists(legacy))
+        self.assertEqual(store.runs(), ["20260102_000000"])
+        self.assertEqual(sorted(os.listdir(self.runs_dir)), ["20260102_000000"])
+
+    def test_count_retention(self):
+        """Test that only the newest keep_runs runs survive"""
+        self.make_runs([f"2026010{day}_000000" for day in range(1, 7)])
+        store = self.store("20260107_000000", keep_runs=2)
+        self.assertEqual(store.prune(), ["20260104_000000", "20260103_000000",
+                                         "20260102_000000", "20260101_000000"])
+        self.assertEqual(store.runs(), ["20260106_000000", "20260105_000000"])
+        self.assertEqual(sorted(os.listdir(self.runs_dir)), ["20260105_000000", "20260106_000000"])
+
+    def test_size_retention(self):
+        """Test that runs beyond the size budget expire, oldest first"""
+        self.make_runs(["20260101_000000", "20260102_000000", "20260103_000000"], size=100)
+        store = self.store("20260104_000000", max_bytes=250)
+        self.assertEqual(store.prune(), ["20260101_000000"])
+        self.assertEqual(store.runs(), ["20260103_000000", "20260102_000000"])
+
+    def test_interrupted_deletion_is_finished(self):
+        """Test that runs left half-deleted by an earlier process are removed"""
+        self.make_runs(["20260101_000000", DELETING_PREFIX + "20251231_000000"])
+        store = self.store("20260102_000000")
+        self.assertEqual(store.runs(), ["20260101_000000"])
+        store.prune()
+        self.assertEqual(os.listdir(self.runs_dir), ["20260101_000000"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
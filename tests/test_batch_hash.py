@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for batch perceptual hashing
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import imagehash
+import numpy as np
+from PIL import Image
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.batch_hash import phash_batch, popcount, hamming_distances, pairwise_distances
+from tests.test_frame_stitcher import make_profile, make_frames
+
+
+def reference_hash(image):
+    """imagehash's phash as an integer"""
+    return int(str(imagehash.phash(image)), 16)
+
+
+class TestBatchHash(unittest.TestCase):
+    """
+    Test cases for batched hashing and vectorised Hamming distances
+    """
+
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.RandomState(7)
+        self.frames = make_frames(make_profile(), [0, 5, 40, 200, 400])
+        self.noise = [Image.fromarray(rng.randint(0, 256, (300, 200, 3), dtype=np.uint8)) for _ in range(3)]
+
+    def test_matches_imagehash(self):
+        """Test that batch hashes equal imagehash.phash bit for bit, across mixed sizes"""
+        frames = self.frames + self.noise
+        expected = [reference_hash(frame) for frame in frames]
+        self.assertEqual(phash_batch(frames).tolist(), expected)
+        self.assertEqual(phash_batch(frames, chunk_size=2).tolist(), expected)
+
+    def test_array_and_path_input(self):
+        """Test that a grayscale stack and image paths hash like the images themselves"""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        paths = []
+        for index, frame in enumerate(self.frames):
+            paths.append(os.path.join(work_dir, f"frame_{index}.png"))
+            frame.save(paths[-1])
+
+        expected = phash_batch(self.frames).tolist()
+        stack = np.stack([np.asarray(frame.convert("L")) for frame in self.frames])
+        self.assertEqual(phash_batch(stack).tolist(), expected)
+        self.assertEqual(phash_batch(paths).tolist(), expected)
+        self.assertEqual(len(phash_batch([])), 0)
+
+    def test_distances(self):
+        """Test vectorised popcount against Python bit counting"""
+        rng = np.random.RandomState(3)
+        hashes = rng.randint(0, 2 ** 63, size=50, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.assertEqual(popcount(hashes).tolist(), [bin(int(value)).count("1") for value in hashes])
+
+        query = int(hashes[0])
+        self.assertEqual(hamming_distances(hashes, query).tolist(),
+                         [bin(int(value) ^ query).count("1") for value in hashes])
+
+        pairs = pairwise_distances(hashes, block_size=16)
+        self.assertEqual(pairs.shape, (50, 50))
+        self.assertTrue((pairs == pairs.T).all())
+        self.assertTrue((np.diag(pairs) == 0).all())
+        self.assertEqual(int(pairs[3, 17]), bin(int(hashes[3]) ^ int(hashes[17])).count("1"))
+
+    def test_scrolled_frames_are_close(self):
+        """Test that pairwise distances grow with the scroll offset"""
+        distances = pairwise_distances(phash_batch(self.frames))
+        self.assertLessEqual(int(distances[0, 1]), 4)
+        self.assertGreater(int(distances[0, 4]), 10)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script for the micro-benchmark suite
+Runs a few cheap benchmarks once and checks the comparison logic
+"""
+
+import sys
+import os
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+from bench_primitives import run_benchmarks, compare_results
+
+
+class TestBenchmarks(unittest.TestCase):
+    """
+    Test cases for bench_primitives
+    """
+
+    def test_run_selected_benchmarks(self):
+        """Test that benchmarks produce timing stats and environment metadata"""
+        results = run_benchmarks(repeat=2, warmup=0, name_filter="generate")
+
+        self.assertEqual(set(results['results']), {"ollama.generate.text", "ollama.generate.image"})
+        for stats in results['results'].values():
+            self.assertEqual(stats['repeat'], 2)
+            self.assertLessEqual(stats['min_ms'], stats['p95_ms'])
+        self.assertIn('python', results['meta'])
+
+    def test_compare_flags_regressions(self):
+        """Test that median changes beyond the threshold are classified"""
+        baseline = {'meta': {}, 'results': {
+            'a': {'median_ms': 10.0}, 'b': {'median_ms': 10.0}, 'c': {'median_ms': 10.0},
+            'gone': {'median_ms': 1.0}, 'ocr': {'skipped': 'tesseract not available'}}}
+        current = {'meta': {}, 'results': {
+            'a': {'median_ms': 12.0}, 'b': {'median_ms': 8.0}, 'c': {'median_ms': 10.5},
+            'new': {'median_ms': 1.0}, 'ocr': {'skipped': 'tesseract not available'}}}
+
+        statuses = {row['name']: row['status'] for row in compare_results(baseline, current, threshold=0.1)}
+        self.assertEqual(statuses, {'a': 'regression', 'b': 'improvement', 'c': 'same',
+                                    'new': 'new', 'ocr': 'skipped', 'gone': 'removed'})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
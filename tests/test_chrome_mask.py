@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for static UI chrome masking
+"""
+
+import sys
+import os
+import io
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.chrome_mask import ChromeMask
+import screenshot_writer
+from modules.screenshot_handler import ScreenshotHandler
+from tests.test_frame_stitcher import make_profile, make_frames, HEADER_ROWS, FOOTER_ROWS
+
+
+def make_screen(shift, chrome_rows=600):
+    """
+    Tall screen with large uniform chrome bars and one content block moved down by shift rows
+    """
+    pixels = np.full((1600, 400, 3), 230, np.uint8)
+    pixels[:chrome_rows] = 30
+    pixels[1600 - chrome_rows:] = 90
+    pixels[700 + shift:780 + shift, 80:320] = 40
+    return Image.fromarray(pixels)
+
+
+class TestChromeMask(unittest.TestCase):
+    """
+    Test cases for learning and applying chrome masks
+    """
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.frames = make_frames(make_profile(), [0, 400, 800])
+
+    def save(self, image, name):
+        path = os.path.join(self.work_dir, name)
+        image.save(path)
+        return path
+
+    def test_learns_static_rows(self):
+        """Test that the constant header and footer rows are learned for the frame size"""
+        mask = ChromeMask(overrides={})
+        self.assertEqual(mask.learn(self.frames), (HEADER_ROWS, FOOTER_ROWS))
+        self.assertEqual(mask.get(self.frames[0].size), (HEADER_ROWS, FOOTER_ROWS))
+        self.assertIsNone(mask.get((100, 100)))
+
+    def test_small_changes_stay_chrome(self):
+        """Test that a few changed pixels (status bar clock) do not break the header"""
+        pixels = np.array(self.frames[1])
+        pixels[10:20, :12] = 0
+        frames = [self.frames[0], Image.fromarray(pixels), self.frames[2]]
+        self.assertEqual(ChromeMask(overrides={}).learn(frames), (HEADER_ROWS, FOOTER_ROWS))
+
+    def test_still_frames_are_ignored(self):
+        """Test that a profile that never moved does not produce a mask"""
+        mask = ChromeMask(overrides={})
+        self.assertIsNone(mask.learn([self.frames[0], self.frames[0]]))
+        self.assertIsNone(mask.get(self.frames[0].size))
+
+    def test_median_of_recent_profiles(self):
+        """Test that one unusual profile does not move the learned mask"""
+        mask = ChromeMask(overrides={}, history=3)
+        mask.learn(self.frames)
+        mask.learn(self.frames)
+        pixels = np.array(self.frames[1])
+        pixels[:HEADER_ROWS] = 0
+        self.assertEqual(mask.learn([self.frames[0], Image.fromarray(pixels)]), (HEADER_ROWS, FOOTER_ROWS))
+
+    def test_override_wins(self):
+        """Test that a configured mask replaces the learned one"""
+        size = self.frames[0].size
+        mask = ChromeMask(overrides={f"{size[0]}x{size[1]}": {"top": 10, "bottom": 20}})
+        mask.learn(self.frames)
+        self.assertEqual(mask.get(size), (10, 20))
+        self.assertEqual(mask.apply(self.frames[0]).size, (size[0], size[1] - 30))
+
+    def test_image_bytes_for_llm(self):
+        """Test that LLM payloads are cropped only when a mask is known"""
+        path = self.save(self.frames[0], "frame.png")
+        with open(path, 'rb') as f:
+            original = f.read()
+
+        mask = ChromeMask(overrides={})
+        self.assertEqual(mask.image_bytes(path), original)
+
+        mask.learn(self.frames)
+        cropped = Image.open(io.BytesIO(mask.image_bytes(path)))
+        self.assertEqual(cropped.size[1], self.frames[0].size[1] - HEADER_ROWS - FOOTER_ROWS)
+
+        self.assertIsNone(ChromeMask(enabled=False).get(self.frames[0].size))
+
+    def test_unmasked_frames_are_not_reencoded(self):
+        """Test that frames without chrome rows are sent as saved, without a PNG encode"""
+        # The writer chrome_mask reads through (modules import each other by bare name)
+        writer = screenshot_writer.get_screenshot_writer()
+        self.addCleanup(writer.flush, 5)
+        path = writer.submit(self.frames[0], os.path.join(self.work_dir, "queued.png"))
+        other_size = self.save(Image.new("RGB", (50, 80), "white"), "other.png")
+
+        mask = ChromeMask(overrides={})
+        mask.learn(self.frames)
+        # Encodes on this thread (the writer's own encoding runs on its workers)
+        encodes = []
+        real_save = Image.Image.save
+
+        def save(image, *args, **kwargs):
+            if threading.current_thread() is threading.main_thread():
+                encodes.append(image.size)
+            return real_save(image, *args, **kwargs)
+
+        with patch.object(Image.Image, 'save', save):
+            unmasked = ChromeMask(overrides={}).image_bytes(path)
+            other_size_bytes = mask.image_bytes(other_size)
+
+        self.assertEqual(encodes, [])
+        with open(path, 'rb') as f:
+            self.assertEqual(unmasked, f.read())
+        with open(other_size, 'rb') as f:
+            self.assertEqual(other_size_bytes, f.read())
+
+    def test_compare_screenshots_ignores_chrome(self):
+        """Test that masking keeps large chrome bars from hiding a content change"""
+        first = self.save(make_screen(0), "first.png")
+        moved = self.save(make_screen(20), "moved.png")
+        handler = ScreenshotHandler.__new__(ScreenshotHandler)
+
+        with patch('modules.screenshot_handler.get_chrome_mask', return_value=ChromeMask(enabled=False)):
+            self.assertTrue(handler.compare_screenshots(first, moved))
+
+        masked = ChromeMask(overrides={"400x1600": {"top": 600, "bottom": 600}})
+        with patch('modules.screenshot_handler.get_chrome_mask', return_value=masked):
+            self.assertFalse(handler.compare_screenshots(first, moved))
+            self.assertTrue(handler.compare_screenshots(first, first))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for the screenshot comparison cascade
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.chrome_mask import ChromeMask
+from modules.screenshot_handler import ScreenshotHandler, difference_hash, hamming_distance
+from tests.test_frame_stitcher import make_profile, make_frames
+
+
+class TestCompareCascade(unittest.TestCase):
+    """
+    Test cases for the dhash -> phash / sampling comparison cascade
+    """
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.handler = ScreenshotHandler.__new__(ScreenshotHandler)
+
+        mask_patch = patch('modules.screenshot_handler.get_chrome_mask', return_value=ChromeMask(enabled=False))
+        mask_patch.start()
+        self.addCleanup(mask_patch.stop)
+
+        frames = make_frames(make_profile(), [0, 10])
+        self.first, self.nudged = [self.save(frame, f"frame_{i}.png") for i, frame in enumerate(frames)]
+        self.copy = self.save(frames[0], "copy.png")
+        self.inverted = self.save(ImageOps.invert(frames[0]), "inverted.png")
+
+    def save(self, image, name):
+        path = os.path.join(self.work_dir, name)
+        image.save(path)
+        return path
+
+    def test_difference_hash(self):
+        """Test that a top-to-bottom gradient sets every bit and a flat image none"""
+        gradient = Image.fromarray(np.tile(np.arange(0, 255, 3, dtype=np.uint8)[:, None], (1, 64)))
+        flat = Image.new("L", (64, 85), 100)
+        self.assertEqual(difference_hash(gradient), 2 ** 256 - 1)
+        self.assertEqual(difference_hash(flat), 0)
+        self.assertEqual(hamming_distance(difference_hash(gradient), difference_hash(flat)), 256)
+
+    def test_identical_settled_by_dhash(self):
+        """Test that an exact copy is settled by the cheap stage"""
+        result = self.handler.compare_screenshots_detailed(self.first, self.copy)
+        self.assertTrue(result['identical'])
+        self.assertEqual(result['stage'], 'dhash')
+        self.assertEqual(result['distance'], 0)
+
+    def test_different_settled_by_dhash(self):
+        """Test that a completely different frame is settled by the cheap stage without phash"""
+        with patch('imagehash.phash') as phash:
+            result = self.handler.compare_screenshots_detailed(self.first, self.inverted)
+        self.assertFalse(result['identical'])
+        self.assertEqual(result['stage'], 'dhash')
+        phash.assert_not_called()
+
+    def test_uncertain_band_uses_phash(self):
+        """Test that a small nudge falls through to the perceptual hash"""
+        result = self.handler.compare_screenshots_detailed(self.first, self.nudged)
+        self.assertEqual(result['stage'], 'phash')
+        self.assertTrue(4 < result['dhash_distance'] < 96)
+        self.assertEqual(result['identical'], result['distance'] < 5)
+
+    def test_uncertain_band_samples_without_imagehash(self):
+        """Test that pixel sampling settles the uncertain band when imagehash is missing"""
+        with patch.dict(sys.modules, {'imagehash': None}):
+            result = self.handler.compare_screenshots_detailed(self.first, self.nudged)
+        self.assertEqual(result['stage'], 'sampling')
+
+    def test_band_follows_config(self):
+        """Test that the cascade thresholds come from COMPARE_CASCADE"""
+        with patch.dict('config.COMPARE_CASCADE', {"identical_max": 80}):
+            result = self.handler.compare_screenshots_detailed(self.first, self.nudged)
+        self.assertEqual(result['stage'], 'dhash')
+        self.assertTrue(result['identical'])
+
+    def test_size_mismatch(self):
+        """Test that frames of different sizes differ without hashing"""
+        small = self.save(Image.new("RGB", (10, 10)), "small.png")
+        result = self.handler.compare_screenshots_detailed(self.first, small)
+        self.assertEqual((result['identical'], result['stage']), (False, 'size'))
+
+    def test_compare_screenshots_returns_bool(self):
+        """Test that compare_screenshots keeps returning only the decision"""
+        self.assertIs(self.handler.compare_screenshots(self.first, self.copy), True)
+        self.assertIs(self.handler.compare_screenshots(self.first, self.inverted), False)
+        self.assertIs(self.handler.compare_screenshots(self.first, "missing.png"), False)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the fake Ollama server
+Exercises the real ollama client and OllamaLLM against scripted responses
+"""
+
+import sys
+import os
+import threading
+import time
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+sys.path.append(os.path.dirname(__file__))
+
+import ollama
+from fake_ollama_server import FakeOllamaServer, LatencyModel, VALID_RESPONSE, SCENARIOS
+from ai.ollama_client import OllamaLLM
+from ai.metrics import InferenceMetrics
+from instrumentation import Instrumentation, get_instrumentation, set_instrumentation
+from profile_analyzer import ProfileAnalyzer
+
+
+class TestFakeOllamaServer(unittest.TestCase):
+    """
+    Test cases for FakeOllamaServer
+    """
+
+    def make_llm(self, server, max_retries=0):
+        """Create an OllamaLLM pointed at the fake server"""
+        llm = OllamaLLM(model="gemma3:4b", host=server.url, max_retries=max_retries)
+        llm.metrics = InferenceMetrics()
+        return llm
+
+    def test_non_streaming_generate_with_counters(self):
+        """Test a normal OllamaLLM call including image latency counters"""
+        image_path = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test', 'end_screenshot.png')
+        with FakeOllamaServer(latency=LatencyModel(image_ms=30)) as server:
+            llm = self.make_llm(server)
+            response = llm.generate("rate this profile", images=[image_path], purpose="full")
+
+        self.assertEqual(response, VALID_RESPONSE)
+        self.assertGreaterEqual(llm.last_metrics['prompt_eval_duration_ms'], 30)
+        self.assertEqual(server.requests[0]['images'], 1)
+        self.assertFalse(server.requests[0]['stream'])
+
+    def test_streaming_generate(self):
+        """Test that streamed chunks reassemble into the scripted response"""
+        with FakeOllamaServer(latency=LatencyModel(token_ms=1)) as server:
+            client = ollama.Client(host=server.url)
+            chunks = list(client.generate(model="gemma3:4b", prompt="hi", stream=True))
+
+        self.assertEqual("".join(chunk['response'] for chunk in chunks), VALID_RESPONSE)
+        self.assertTrue(chunks[-1]['done'])
+        self.assertEqual(chunks[-1]['eval_count'], len(chunks) - 1)
+
+    def test_scripted_malformed_and_truncated(self):
+        """Test that scripted bad responses reach the parser and its repair call"""
+        with FakeOllamaServer(script=["malformed", "valid", "truncated", "truncated", "truncated"]) as server:
+            analyzer = ProfileAnalyzer(llm=self.make_llm(server))
+            repaired = analyzer.analyze_profile(["unused.png"])
+            failed = analyzer.analyze_profile(["unused.png"])
+
+        self.assertEqual(repaired['decision'], 'ENGAGE')
+        self.assertEqual(repaired['reason'], 'Successfully parsed using AI retry')
+        self.assertIn('JSON parse error', failed['reason'])
+        self.assertEqual([r['scenario'] for r in server.requests],
+                         ["malformed", "valid", "truncated", "truncated", "truncated"])
+
+    def test_error_triggers_client_retry(self):
+        """Test that a scripted server error is retried by OllamaLLM"""
+        previous = get_instrumentation()
+        instrumentation = Instrumentation(enabled=False)
+        instrumentation.sleep_scale = 0.0
+        set_instrumentation(instrumentation)
+        try:
+            with FakeOllamaServer(script=["error", "valid"]) as server:
+                response = self.make_llm(server, max_retries=1).generate("hi")
+        finally:
+            set_instrumentation(previous)
+
+        self.assertEqual(response, VALID_RESPONSE)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_parallel_limit_queues_requests(self):
+        """Test that requests beyond num_parallel wait for a free slot"""
+        with FakeOllamaServer(latency=LatencyModel(prompt_token_ms=20), num_parallel=1) as server:
+            llm = self.make_llm(server)
+            threads = [threading.Thread(target=llm.generate, args=("x" * 8,)) for _ in range(3)]
+            start = time.time()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.time() - start
+
+        self.assertEqual(server.max_active, 1)
+        self.assertGreaterEqual(elapsed, 0.12)
+        self.assertGreater(max(r['queued_s'] for r in server.requests), 0.03)
+
+    def test_slow_scenario_and_empty_prompt_load(self):
+        """Test the slow scenario delay and that warm-up loads without consuming the script"""
+        with FakeOllamaServer(script=["slow"], latency=LatencyModel(slow_ms=100, load_ms=20)) as server:
+            llm = self.make_llm(server)
+            self.assertTrue(llm.warm_up())
+            start = time.time()
+            llm.generate("hi")
+            self.assertGreaterEqual(time.time() - start, 0.1)
+
+        self.assertEqual([r['scenario'] for r in server.requests], ["load", "slow"])
+        self.assertIn("slow", SCENARIOS)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the compiled red/green flag matcher
+"""
+
+import sys
+import os
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from user_preferences import FlagMatcher, has_red_flag, find_flags, calculate_compatibility_score
+
+class TestFlagMatcher(unittest.TestCase):
+    """
+    Test cases for keyword matching, severity selection and green-flag scoring
+    """
+
+    def test_word_boundaries(self):
+        """Test that keywords inside longer words do not match"""
+        self.assertEqual(has_red_flag("Imprisoned by my love of books, radically honest"), (False, None))
+        has_red, details = has_red_flag("Spent two years in prison")
+        self.assertTrue(has_red)
+        self.assertEqual(details['flag_name'], 'criminal_history')
+
+    def test_case_and_whitespace_insensitive(self):
+        """Test that phrases match across case and line breaks"""
+        has_red, details = has_red_flag("Politics: FAR\nRIGHT")
+        self.assertTrue(has_red)
+        self.assertEqual(details['keyword_found'], 'far right')
+
+    def test_all_hits_with_positions(self):
+        """Test that a single scan reports every hit in text order"""
+        text = "Radical thinker, smoker"
+        hits = [hit for hit in find_flags(text) if hit['kind'] == 'red']
+        self.assertEqual([hit['keyword'] for hit in hits], ['radical', 'smoker'])
+        self.assertEqual(text[hits[1]['start']:hits[1]['end']], 'smoker')
+
+    def test_highest_severity_wins(self):
+        """Test that the most severe flag is reported even when a milder one comes first"""
+        has_red, details = has_red_flag("Radical thinker, smoker")
+        self.assertTrue(has_red)
+        self.assertEqual(details['flag_name'], 'smoking')
+        self.assertEqual(details['severity'], 'high')
+        self.assertEqual(len(details['all_hits']), 2)
+
+    def test_custom_config(self):
+        """Test matching against a caller-supplied red flag configuration"""
+        config = {"pineapple": {"keywords": ["pineapple pizza"], "severity": "medium", "reason": "Taste"}}
+        has_red, details = has_red_flag("I love Pineapple  Pizza", config)
+        self.assertTrue(has_red)
+        self.assertEqual(details['flag_name'], 'pineapple')
+        self.assertEqual(has_red_flag("I am a smoker", config), (False, None))
+
+    def test_empty_config(self):
+        """Test that a matcher without keywords finds nothing"""
+        self.assertEqual(FlagMatcher(red_flags={}, green_flags={}).scan("smoker"), [])
+
+    def test_compatibility_score(self):
+        """Test green-flag scoring and the red-flag override"""
+        positive = calculate_compatibility_score("Loves travel, goes to the gym, Bachelor's in biology")
+        self.assertEqual(positive['overall_score'], 10.0)
+        self.assertEqual(positive['recommendation'], 'positive')
+
+        avoid = calculate_compatibility_score({"reason": "Travel lover but a smoker"})
+        self.assertEqual(avoid['recommendation'], 'avoid')
+        self.assertEqual(avoid['red_flag_warnings'][0]['flag_name'], 'smoking')
+
+        self.assertEqual(calculate_compatibility_score("")['recommendation'], 'neutral')
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate frame suppression
+"""
+
+import sys
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.chrome_mask import ChromeMask
+from modules.frame_dedup import BKTree, FrameDeduplicator, hamming_distance
+from modules.batch_hash import phash_batch
+from replay import run_replay
+
+SESSION_DIR = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test')
+
+
+def make_photo(seed, noise=0):
+    """
+    Smooth random image (a stand-in for a profile photo), optionally with pixel noise
+    """
+    rng = np.random.RandomState(seed)
+    pixels = np.kron(rng.randint(0, 256, size=(8, 6, 3)), np.ones((80, 80, 1)))
+    if noise:
+        pixels = pixels + np.random.RandomState(seed + 100).randint(-noise, noise + 1, size=pixels.shape)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def make_prompt_card(answer):
+    """
+    Prompt card with a fixed layout and header, differing only in its answer text
+    """
+    image = Image.new("RGB", (540, 960), (250, 248, 245))
+    ImageDraw.Draw(image).rounded_rectangle((30, 200, 510, 700), radius=20, fill=(255, 255, 255),
+                                            outline=(220, 220, 220))
+    text = Image.new("L", (200, 60), 255)
+    draw = ImageDraw.Draw(text)
+    draw.text((4, 4), "My simple pleasures", fill=90)
+    draw.text((4, 24), answer, fill=0)
+    image.paste(text.convert("RGB"), (45, 300))
+    return image
+
+
+class TestBKTree(unittest.TestCase):
+    """
+    Test cases for the Hamming-distance BK-tree
+    """
+
+    def test_search_matches_brute_force(self):
+        """Test that radius searches return exactly the hashes a linear scan finds"""
+        rng = random.Random(7)
+        hashes = [rng.getrandbits(64) for _ in range(300)]
+        # Add near copies so small radii have matches
+        hashes += [h ^ (1 << rng.randrange(64)) for h in hashes[:50]]
+        tree = BKTree()
+        for index, value in enumerate(hashes):
+            tree.add(value, index)
+        self.assertEqual(len(tree), len(hashes))
+
+        for query in hashes[:20] + [rng.getrandbits(64) for _ in range(5)]:
+            for radius in (0, 3, 20):
+                expected = sorted(i for i, value in enumerate(hashes) if hamming_distance(query, value) <= radius)
+                found = sorted(item for _, item in tree.search(query, radius))
+                self.assertEqual(found, expected)
+
+    def test_empty_tree(self):
+        """Test that searching an empty tree finds nothing"""
+        self.assertEqual(BKTree().search(0, 64), [])
+
+
+class TestFrameDeduplicator(unittest.TestCase):
+    """
+    Test cases for clustering a profile's frames
+    """
+
+    def setUp(self):
+        """Write frames to a temporary directory"""
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        patcher = patch('modules.frame_dedup.get_chrome_mask', return_value=ChromeMask(enabled=False))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save(self, image, name):
+        path = os.path.join(self.work_dir, name)
+        image.save(path)
+        return path
+
+    def test_repeated_photo_is_dropped(self):
+        """Test that a non-adjacent near-duplicate joins the earlier frame's cluster"""
+        first = self.save(make_photo(1), "profile_001.png")
+        second = self.save(make_photo(2), "profile_002.png")
+        repeat = self.save(make_photo(1, noise=6), "profile_003.png")
+        third = self.save(make_photo(3), "profile_004.png")
+
+        kept, clusters = FrameDeduplicator().deduplicate([first, second, repeat, third])
+
+        self.assertEqual(kept, [first, second, third])
+        self.assertEqual(clusters, {first: [repeat]})
+
+    def test_distinct_frames_are_kept(self):
+        """Test that unrelated frames all survive, in order"""
+        frames = [self.save(make_photo(seed), f"profile_{seed:03d}.png") for seed in range(1, 5)]
+        kept, clusters = FrameDeduplicator().deduplicate(frames)
+        self.assertEqual(kept, frames)
+        self.assertEqual(clusters, {})
+
+    def test_same_template_cards_are_kept(self):
+        """Test that prompt cards sharing a layout but not their text both survive"""
+        first = self.save(make_prompt_card("Coffee on the balcony"), "profile_001.png")
+        second = self.save(make_prompt_card("Sunsets at the harbour"), "profile_002.png")
+        deduplicator = FrameDeduplicator()
+        # The cards are close enough to pass the hash stage on their own
+        hashes = [int(value) for value in phash_batch([first, second])]
+        self.assertLessEqual(hamming_distance(*hashes), deduplicator.max_distance)
+
+        kept, clusters = deduplicator.deduplicate([first, second])
+        self.assertEqual(kept, [first, second])
+        self.assertEqual(clusters, {})
+
+    def test_unreadable_frame_is_kept(self):
+        """Test that a frame that cannot be hashed is passed through"""
+        first = self.save(make_photo(1), "profile_001.png")
+        missing = os.path.join(self.work_dir, "missing.png")
+        kept, _ = FrameDeduplicator().deduplicate([first, missing])
+        self.assertEqual(kept, [first, missing])
+
+    def test_stitching_skips_dedup(self):
+        """Test that frames go to the stitcher as captured, without dedup dropping scroll positions"""
+        with patch.dict('config.STITCHING', {"enabled": True}), \
+                patch('main.get_frame_deduplicator') as get_deduplicator:
+            report = run_replay(SESSION_DIR, output_dir=self.work_dir)
+        self.assertEqual(report['profiles'], 1)
+        get_deduplicator.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
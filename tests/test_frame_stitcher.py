@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for scroll-offset estimation and frame stitching
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.frame_stitcher import FrameStitcher
+
+WIDTH = 360
+HEADER_ROWS = 60
+FOOTER_ROWS = 80
+CONTENT_ROWS = 500
+
+
+def make_profile(rows=3000, seed=0):
+    """
+    Build a tall blocky random profile so every scroll position is distinct
+    """
+    rng = np.random.RandomState(seed)
+    blocks = rng.randint(0, 256, size=(rows // 10, WIDTH // 10, 3))
+    return np.kron(blocks, np.ones((10, 10, 1))).astype(np.uint8)
+
+
+def make_frames(profile, scroll_positions):
+    """
+    Cut phone-sized frames out of a profile with a constant header and footer
+    """
+    header = np.full((HEADER_ROWS, WIDTH, 3), 200, np.uint8)
+    footer = np.full((FOOTER_ROWS, WIDTH, 3), 40, np.uint8)
+    return [Image.fromarray(np.concatenate([header, profile[top:top + CONTENT_ROWS], footer]))
+            for top in scroll_positions]
+
+
+class TestFrameStitcher(unittest.TestCase):
+    """
+    Test cases for offset estimation, static chrome removal and tiling
+    """
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.profile = make_profile()
+        self.stitcher = FrameStitcher(tile_size=224)
+
+    def test_offsets_and_composite(self):
+        """Test that estimated offsets reproduce the original profile exactly"""
+        frames = make_frames(self.profile, [0, 400, 780, 1100])
+        result = self.stitcher.stitch(frames)
+
+        self.assertEqual(result['offsets'], [400, 380, 320])
+        self.assertEqual((result['header_rows'], result['footer_rows']), (HEADER_ROWS, FOOTER_ROWS))
+
+        composite = np.asarray(result['composite'])
+        self.assertEqual(composite.shape[0], HEADER_ROWS + 1100 + CONTENT_ROWS)
+        np.testing.assert_array_equal(composite[HEADER_ROWS:], self.profile[:1100 + CONTENT_ROWS])
+
+    def test_identical_frame_adds_nothing(self):
+        """Test that a repeated frame at the end of a profile contributes no rows"""
+        frames = make_frames(self.profile, [0, 400, 400])
+        result = self.stitcher.stitch(frames)
+
+        self.assertEqual(result['offsets'], [400, 0])
+        self.assertEqual(result['composite'].size[1], HEADER_ROWS + 400 + CONTENT_ROWS)
+
+    def test_unrelated_frame_is_kept_whole(self):
+        """Test that frames without a matching overlap are appended in full"""
+        frames = make_frames(self.profile, [0]) + make_frames(make_profile(seed=1), [0])
+        result = self.stitcher.stitch(frames)
+
+        self.assertEqual(result['offsets'], [None])
+        self.assertEqual(result['composite'].size[1], HEADER_ROWS + 2 * CONTENT_ROWS)
+
+    def test_tiles_do_not_overlap(self):
+        """Test that tiles are model-sized and cover the scaled composite once"""
+        composite = Image.fromarray(self.profile[:1000])
+        tiles = self.stitcher.tile(composite)
+
+        self.assertTrue(all(tile.size[0] == 224 for tile in tiles))
+        self.assertTrue(all(tile.size[1] <= 224 for tile in tiles))
+        self.assertEqual(sum(tile.size[1] for tile in tiles), round(1000 * 224 / WIDTH))
+
+    def test_stitch_to_tiles_writes_files(self):
+        """Test the file-based entry point used before full analysis"""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        paths = []
+        for index, frame in enumerate(make_frames(self.profile, [0, 450, 900]), 1):
+            path = os.path.join(work_dir, f"profile_{index:03d}.png")
+            frame.save(path)
+            paths.append(path)
+
+        tiles = self.stitcher.stitch_to_tiles(paths, prefix="profile_001")
+
+        self.assertTrue(all(os.path.exists(tile) for tile in tiles))
+        self.assertTrue(all(os.path.basename(tile).startswith("profile_001_tile_") for tile in tiles))
+        self.assertEqual(self.stitcher.stitch_to_tiles(paths[:1]), paths[:1])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
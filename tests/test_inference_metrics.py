@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for Ollama inference metrics capture
+Mocks ollama.generate so no model is required
+"""
+
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from ai.ollama_client import OllamaLLM
+from ai.metrics import InferenceMetrics
+
+FAKE_RESPONSE = {
+    "response": '{"rating": 7}',
+    "prompt_eval_count": 1290,
+    "prompt_eval_duration": 2_500_000_000,
+    "eval_count": 40,
+    "eval_duration": 800_000_000,
+    "load_duration": 5_000_000,
+    "total_duration": 3_400_000_000
+}
+
+
+class TestInferenceMetrics(unittest.TestCase):
+    """
+    Test cases for per-call inference metrics
+    """
+
+    def setUp(self):
+        """Create an LLM client with its own metrics store"""
+        self.llm = OllamaLLM(model="gemma3:4b", max_retries=0)
+        self.llm.metrics = InferenceMetrics()
+
+    @patch('ollama.generate', return_value=FAKE_RESPONSE)
+    def test_metrics_recorded_with_purpose(self, mock_generate):
+        """Test that Ollama counters are captured and tagged"""
+        response = self.llm.generate("rate this", purpose="quick")
+
+        self.assertEqual(response, '{"rating": 7}')
+        record = self.llm.last_metrics
+        self.assertEqual(record['purpose'], 'quick')
+        self.assertEqual(record['prompt_eval_count'], 1290)
+        self.assertEqual(record['prompt_eval_duration_ms'], 2500.0)
+        self.assertEqual(record['eval_duration_ms'], 800.0)
+        self.assertEqual(record['images'], 0)
+        self.assertEqual(record['payload_bytes'], len("rate this"))
+
+    @patch('ollama.generate', return_value=FAKE_RESPONSE)
+    def test_image_payload_counted(self, mock_generate):
+        """Test that image count and bytes are included in the payload size"""
+        image_path = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test', 'end_screenshot.png')
+        self.llm.generate("rate this", images=[image_path], purpose="full")
+
+        record = self.llm.last_metrics
+        self.assertEqual(record['images'], 1)
+        self.assertEqual(record['payload_bytes'], len("rate this") + os.path.getsize(image_path))
+
+    @patch('ollama.generate', return_value={"response": "ok"})
+    def test_missing_counters_are_none(self, mock_generate):
+        """Test that responses without counters still produce a record"""
+        self.llm.generate("hello")
+
+        record = self.llm.last_metrics
+        self.assertEqual(record['purpose'], 'unspecified')
+        self.assertIsNone(record['eval_count'])
+        self.assertIsNone(record['load_duration_ms'])
+
+    @patch('ollama.generate', return_value=FAKE_RESPONSE)
+    def test_summary_per_purpose(self, mock_generate):
+        """Test aggregation of records per purpose"""
+        self.llm.generate("a", purpose="quick")
+        self.llm.generate("b", purpose="quick")
+        self.llm.generate("c", purpose="json_retry")
+
+        summary = self.llm.metrics.summary()
+        self.assertEqual(summary['quick']['calls'], 2)
+        self.assertEqual(summary['json_retry']['calls'], 1)
+        self.assertEqual(summary['quick']['mean_prompt_eval_ms'], 2500.0)
+        self.assertEqual(summary['quick']['eval_tokens_per_s'], 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for latency instrumentation
+Tests spans, per-profile JSONL export and percentile summaries
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import time
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.instrumentation import Instrumentation, percentile
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Test cases for Instrumentation
+    """
+
+    def setUp(self):
+        """Create instrumentation writing into a temporary directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.instrumentation = Instrumentation(enabled=True, output_dir=self.temp_dir, run_id="test")
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def read_records(self):
+        with open(self.instrumentation.output_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_percentile(self):
+        """Test percentile interpolation"""
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(percentile([4.0], 95), 4.0)
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertAlmostEqual(percentile([1, 2, 3, 4, 5], 95), 4.8)
+
+    def test_profile_record_contains_stages(self):
+        """Test that spans and sleeps are grouped into the open profile"""
+        self.instrumentation.begin_profile(1)
+        with self.instrumentation.span("capture"):
+            time.sleep(0.01)
+        with self.instrumentation.span("capture"):
+            pass
+        self.instrumentation.sleep(0.01, "scroll_wait")
+        self.instrumentation.end_profile(outcome="skipped", rating=4)
+
+        records = self.read_records()
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record['type'], 'profile')
+        self.assertEqual(record['outcome'], 'skipped')
+        self.assertEqual(record['stages']['capture']['count'], 2)
+        self.assertGreaterEqual(record['stages']['sleep.scroll_wait']['total_s'], 0.01)
+
+    def test_finish_writes_summary(self):
+        """Test that finish closes open profiles and appends a summary"""
+        for number in range(3):
+            self.instrumentation.begin_profile(number + 1)
+            self.instrumentation.record("quick_analysis", 0.1 * (number + 1))
+        summary = self.instrumentation.finish()
+
+        records = self.read_records()
+        self.assertEqual([r['type'] for r in records], ['profile'] * 3 + ['summary'])
+        self.assertEqual(records[0]['outcome'], 'incomplete')
+        self.assertEqual(summary['quick_analysis']['count'], 3)
+        self.assertAlmostEqual(summary['quick_analysis']['p50_s'], 0.2)
+        self.assertEqual(summary['profile_total']['count'], 3)
+
+    def test_disabled_records_nothing(self):
+        """Test that disabled instrumentation writes no file"""
+        instrumentation = Instrumentation(enabled=False, output_dir=self.temp_dir, run_id="off")
+        instrumentation.begin_profile(1)
+        with instrumentation.span("capture"):
+            pass
+        instrumentation.finish()
+
+        self.assertFalse(os.path.exists(instrumentation.output_path))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for tiered model roles
+Tests role configuration, per-role caching and ProfileAnalyzer routing
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+import ai.ai_manager as ai_manager
+from ai.ollama_client import OllamaLLM
+from ai.metrics import InferenceMetrics
+from replay import run_replay
+from modules.replay_backends import StubLLM
+from modules.profile_analyzer import ProfileAnalyzer
+
+SESSION_DIR = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test')
+TEST_ROLES = {
+    "quick_filter": {"model": "small-vision", "keep_alive": "30m", "options": {"num_ctx": 2048}},
+    "full_analysis": {"model": "large-vision"},
+    "json_repair": {"model": "text-only", "keep_alive": -1}
+}
+
+
+class TestModelRoles(unittest.TestCase):
+    """
+    Test cases for MODEL_ROLES routing
+    """
+
+    def setUp(self):
+        """Clear the per-role LLM cache"""
+        ai_manager._cached_llms.clear()
+
+    def tearDown(self):
+        """Clear the per-role LLM cache"""
+        ai_manager._cached_llms.clear()
+
+    @patch.dict('config.MODEL_ROLES', TEST_ROLES, clear=True)
+    def test_roles_create_distinct_cached_models(self):
+        """Test that each role gets its own configured and cached instance"""
+        quick = ai_manager.get_llm("quick_filter")
+        full = ai_manager.get_llm("full_analysis")
+
+        self.assertIs(quick, ai_manager.get_llm("quick_filter"))
+        self.assertEqual((quick.model, full.model), ("small-vision", "large-vision"))
+        self.assertEqual(quick.keep_alive, "30m")
+        self.assertIsNone(full.keep_alive)
+        self.assertEqual(quick.default_options['num_ctx'], 2048)
+        self.assertIn('temperature', quick.default_options)
+        self.assertEqual(ai_manager.create_llm("json_repair", model="other").model, "other")
+
+        with self.assertRaises(ValueError):
+            ai_manager.get_llm("unknown_role")
+
+    @patch('ollama.generate', return_value={"response": "{}"})
+    def test_keep_alive_forwarded(self, mock_generate):
+        """Test that keep_alive is sent with generate and warm-up calls"""
+        llm = OllamaLLM(model="small-vision", keep_alive="30m", max_retries=0)
+        llm.metrics = InferenceMetrics()
+        llm.generate("hi")
+        llm.warm_up()
+
+        for call in mock_generate.call_args_list:
+            self.assertEqual(call.kwargs['keep_alive'], "30m")
+
+    def test_analyzer_routes_calls_per_role(self):
+        """Test that quick, full and repair calls go to their own LLMs"""
+        quick = StubLLM()
+        full = StubLLM({'full': 'not json'})
+        repair = StubLLM()
+        analyzer = ProfileAnalyzer(llm=full, quick_llm=quick, repair_llm=repair)
+
+        analyzer.quick_analyze_profile(["a.png"])
+        result = analyzer.analyze_profile(["a.png"])
+
+        self.assertEqual(quick.calls, ['quick'])
+        self.assertEqual(full.calls, ['full'])
+        self.assertEqual(repair.calls, ['json_retry'])
+        self.assertEqual(result['decision'], 'NEXT_PROFILE')
+
+    def test_replay_reports_time_per_role_model(self):
+        """Test that replay attributes simulated inference time to each role"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            report = run_replay(SESSION_DIR, output_dir=temp_dir,
+                                role_latency={'quick_filter': 0.01, 'full_analysis': 0.05})
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        models = report['llm_models']
+        self.assertEqual(models['replay-stub:quick_filter']['calls'], 1)
+        self.assertGreater(models['replay-stub:full_analysis']['total_s'],
+                           models['replay-stub:quick_filter']['total_s'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
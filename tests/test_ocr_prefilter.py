@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the OCR engine and the OCR red-flag pre-filter
+The OCR engine is replaced by a fake so tesseract is not required
+"""
+
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.ocr_engine import OCREngine
+from modules.replay_backends import StubLLM
+from modules.profile_analyzer import ProfileAnalyzer
+
+
+class FakeOCREngine:
+    """OCR engine returning fixed text"""
+
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    def image_to_string(self, image):
+        self.calls += 1
+        return self.text
+
+
+class TestOCRPrefilter(unittest.TestCase):
+    """
+    Test cases for ProfileAnalyzer.ocr_prefilter
+    """
+
+    def setUp(self):
+        """Create an analyzer with the pre-filter enabled"""
+        self.llm = StubLLM()
+        self.analyzer = ProfileAnalyzer(llm=self.llm, ocr_prefilter=True)
+
+    def test_high_severity_rejects_without_llm(self):
+        """Test that a printed high-severity keyword skips the quick LLM call"""
+        with patch('modules.profile_analyzer.get_ocr_engine', return_value=FakeOCREngine("Social smoker, dog dad")):
+            result = self.analyzer.quick_analyze_profile(["first.png"])
+
+        self.assertEqual(result['source'], 'ocr_prefilter')
+        self.assertEqual(result['red_flag_details']['flag_name'], 'smoking')
+        self.assertEqual(self.llm.calls, [])
+        self.assertFalse(self.analyzer.should_continue_full_analysis(result))
+
+    def test_medium_severity_goes_to_llm(self):
+        """Test that keywords below the reject severity do not short-circuit"""
+        with patch('modules.profile_analyzer.get_ocr_engine', return_value=FakeOCREngine("Proudly radical gardener")):
+            result = self.analyzer.quick_analyze_profile(["first.png"])
+
+        self.assertNotIn('source', result)
+        self.assertEqual(self.llm.calls, ['quick'])
+
+    def test_disabled_prefilter_never_runs_ocr(self):
+        """Test that OCR is not called when the pre-filter is off"""
+        engine = FakeOCREngine("smoker")
+        analyzer = ProfileAnalyzer(llm=self.llm, ocr_prefilter=False)
+        with patch('modules.profile_analyzer.get_ocr_engine', return_value=engine):
+            analyzer.quick_analyze_profile(["first.png"])
+
+        self.assertEqual(engine.calls, 0)
+        self.assertEqual(self.llm.calls, ['quick'])
+
+    def test_ocr_failure_falls_back_to_llm(self):
+        """Test that a missing OCR backend lets the profile through to the LLM"""
+        engine = OCREngine()
+        engine.backend = None
+        with self.assertRaises(RuntimeError):
+            engine.image_to_string("first.png")
+
+        with patch('modules.profile_analyzer.get_ocr_engine', return_value=engine):
+            self.analyzer.quick_analyze_profile(["first.png"])
+        self.assertEqual(self.llm.calls, ['quick'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for end-of-profile detection
+The OCR engine is replaced by a fake so tesseract is not required
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.profile_end_detector import ProfileEndDetector
+from modules.ui_detector import UIDetector
+
+
+class FakeOCREngine:
+    """OCR engine returning fixed text and remembering the image size"""
+
+    def __init__(self, text):
+        self.text = text
+        self.sizes = []
+
+    def is_available(self):
+        return True
+
+    def image_to_string(self, image):
+        self.sizes.append(image.size)
+        return self.text
+
+
+class FakeUIDetector:
+    """UI detector returning fixed markers"""
+
+    def __init__(self, found):
+        self.found = found
+        self.calls = 0
+
+    def find_profile_end_markers(self, screenshot, region=0.4):
+        self.calls += 1
+        return self.found
+
+
+def measurement(displacement, expected=None, content_rows=1000):
+    return {'displacement': displacement, 'expected': expected, 'content_rows': content_rows}
+
+
+class TestProfileEndDetector(unittest.TestCase):
+    """
+    Test cases for the end-of-profile signals and their combined confidence
+    """
+
+    def setUp(self):
+        """Detector without marker OCR"""
+        self.detector = ProfileEndDetector(ocr_markers=False)
+
+    def test_still_scroll_ends_and_drops_capture(self):
+        """Test that one scroll without movement ends the profile"""
+        result = self.detector.check(measurement(0, expected=800), "new.png")
+        self.assertTrue(result['end'])
+        self.assertTrue(result['duplicate'])
+        self.assertEqual(list(result['signals']), ['still'])
+
+    def test_normal_scroll_continues(self):
+        """Test that a full-length scroll does not end the profile"""
+        result = self.detector.check(measurement(800, expected=800), "new.png")
+        self.assertFalse(result['end'])
+        self.assertEqual(result['confidence'], 0.0)
+
+    def test_short_scroll_confidence(self):
+        """Test that only a clearly cut-short scroll ends the profile on its own"""
+        self.assertTrue(self.detector.check(measurement(100, expected=800), "new.png")['end'])
+
+        result = self.detector.check(measurement(600, expected=800), "new.png")
+        self.assertFalse(result['end'])
+        self.assertFalse(result['duplicate'])
+        self.assertAlmostEqual(result['signals']['short_scroll'], 0.225)
+
+    def test_markers_combine_with_scroll_signals(self):
+        """Test that OCR markers end the profile and add to a weak scroll signal"""
+        ui = FakeUIDetector(["hide", "report"])
+        detector = ProfileEndDetector(ui_detector=ui, ocr_markers=True)
+        with patch('modules.profile_end_detector.get_ocr_engine', return_value=FakeOCREngine("")):
+            both = detector.check(measurement(800, expected=800), "new.png")
+            ui.found = ["report"]
+            partial = detector.check(measurement(800, expected=800), "new.png")
+            combined = detector.check(measurement(500, expected=800), "new.png")
+            detector.check(measurement(0), "new.png")
+
+        self.assertTrue(both['end'])
+        self.assertFalse(partial['end'])
+        self.assertTrue(combined['end'])
+        self.assertEqual(ui.calls, 3)  # Not run on a still capture
+
+    def test_markers_only_when_uncertain(self):
+        """Test that the default mode skips OCR after full and conclusive scrolls"""
+        ui = FakeUIDetector(["hide", "report"])
+        detector = ProfileEndDetector(ui_detector=ui, ocr_markers="uncertain")
+        with patch('modules.profile_end_detector.get_ocr_engine', return_value=FakeOCREngine("")):
+            full = detector.check(measurement(800, expected=800), "new.png")
+            detector.check(measurement(760, expected=800), "new.png")
+            self.assertEqual(ui.calls, 0)
+            self.assertTrue(detector.check(measurement(100, expected=800), "new.png")['end'])
+            self.assertEqual(ui.calls, 0)
+            inconclusive = detector.check(measurement(600, expected=800), "new.png")
+            self.assertEqual(ui.calls, 1)
+            detector.check(measurement(None, content_rows=None), "new.png", identical=lambda: False)
+            self.assertEqual(ui.calls, 2)
+
+        self.assertFalse(full['end'])
+        self.assertTrue(inconclusive['end'])
+        self.assertIn('markers', inconclusive['signals'])
+
+    def test_identical_fallback_when_unmeasured(self):
+        """Test that the screenshot comparison is used when no displacement was measured"""
+        unmeasured = measurement(None, content_rows=None)
+        self.assertTrue(self.detector.check(unmeasured, "new.png", identical=lambda: True)['duplicate'])
+        self.assertFalse(self.detector.check(unmeasured, "new.png", identical=lambda: False)['end'])
+
+    def test_find_profile_end_markers_reads_bottom(self):
+        """Test that marker OCR runs on the bottom region and matches whole words"""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir)
+        path = os.path.join(work_dir, "frame.png")
+        Image.new("RGB", (100, 200), "white").save(path)
+
+        engine = FakeOCREngine("Hide\nReport")
+        with patch('modules.ui_detector.get_ocr_engine', return_value=engine):
+            self.assertEqual(UIDetector().find_profile_end_markers(path, region=0.25), ["hide", "report"])
+            engine.text = "Reported hidden gems"
+            self.assertEqual(UIDetector().find_profile_end_markers(path), [])
+        self.assertEqual(engine.sizes[0], (100, 50))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent index of evaluated profiles
+"""
+
+import sys
+import os
+import random
+import shutil
+import tempfile
+import json
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.profile_index import ProfileIndex, hamming_distances, MAGIC, RECORD
+from replay import run_replay
+import profile_index
+import chrome_mask
+
+SESSION_DIR = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test')
+
+DAY = 86400
+
+
+class TestProfileIndex(unittest.TestCase):
+    """
+    Test cases for lookup, persistence and expiry
+    """
+
+    def setUp(self):
+        """Create an index in a temporary directory"""
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.path = os.path.join(self.work_dir, "index", "profiles.hidx")
+        self.index = ProfileIndex(self.path, max_distance=4, max_age_days=30)
+
+    def test_hamming_distances(self):
+        """Test the vectorised distance against a bit count"""
+        rng = random.Random(3)
+        hashes = [rng.getrandbits(64) for _ in range(100)]
+        query = rng.getrandbits(64)
+        expected = [bin(h ^ query).count("1") for h in hashes]
+        self.assertEqual(hamming_distances(np.array(hashes, dtype=np.uint64), query).tolist(), expected)
+
+    def test_near_match_lookup(self):
+        """Test that small hash differences match and large ones do not"""
+        self.index.add(0xFFFF0000FFFF0000, "SKIP", 3)
+        self.index.add(0x0123456789ABCDEF, "ENGAGE", 8)
+
+        match = self.index.lookup(0xFFFF0000FFFF0000 ^ 0b101)
+        self.assertEqual((match['decision'], match['rating'], match['distance']), ("SKIP", 3, 2))
+        self.assertEqual(self.index.lookup(0x0123456789ABCDEF)['decision'], "ENGAGE")
+        self.assertIsNone(self.index.lookup(0xFFFF0000FFFF0000 ^ 0xFF))
+        self.assertIsNone(ProfileIndex(os.path.join(self.work_dir, "empty.hidx")).lookup(0))
+
+    def test_closest_match_wins(self):
+        """Test that the nearest record is returned when several are in range"""
+        self.index.add(0b1111, "SKIP", 2)
+        self.index.add(0b0001, "ENGAGE", 9)
+        self.assertEqual(self.index.lookup(0b0000)['decision'], "ENGAGE")
+
+    def test_records_persist(self):
+        """Test that records are fixed-width and survive reopening"""
+        self.index.add(42, "SKIP")
+        self.index.add(7, "ENGAGE", 6)
+        self.assertEqual(os.path.getsize(self.path), len(MAGIC) + 2 * RECORD.size)
+
+        reopened = ProfileIndex(self.path, max_distance=0)
+        self.assertEqual(len(reopened), 2)
+        self.assertIsNone(reopened.lookup(42)['rating'])
+        self.assertEqual(reopened.lookup(7)['rating'], 6)
+
+    def test_expiry(self):
+        """Test that old decisions are ignored and removed on reopening"""
+        now = time.time()
+        self.index.add(0xAAAA, "SKIP", timestamp=now - 40 * DAY)
+        self.index.add(0x5555, "SKIP", timestamp=now - DAY)
+        self.assertIsNone(self.index.lookup(0xAAAA, now=now))
+
+        reopened = ProfileIndex(self.path, max_distance=0, max_age_days=30)
+        self.assertEqual(len(reopened), 1)
+        self.assertEqual(os.path.getsize(self.path), len(MAGIC) + RECORD.size)
+        self.assertIsNotNone(reopened.lookup(0x5555))
+
+    def test_damaged_files(self):
+        """Test that a torn trailing record is ignored and a foreign file is not used"""
+        self.index.add(5, "SKIP")
+        with open(self.path, 'ab') as f:
+            f.write(b"\x01\x02\x03")
+        reopened = ProfileIndex(self.path, max_distance=0)
+        self.assertEqual(len(reopened), 1)
+        reopened.add(6, "ENGAGE")
+        self.assertEqual(ProfileIndex(self.path, max_distance=0).lookup(6)['decision'], "ENGAGE")
+
+        foreign = os.path.join(self.work_dir, "foreign.hidx")
+        with open(foreign, 'wb') as f:
+            f.write(b"not an index")
+        self.assertEqual(len(ProfileIndex(foreign)), 0)
+
+    def test_replay_skips_known_profile(self):
+        """Test that a profile skipped in one run is skipped without LLM calls in the next"""
+        responses = os.path.join(self.work_dir, "responses.json")
+        with open(responses, 'w') as f:
+            json.dump({"quick": '{"rating": 7, "has_red_flags": false}',
+                       "full": '{"rating": 3, "reason": "Not a match", "decision": "SKIP", "comment": ""}'}, f)
+
+        with patch.dict('config.PROFILE_INDEX', {"enabled": True}), \
+                patch('main.get_profile_index', return_value=self.index):
+            first = run_replay(SESSION_DIR, responses=responses, output_dir=self.work_dir)
+            second = run_replay(SESSION_DIR, responses=responses, output_dir=self.work_dir)
+
+        self.assertEqual(first['outcomes'], ['skipped'])
+        self.assertEqual(second['outcomes'], ['index_skipped'])
+        self.assertEqual(second['llm_models'], {})
+        self.assertEqual(len(self.index), 1)
+
+    def test_replay_does_not_engage_twice(self):
+        """Test that a profile engaged in one run is dismissed without LLM calls or a second like"""
+        with patch.dict('config.PROFILE_INDEX', {"enabled": True}), \
+                patch('main.get_profile_index', return_value=self.index), \
+                patch('replay.FakeInteractionHandler.type_text', autospec=True, return_value=True) as type_text:
+            first = run_replay(SESSION_DIR, output_dir=self.work_dir)
+            typed = type_text.call_count
+            second = run_replay(SESSION_DIR, output_dir=self.work_dir)
+
+        self.assertEqual(first['outcomes'], ['engaged'])
+        self.assertEqual(second['outcomes'], ['index_engaged'])
+        self.assertEqual(second['llm_models'], {})
+        self.assertEqual(type_text.call_count, typed)
+        self.assertEqual(self.index.lookup(self.index.records["hash"][0])['decision'], "ENGAGE")
+
+    def test_replay_leaves_global_state_alone(self):
+        """Test that replay decisions and learned masks do not reach the live index and mask"""
+        live_mask = chrome_mask.ChromeMask()
+        previous_index = profile_index.set_profile_index(self.index)
+        previous_mask = chrome_mask.set_chrome_mask(live_mask)
+        try:
+            with patch.dict('config.PROFILE_INDEX', {"enabled": True}):
+                report = run_replay(SESSION_DIR, output_dir=self.work_dir)
+            self.assertIs(profile_index.get_profile_index(), self.index)
+            self.assertIs(chrome_mask.get_chrome_mask(), live_mask)
+        finally:
+            profile_index.set_profile_index(previous_index)
+            chrome_mask.set_chrome_mask(previous_mask)
+
+        self.assertEqual(report['outcomes'], ['engaged'])
+        self.assertEqual(len(self.index), 0)
+        self.assertEqual(live_mask.learned, {})
+
+    def test_failed_analysis_not_recorded(self):
+        """Test that LLM failures and unparsable responses are not stored as decisions"""
+        responses = os.path.join(self.work_dir, "responses.json")
+        with open(responses, 'w') as f:
+            json.dump({"quick": '{"rating": 7, "has_red_flags": false}', "full": "not json",
+                       "json_retry": "still not json"}, f)
+
+        with patch.dict('config.PROFILE_INDEX', {"enabled": True}), \
+                patch('main.get_profile_index', return_value=self.index):
+            unparsable = run_replay(SESSION_DIR, responses=responses, output_dir=self.work_dir)
+            with patch('replay.StubLLM.generate', side_effect=TimeoutError("timed out")):
+                timed_out = run_replay(SESSION_DIR, responses=responses, output_dir=self.work_dir)
+            retried = run_replay(SESSION_DIR, responses=responses, output_dir=self.work_dir)
+
+        self.assertEqual(unparsable['outcomes'], ['skipped'])
+        self.assertEqual(timed_out['outcomes'], ['quick_filtered'])
+        self.assertEqual(retried['outcomes'], ['skipped'])
+        self.assertEqual(len(self.index), 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
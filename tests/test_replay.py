@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline replay harness
+Runs the full automation loop against screenshots_for_test with a stub LLM
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from replay import run_replay
+from modules.replay_backends import ReplaySession, ReplayDevice, StubLLM
+
+SESSION_DIR = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test')
+
+
+class TestReplay(unittest.TestCase):
+    """
+    Test cases for replay backends and run_replay
+    """
+
+    def setUp(self):
+        """Create a temporary directory for timing records"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_device_scroll_click_and_advance(self):
+        """Test that swipes advance frames, clicks show post-click frames and profile_load moves on"""
+        session = ReplaySession([
+            {'frames': ['end_screenshot.png', 'ocr_test_check_string_hispanic.png'],
+             'post_click': ['end_screenshot.png']}
+        ], root=SESSION_DIR)
+        device = ReplayDevice(session, repeat=2)
+
+        device.scroll()
+        device.scroll()
+        self.assertEqual(device.frame_index, 1)
+
+        device.on_span("sleep.profile_load", 0, 0, {})
+        self.assertEqual(device.profile_position, 0)
+
+        device.click(10, 10)
+        self.assertEqual(device.overlay, 'end_screenshot.png')
+        device.on_span("sleep.profile_load", 0, 0, {})
+        self.assertEqual((device.profile_position, device.frame_index), (1, 0))
+
+        device.click(10, 10)
+        device.on_span("sleep.profile_load", 0, 0, {})
+        self.assertTrue(device.exhausted)
+        self.assertIsNone(device.current_frame())
+
+    def test_stub_llm_cycles_responses(self):
+        """Test that recorded responses are returned per purpose in order"""
+        stub = StubLLM({'quick': ['a', 'b']})
+        self.assertEqual([stub.generate("p", purpose="quick") for _ in range(3)], ['a', 'b', 'a'])
+        self.assertIn('ENGAGE', stub.generate("p", purpose="unknown"))
+
+    def test_run_replay_reports_throughput(self):
+        """Test a full stub replay of the seed corpus"""
+        report = run_replay(SESSION_DIR, llm="stub", repeat=2, output_dir=self.temp_dir)
+
+        self.assertEqual(report['profiles'], 2)
+        self.assertEqual(report['outcomes'], ['engaged', 'engaged'])
+        self.assertGreater(report['profiles_per_hour'], 0)
+        self.assertEqual(report['stages']['quick_analysis']['count'], 2)
+        self.assertEqual(report['stages']['full_analysis']['count'], 2)
+
+        with open(report['timings_file']) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[-1]['type'], 'summary')
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
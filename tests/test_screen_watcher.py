@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the background screen watcher
+Uses a scripted grabber so no display is required
+"""
+
+import sys
+import os
+import time
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from PIL import Image
+
+from modules.screen_watcher import ScreenWatcher
+from modules.screenshot_handler import ScreenshotHandler
+
+
+class ScriptedGrabber:
+    """Grabber returning a solid frame whose shade can be changed by the test"""
+
+    def __init__(self):
+        self.shade = 0
+        self.lock = threading.Lock()
+
+    def set_shade(self, shade):
+        with self.lock:
+            self.shade = shade
+
+    def grab_frame(self):
+        with self.lock:
+            return Image.new("RGB", (90, 160), (self.shade, self.shade, self.shade))
+
+
+class TestScreenWatcher(unittest.TestCase):
+    """
+    Test cases for ScreenWatcher
+    """
+
+    def setUp(self):
+        """Start a fast watcher over a scripted grabber"""
+        self.grabber = ScriptedGrabber()
+        self.watcher = ScreenWatcher(self.grabber, fps=50, buffer_size=10,
+                                     change_threshold=2.0, stable_frames=3)
+        self.events = []
+        self.watcher.subscribe(lambda event, info: self.events.append(event))
+        self.assertTrue(self.watcher.start())
+
+    def tearDown(self):
+        """Stop the watcher"""
+        self.watcher.stop()
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that only the most recent frames are kept"""
+        time.sleep(0.5)
+        self.assertEqual(len(self.watcher.frames), 10)
+        self.assertIsNotNone(self.watcher.latest_frame())
+
+    def test_change_and_stable_events(self):
+        """Test that a content change publishes changed then stable"""
+        self.assertTrue(self.watcher.wait_for_stable(timeout=2.0))
+
+        change_time = time.time()
+        self.grabber.set_shade(200)
+
+        self.assertTrue(self.watcher.wait_for_change(since=change_time, timeout=2.0))
+        self.assertTrue(self.watcher.wait_for_stable(since=change_time, timeout=2.0))
+        time.sleep(0.1)
+        self.assertEqual(self.events, ["changed", "stable"])
+
+    def test_wait_for_change_times_out_on_static_screen(self):
+        """Test that a static screen does not report a change"""
+        self.assertFalse(self.watcher.wait_for_change(timeout=0.3))
+        self.assertEqual(self.events, [])
+
+
+class TestPolling(unittest.TestCase):
+    """
+    Test cases for the lightweight grab used by the watcher
+    """
+
+    def test_watcher_prefers_poll_frame(self):
+        """Test that the watcher polls instead of calling the activating grab"""
+        grabber = ScriptedGrabber()
+        grabber.poll_frame = grabber.grab_frame
+        grabber.grab_frame = lambda: self.fail("grab_frame() called by the watcher")
+        watcher = ScreenWatcher(grabber, fps=50, buffer_size=5)
+        watcher.start()
+        time.sleep(0.2)
+        watcher.stop()
+        self.assertIsNotNone(watcher.latest_frame())
+
+    def test_handler_poll_grabs_cached_region(self):
+        """Test that polling grabs the window bounds without activation or delay"""
+        handler = ScreenshotHandler.__new__(ScreenshotHandler)
+        handler.window_bounds = {'left': 10, 'top': 20, 'width': 90, 'height': 160}
+        frame = Image.new("RGB", (90, 160))
+        with patch('modules.screenshot_handler.ImageGrab.grab', return_value=frame) as grab, \
+                patch('modules.screenshot_handler.time.sleep') as sleep:
+            self.assertIs(handler.poll_frame(), frame)
+        grab.assert_called_once_with(bbox=(10, 20, 100, 180))
+        sleep.assert_not_called()
+
+
+class TestCaptureFreshness(unittest.TestCase):
+    """
+    Test cases for captures served from the watcher
+    """
+
+    def setUp(self):
+        """Create a handler whose captures stay in memory"""
+        self.handler = ScreenshotHandler.__new__(ScreenshotHandler)
+        self.handler.screenshot_dir = "screenshots"
+        self.handler.window_bounds = None
+        self.handler.recorder = None
+        writer = patch('modules.screenshot_handler.get_screenshot_writer')
+        self.writer = writer.start()
+        self.addCleanup(writer.stop)
+        self.writer.return_value.path_for.side_effect = lambda path: path
+        self.writer.return_value.submit.side_effect = lambda image, path, on_encoded=None: path
+
+    def submitted_frame(self):
+        return self.writer.return_value.submit.call_args[0][0]
+
+    def test_stale_frame_is_not_used(self):
+        """Test that a frame grabbed before the request falls back to an on-demand grab"""
+        stale = Image.new("RGB", (90, 160), "black")
+        fresh = Image.new("RGB", (90, 160), "white")
+        # A watcher whose last frame was grabbed before the click
+        self.handler.watcher = ScreenWatcher(ScriptedGrabber(), fps=50)
+        self.handler.watcher.frames.append((time.time() - 1.0, stale, 0.0))
+        with patch.object(ScreenshotHandler, 'grab_frame', return_value=fresh) as grab_frame:
+            self.assertIsNotNone(self.handler.capture_screenshot("after_click.png"))
+        grab_frame.assert_called_once()
+        self.assertIs(self.submitted_frame(), fresh)
+
+    def test_frame_grabbed_after_request_is_used(self):
+        """Test that a running watcher serves the first frame grabbed after the request"""
+        grabber = ScriptedGrabber()
+        watcher = ScreenWatcher(grabber, fps=50)
+        self.assertTrue(watcher.start())
+        self.addCleanup(watcher.stop)
+        time.sleep(0.1)
+        stale = watcher.latest_frame()
+
+        grabber.set_shade(255)
+        self.handler.watcher = watcher
+        with patch.object(ScreenshotHandler, 'grab_frame') as grab_frame:
+            self.assertIsNotNone(self.handler.capture_screenshot("after_swipe.png"))
+        grab_frame.assert_not_called()
+        self.assertIsNot(self.submitted_frame(), stale)
+        self.assertEqual(self.submitted_frame().getpixel((0, 0)), (255, 255, 255))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test script for the background screenshot writer
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules import screenshot_writer
+from modules.screenshot_writer import ScreenshotWriter, load_image
+
+
+def make_frame(seed, size=(64, 48)):
+    """Deterministic noisy RGB frame"""
+    rng = np.random.RandomState(seed)
+    return Image.fromarray(rng.randint(0, 256, (size[1], size[0], 3), dtype=np.uint8))
+
+
+class TestScreenshotWriter(unittest.TestCase):
+    """
+    Test cases for queued screenshot encoding and the in-memory frame cache
+    """
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+
+    def path(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def writer(self, **kwargs):
+        writer = ScreenshotWriter(**kwargs)
+        self.addCleanup(writer.close, 5)
+        return writer
+
+    def blocked_encode(self):
+        """Patch encode so every write waits for the returned event"""
+        release = threading.Event()
+        real_encode = screenshot_writer.encode
+
+        def encode(*args, **kwargs):
+            release.wait(5)
+            real_encode(*args, **kwargs)
+
+        patcher = patch('modules.screenshot_writer.encode', side_effect=encode)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(release.set)
+        return release
+
+    def test_formats_are_lossless(self):
+        """Test that every format round-trips the pixels and sets the file extension"""
+        frame = make_frame(1)
+        for image_format in ("png", "webp", "npy"):
+            writer = self.writer(image_format=image_format)
+            path = writer.submit(frame, self.path("capture.png"))
+            self.assertTrue(path.endswith("." + image_format))
+            self.assertTrue(writer.flush(5))
+
+            with patch('modules.screenshot_writer.get_screenshot_writer', return_value=ScreenshotWriter()):
+                stored = load_image(path)
+            self.assertTrue(np.array_equal(np.asarray(stored.convert("RGB")), np.asarray(frame)), image_format)
+
+    def test_compress_level(self):
+        """Test that the PNG compression level is applied"""
+        frame = Image.new("RGB", (200, 200), "white")
+        sizes = []
+        for level in (0, 9):
+            writer = self.writer(image_format="png", compress_level=level, asynchronous=False)
+            sizes.append(os.path.getsize(writer.submit(frame, self.path(f"level_{level}.png"))))
+        self.assertGreater(sizes[0], sizes[1])
+
+    def test_frames_served_from_memory_until_written(self):
+        """Test that a queued frame is readable before it reaches the disk"""
+        release = self.blocked_encode()
+        writer = self.writer(image_format="png")
+        frame = make_frame(2)
+        path = writer.submit(frame, self.path("queued.png"))
+
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(writer.wait_for(path, timeout=0.05))
+        with patch('modules.screenshot_writer.get_screenshot_writer', return_value=writer):
+            self.assertIs(load_image(path), frame)
+
+        release.set()
+        self.assertTrue(writer.wait_for(path, timeout=5))
+        self.assertTrue(os.path.exists(path))
+        stats = writer.stats()
+        self.assertEqual((stats['written'], stats['pending']), (1, 0))
+        self.assertGreater(stats['write_p50_s'], 0)
+
+    def test_full_queue_stalls(self):
+        """Test that a full queue blocks the caller and is counted"""
+        release = self.blocked_encode()
+        writer = self.writer(image_format="png", workers=1, queue_size=1)
+        writer.submit(make_frame(1), self.path("a.png"))
+        # The worker holds the first frame; the second fills the queue
+        for _ in range(100):
+            if writer._queue.empty():
+                break
+            threading.Event().wait(0.01)
+        writer.submit(make_frame(2), self.path("b.png"))
+
+        third = threading.Thread(target=writer.submit, args=(make_frame(3), self.path("c.png")))
+        third.start()
+        third.join(0.1)
+        self.assertTrue(third.is_alive())
+
+        release.set()
+        third.join(5)
+        self.assertTrue(writer.flush(5))
+        stats = writer.stats()
+        self.assertEqual((stats['written'], stats['stalls'], stats['max_queue_depth']), (3, 1, 1))
+
+    def test_newest_frame_wins(self):
+        """Test that the latest frame submitted for a path is the one on disk"""
+        writer = self.writer(image_format="png", workers=2)
+        path = self.path("reused.png")
+        for seed in range(1, 6):
+            writer.submit(make_frame(seed), path)
+        self.assertTrue(writer.flush(5))
+        self.assertTrue(np.array_equal(np.asarray(Image.open(path)), np.asarray(make_frame(5))))
+
+    def test_discard(self):
+        """Test that a discarded frame is never left on disk"""
+        release = self.blocked_encode()
+        writer = self.writer(image_format="png")
+        queued = writer.submit(make_frame(1), self.path("queued.png"))
+        writer.discard(queued)
+        release.set()
+        self.assertTrue(writer.flush(5))
+        writer.close(5)
+        self.assertFalse(os.path.exists(queued))
+        self.assertIsNone(writer.cached(queued))
+
+        written = writer.submit(make_frame(2), self.path("written.png"))
+        self.assertTrue(writer.wait_for(written, timeout=5))
+        writer.discard(written)
+        self.assertFalse(os.path.exists(written))
+
+    def test_path_state_released(self):
+        """Test that per-path bookkeeping does not grow with the number of captures"""
+        writer = self.writer(image_format="png", workers=2)
+        for index in range(20):
+            path = writer.submit(make_frame(index), self.path(f"capture_{index % 5}.png"))
+            if index % 3 == 0:
+                writer.discard(path)
+        self.assertTrue(writer.flush(5))
+        writer.close(5)
+        self.assertEqual((writer._latest, writer._path_locks, writer._path_users), ({}, {}, {}))
+
+    def test_unknown_format(self):
+        """Test that an unsupported format is rejected up front"""
+        with self.assertRaises(ValueError):
+            ScreenshotWriter(image_format="bmp")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
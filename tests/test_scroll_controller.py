@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for adaptive scroll distance
+"""
+
+import sys
+import os
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.scroll_controller import ScrollController
+from tests.test_frame_stitcher import make_profile, make_frames, HEADER_ROWS, FOOTER_ROWS, CONTENT_ROWS
+
+WINDOW = {'width': 360, 'height': HEADER_ROWS + CONTENT_ROWS + FOOTER_ROWS}
+
+
+class SimulatedDevice:
+    """
+    Scrolls a tall profile by a fixed multiple of the swipe length (fling)
+    """
+
+    def __init__(self, gain, rows=6000):
+        self.profile = make_profile(rows)
+        self.gain = gain
+        self.top = 0
+        self.bottom = rows - CONTENT_ROWS
+
+    def swipe(self, start_y, end_y):
+        self.top = min(self.top + int((start_y - end_y) * self.gain), self.bottom)
+
+    def capture(self):
+        return make_frames(self.profile, [self.top])[0]
+
+
+class TestScrollController(unittest.TestCase):
+    """
+    Test cases for displacement measurement and swipe planning
+    """
+
+    def scroll(self, controller, device, swipes):
+        """Run swipes through the controller and return the measurements"""
+        previous = device.capture()
+        controller.record_first_capture()
+        measurements = []
+        for _ in range(swipes):
+            _, start_y, _, end_y, _ = controller.next_swipe(WINDOW)
+            device.swipe(start_y, end_y)
+            current = device.capture()
+            measurements.append(controller.measure(previous, current))
+            previous = current
+        return measurements
+
+    def test_converges_to_target_overlap(self):
+        """Test that swipes settle at the target overlap whatever the device gain"""
+        for gain in (0.9, 1.0, 1.4):
+            controller = ScrollController(target_overlap=0.1, smoothing=1.0, min_fraction=0.1)
+            measurements = self.scroll(controller, SimulatedDevice(gain), 4)
+            self.assertAlmostEqual(controller.gain, gain, delta=0.02)
+            self.assertAlmostEqual(measurements[-1]['overlap'], 0.1, delta=0.02)
+
+    def test_overshoot_shrinks_next_swipe(self):
+        """Test that a swipe skipping past the overlap makes the next one shorter"""
+        controller = ScrollController(target_overlap=0.1, min_fraction=0.1)
+        device = SimulatedDevice(2.0)
+        measurements = self.scroll(controller, device, 1)
+
+        self.assertIsNone(measurements[0]['displacement'])
+        first_swipe = controller.last_swipe
+        controller.next_swipe(WINDOW)
+        self.assertLess(controller.last_swipe, first_swipe)
+
+    def test_end_of_profile_keeps_gain(self):
+        """Test that a swipe that no longer moves the profile does not reset the gain"""
+        controller = ScrollController(target_overlap=0.1, smoothing=1.0, min_fraction=0.1, initial_fraction=0.5)
+        device = SimulatedDevice(1.0, rows=1200)
+        measurements = self.scroll(controller, device, 4)
+
+        self.assertEqual(measurements[-1]['displacement'], 0)
+        self.assertAlmostEqual(controller.gain, 1.0, delta=0.02)
+
+    def test_profile_report(self):
+        """Test the per-profile capture and swipe counts"""
+        controller = ScrollController(min_fraction=0.1)
+        self.scroll(controller, SimulatedDevice(1.0), 3)
+        report = controller.end_profile()
+
+        self.assertEqual(report['captures'], 4)
+        self.assertEqual(report['swipes'], 3)
+        self.assertIsNotNone(report['mean_overlap'])
+
+        controller.begin_profile()
+        self.assertEqual(controller.end_profile()['captures'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
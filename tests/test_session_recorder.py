@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script for the session recorder archive
+Tests frame deduplication, random access and replaying a recorded archive
+"""
+
+import sys
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from PIL import Image
+from replay import run_replay
+from modules.session_recorder import SessionRecorder, SessionArchive, RecordingLLM, request_digest
+from modules.replay_backends import StubLLM
+from modules import screenshot_writer
+from modules.screenshot_writer import ScreenshotWriter
+
+SESSION_DIR = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test')
+FRAME_PATH = os.path.join(SESSION_DIR, 'end_screenshot.png')
+
+
+class TestSessionRecorder(unittest.TestCase):
+    """
+    Test cases for SessionRecorder and SessionArchive
+    """
+
+    def setUp(self):
+        """Create a temporary archive path"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.archive_path = os.path.join(self.temp_dir, "session.hrec")
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_frames_deduplicated_and_randomly_accessible(self):
+        """Test that identical frames are stored once and read back by index"""
+        recorder = SessionRecorder(self.archive_path)
+        recorder.begin_profile(1)
+        recorder.record_frame(FRAME_PATH, name="a.png")
+        recorder.record_frame(Image.new("RGB", (20, 10), "red"), name="b.png")
+        recorder.record_action("click", x=5, y=6)
+        recorder.record_frame(FRAME_PATH, name="c.png")
+        recorder.close()
+
+        with SessionArchive(self.archive_path) as archive:
+            self.assertEqual(archive.frame_count, 2)
+            self.assertEqual([e['frame'] for e in archive.events_of_type('frame')], [0, 1, 0])
+            with open(FRAME_PATH, 'rb') as f:
+                self.assertEqual(archive.frame_bytes(0), f.read())
+            self.assertEqual(archive.frame_image(1).size, (20, 10))
+            self.assertEqual([e['name'] for e in archive.events_of_type('frame')], ["a.png", "b.png", "c.png"])
+            self.assertEqual(archive.events_of_type('action')[0]['args'], {'x': 5, 'y': 6})
+            self.assertEqual(archive.profiles(), [{'frames': [0, 1], 'post_click': [0]}])
+            with self.assertRaises(IndexError):
+                archive.frame_bytes(2)
+
+    def test_frames_stored_from_writer_keep_event_order(self):
+        """Test that frames encoded later by the screenshot writer keep their capture position"""
+        recorder = SessionRecorder(self.archive_path)
+        writer = ScreenshotWriter(image_format="png")
+        release = threading.Event()
+        real_encode = screenshot_writer.encode
+
+        def encode(*args, **kwargs):
+            release.wait(5)
+            real_encode(*args, **kwargs)
+
+        with patch('modules.screenshot_writer.encode', side_effect=encode):
+            path = writer.submit(Image.new("RGB", (20, 10), "blue"), os.path.join(self.temp_dir, "a.png"),
+                                 on_encoded=recorder.reserve_frame("a.png"))
+            recorder.record_action("click", x=1, y=2)
+            dropped = writer.submit(Image.new("RGB", (20, 10), "green"), os.path.join(self.temp_dir, "b.png"),
+                                    on_encoded=recorder.reserve_frame("b.png"))
+            writer.discard(dropped)
+            release.set()
+            recorder.close()
+        writer.close(5)
+
+        with SessionArchive(self.archive_path) as archive:
+            self.assertEqual([e['type'] for e in archive.events], ['frame', 'action', 'frame'])
+            self.assertEqual(archive.frame_count, 2)
+            kept, discarded = [e['frame'] for e in archive.events_of_type('frame')]
+            with open(path, 'rb') as f:
+                self.assertEqual(archive.frame_bytes(kept), f.read())
+            self.assertEqual(archive.frame_image(discarded).getpixel((0, 0)), (0, 128, 0))
+        self.assertFalse(os.path.exists(dropped))
+
+    def test_npy_frames_readable(self):
+        """Test that frames stored as raw arrays decode like encoded images"""
+        recorder = SessionRecorder(self.archive_path)
+        buffer = io.BytesIO()
+        np.save(buffer, np.full((10, 20, 3), 200, dtype=np.uint8))
+        recorder.reserve_frame("a.npy")(buffer.getvalue())
+        recorder.close()
+
+        with SessionArchive(self.archive_path) as archive:
+            self.assertEqual(archive.frame_image(0).getpixel((0, 0)), (200, 200, 200))
+
+    def test_unclosed_archive_recovered(self):
+        """Test that a run killed before close() keeps its settled events and frames"""
+        recorder = SessionRecorder(self.archive_path)
+        recorder.begin_profile(1)
+        recorder.reserve_frame("a.png")(b"frame a")
+        recorder.record_action("click", x=1, y=2)
+        store_b = recorder.reserve_frame("b.png")
+        recorder.record_action("swipe", start=[0, 9], end=[0, 1])
+
+        # Killed while frame b is still being encoded: nothing from b onwards is kept
+        with SessionArchive(self.archive_path) as archive:
+            self.assertEqual([e['type'] for e in archive.events], ['profile', 'frame', 'action'])
+            self.assertEqual(archive.frame_count, 1)
+            self.assertEqual(archive.frame_bytes(0), b"frame a")
+            self.assertEqual(archive.profiles(), [{'frames': [0], 'post_click': []}])
+
+        # A torn chunk at the end is ignored
+        store_b(b"frame b")
+        with open(self.archive_path, 'rb') as f:
+            settled = f.read()
+        with open(self.archive_path, 'wb') as f:
+            f.write(settled[:-3])
+        with SessionArchive(self.archive_path) as archive:
+            self.assertEqual(archive.frame_count, 2)
+            self.assertEqual([e['type'] for e in archive.events], ['profile', 'frame', 'action'])
+        recorder._file.close()
+
+    def test_llm_digest_reuses_stored_frames(self):
+        """Test that recorded LLM requests are fingerprinted without rereading their images"""
+        with open(FRAME_PATH, 'rb') as f:
+            data = f.read()
+        recorder = SessionRecorder(self.archive_path)
+        recorder.reserve_frame("end.png", path=FRAME_PATH)(data)
+        llm = RecordingLLM(StubLLM({'quick': 'quick answer'}), recorder)
+
+        with patch('modules.session_recorder.image_file_bytes') as image_file_bytes:
+            llm.generate("prompt", images=[FRAME_PATH], purpose="quick")
+        image_file_bytes.assert_not_called()
+        recorder.close()
+
+        with SessionArchive(self.archive_path) as archive:
+            self.assertEqual(archive.events_of_type('llm')[0]['digest'],
+                             request_digest("prompt", images=[FRAME_PATH]))
+
+    def test_recording_llm_logs_digest_and_response(self):
+        """Test that wrapped LLM calls are recorded per purpose"""
+        recorder = SessionRecorder(self.archive_path)
+        llm = RecordingLLM(StubLLM({'quick': 'quick answer'}), recorder)
+        self.assertEqual(llm.generate("prompt", images=[FRAME_PATH], purpose="quick"), 'quick answer')
+        recorder.close()
+
+        with SessionArchive(self.archive_path) as archive:
+            event = archive.events_of_type('llm')[0]
+            self.assertEqual(len(event['digest']), 64)
+            self.assertEqual(event['images'], 1)
+            self.assertEqual(archive.llm_responses(), {'quick': ['quick answer']})
+
+    def test_replay_of_recorded_archive(self):
+        """Test recording a replay run and replaying the resulting archive"""
+        first = run_replay(SESSION_DIR, repeat=2, output_dir=self.temp_dir, record=self.archive_path)
+
+        with SessionArchive(self.archive_path) as archive:
+            self.assertEqual(len(archive.profiles()), 2)
+            self.assertIn('full', archive.llm_responses())
+
+        second = run_replay(self.archive_path, output_dir=self.temp_dir)
+        self.assertEqual(second['profiles'], first['profiles'])
+        self.assertEqual(second['outcomes'], first['outcomes'])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
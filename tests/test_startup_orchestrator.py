@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the startup orchestrator
+Tests concurrent execution, dependencies and failure handling
+"""
+
+import sys
+import os
+import time
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.startup_orchestrator import StartupOrchestrator
+
+
+class TestStartupOrchestrator(unittest.TestCase):
+    """
+    Test cases for StartupOrchestrator
+    """
+
+    def test_independent_tasks_overlap(self):
+        """Test that independent tasks run in parallel"""
+        orchestrator = StartupOrchestrator()
+        orchestrator.add_task("scrcpy_launch", lambda: time.sleep(0.3))
+        orchestrator.add_task("llm_warmup", lambda: time.sleep(0.3))
+        orchestrator.add_task("ocr_init", lambda: time.sleep(0.3))
+
+        started = time.time()
+        self.assertTrue(orchestrator.run())
+        elapsed = time.time() - started
+
+        self.assertLess(elapsed, 0.6, "Tasks should overlap instead of running serially")
+        self.assertEqual(set(orchestrator.timings), {"scrcpy_launch", "llm_warmup", "ocr_init"})
+        self.assertIn("Startup timing breakdown", orchestrator.report())
+
+    def test_dependencies_run_in_order(self):
+        """Test that a dependent task starts after its dependency finishes"""
+        order = []
+        orchestrator = StartupOrchestrator()
+        orchestrator.add_task("window_discovery", lambda: order.append("window"),
+                              depends_on=["scrcpy_launch"])
+        orchestrator.add_task("scrcpy_launch", lambda: (time.sleep(0.1), order.append("scrcpy")))
+
+        self.assertTrue(orchestrator.run())
+        self.assertEqual(order, ["scrcpy", "window"])
+
+    def test_required_failure_skips_dependents(self):
+        """Test that a failed required task fails the run and skips dependents"""
+        orchestrator = StartupOrchestrator()
+        orchestrator.add_task("scrcpy_launch", lambda: False)
+        orchestrator.add_task("window_discovery", lambda: True, depends_on=["scrcpy_launch"])
+        orchestrator.add_task("llm_warmup", lambda: True)
+
+        self.assertFalse(orchestrator.run())
+        self.assertEqual(orchestrator.timings["scrcpy_launch"]["status"], "failed")
+        self.assertEqual(orchestrator.timings["window_discovery"]["status"], "skipped")
+        self.assertTrue(orchestrator.succeeded("llm_warmup"))
+
+    def test_optional_failure_does_not_fail_run(self):
+        """Test that optional task failures and exceptions are tolerated"""
+        def broken():
+            raise RuntimeError("model not pulled")
+
+        orchestrator = StartupOrchestrator()
+        orchestrator.add_task("scrcpy_launch", lambda: True)
+        orchestrator.add_task("llm_warmup", broken, required=False)
+
+        self.assertTrue(orchestrator.run())
+        self.assertFalse(orchestrator.succeeded("llm_warmup"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
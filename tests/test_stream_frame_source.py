@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless stream frame source
+Decodes a local video file as a stand-in for scrcpy's video output
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from modules.stream_frame_source import StreamFrameSource
+from screenshot_writer import get_screenshot_writer
+
+TEST_SCREENSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'screenshots_for_test')
+
+
+class TestStreamFrameSource(unittest.TestCase):
+    """
+    Test cases for StreamFrameSource
+    """
+
+    def setUp(self):
+        """Write a short video built from the test screenshots"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.temp_dir, "stream.avi")
+
+        # MJPG needs even dimensions; use the first test screenshot size rounded down
+        first = Image.open(os.path.join(TEST_SCREENSHOT_DIR, "end_screenshot.png")).convert("RGB")
+        self.frame_size = (first.width // 2 * 2, first.height // 2 * 2)
+
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 10, self.frame_size)
+        for name in ["end_screenshot.png", "ocr_test_check_string_hispanic.png"]:
+            image = Image.open(os.path.join(TEST_SCREENSHOT_DIR, name)).convert("RGB").resize(self.frame_size)
+            frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+            for _ in range(5):
+                writer.write(frame)
+        writer.release()
+
+        self.source = StreamFrameSource(source=self.video_path, buffer_size=4)
+        self.source.screenshot_dir = self.temp_dir
+
+    def tearDown(self):
+        """Stop decoding and remove temporary files"""
+        self.source.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_start_fails_for_missing_source(self):
+        """Test that an unreadable source is reported"""
+        source = StreamFrameSource(source=os.path.join(self.temp_dir, "missing.avi"))
+        self.assertFalse(source.start())
+
+    def test_decodes_into_ring_buffer(self):
+        """Test that frames are decoded at stream resolution into a bounded buffer"""
+        self.assertTrue(self.source.start())
+        self.assertTrue(self.source.wait_for_frame(timeout=5))
+        self.source._thread.join(timeout=5)
+
+        self.assertEqual(self.source.frame_count, 10)
+        self.assertEqual(len(self.source.frames), 4)
+
+        frame = self.source.latest_array()
+        self.assertEqual(frame.shape, (self.frame_size[1], self.frame_size[0], 3))
+
+    def test_capture_screenshot_interface(self):
+        """Test that capture_screenshot saves the latest frame like ScreenshotHandler"""
+        self.assertTrue(self.source.start())
+        self.source._thread.join(timeout=5)
+
+        path = self.source.capture_screenshot("stream_capture.png")
+
+        self.assertIsNotNone(path)
+        self.assertTrue(get_screenshot_writer().wait_for(path, timeout=5))
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(Image.open(path).size, self.frame_size)
+
+    def test_grab_frame_without_stream(self):
+        """Test that grabbing before any frame is decoded returns None"""
+        self.assertIsNone(self.source.grab_frame())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
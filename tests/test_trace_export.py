@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for Chrome trace-event export
+Tests that instrumentation spans become trace events with thread ids
+"""
+
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.instrumentation import Instrumentation
+from modules.trace_export import TraceRecorder
+
+
+class TestTraceExport(unittest.TestCase):
+    """
+    Test cases for TraceRecorder
+    """
+
+    def setUp(self):
+        """Wire a trace recorder to a fresh instrumentation instance"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.instrumentation = Instrumentation(enabled=True, output_dir=self.temp_dir, run_id="trace")
+        self.tracer = TraceRecorder(output_path=os.path.join(self.temp_dir, "trace.json"))
+        self.instrumentation.add_listener(self.tracer.on_span)
+
+    def tearDown(self):
+        """Remove temporary files"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_spans_written_as_complete_events(self):
+        """Test that spans from several threads are exported with their thread ids"""
+        with self.instrumentation.span("llm.generate", model="gemma3:4b", images=2):
+            pass
+
+        def worker():
+            self.instrumentation.sleep(0.01, "scroll_wait")
+
+        thread = threading.Thread(target=worker, name="watcher")
+        thread.start()
+        thread.join()
+
+        path = self.tracer.write()
+        with open(path) as f:
+            trace = json.load(f)
+
+        complete = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+        names = {e['name']: e for e in complete}
+        self.assertEqual(set(names), {"llm.generate", "sleep.scroll_wait"})
+        self.assertEqual(names["llm.generate"]['args'], {"model": "gemma3:4b", "images": 2})
+        self.assertEqual(names["sleep.scroll_wait"]['cat'], "sleep")
+        self.assertGreaterEqual(names["sleep.scroll_wait"]['dur'], 10000)
+        self.assertNotEqual(names["llm.generate"]['tid'], names["sleep.scroll_wait"]['tid'])
+
+        thread_names = {e['args']['name'] for e in trace['traceEvents']
+                        if e['ph'] == 'M' and e['name'] == 'thread_name'}
+        self.assertIn("watcher", thread_names)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for two-phase (decide-then-compose) profile analysis
+Uses stub LLMs so no model is required
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from replay import run_replay
+from modules.replay_backends import StubLLM
+from modules.profile_analyzer import ProfileAnalyzer
+from modules.comment_generator import CommentGenerator
+
+SESSION_DIR = os.path.join(os.path.dirname(__file__), '..', 'screenshots_for_test')
+ENGAGE_DECISION = '{"rating": 8, "reason": "Loves climbing", "decision": "ENGAGE"}'
+REJECT_DECISION = '{"rating": 3, "reason": "Low effort profile", "decision": "NEXT_PROFILE"}'
+
+
+class TestTwoPhaseAnalysis(unittest.TestCase):
+    """
+    Test cases for ANALYSIS_MODE = "two_phase"
+    """
+
+    def make_analyzer(self, responses):
+        """Create a two-phase analyzer backed by one stub LLM"""
+        self.llm = StubLLM(responses)
+        return ProfileAnalyzer(llm=self.llm, analysis_mode="two_phase")
+
+    def test_reject_skips_comment_generation(self):
+        """Test that NEXT_PROFILE decisions never call the comment generator"""
+        result = self.make_analyzer({'decision': REJECT_DECISION}).analyze_profile(["a.png"])
+
+        self.assertEqual(result['decision'], 'NEXT_PROFILE')
+        self.assertEqual(result['comment'], 'N/A')
+        self.assertEqual(self.llm.calls, ['decision'])
+
+    def test_engage_generates_validated_comment(self):
+        """Test that ENGAGE decisions get a cleaned comment and can be engaged"""
+        analyzer = self.make_analyzer({'decision': ENGAGE_DECISION,
+                                       'comment': 'Comment: "Which wall do you climb first?"\nExtra line'})
+        result = analyzer.analyze_profile(["a.png"])
+
+        self.assertEqual(result['comment'], 'Which wall do you climb first?')
+        self.assertEqual(self.llm.calls, ['decision', 'comment'])
+        self.assertTrue(analyzer.should_engage_profile(result))
+
+    def test_invalid_comments_fall_back_to_next_profile(self):
+        """Test that a profile is skipped when no generated comment passes validation"""
+        analyzer = self.make_analyzer({'decision': ENGAGE_DECISION, 'comment': 'x' * 200})
+        result = analyzer.analyze_profile(["a.png"])
+
+        self.assertEqual(result['decision'], 'NEXT_PROFILE')
+        self.assertEqual(self.llm.calls, ['decision', 'comment', 'comment'])
+        self.assertFalse(analyzer.should_engage_profile(result))
+
+    def test_generate_comment_retries_until_valid(self):
+        """Test that an invalid first comment is regenerated"""
+        generator = CommentGenerator(llm=StubLLM({'comment': ['this is spam', 'Coffee or tea?']}))
+        self.assertEqual(generator.generate_comment(["a.png"], reason="Coffee lover"), 'Coffee or tea?')
+
+    def test_replay_two_phase(self):
+        """Test that the main loop engages profiles in two-phase mode"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            report = run_replay(SESSION_DIR, output_dir=temp_dir, analysis_mode="two_phase")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        self.assertEqual(report['outcomes'], ['engaged'])
+        self.assertEqual(report['stages']['comment_generation']['count'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for Window Detector
+Tests window discovery by title, polling and geometry refresh
+"""
+
+import sys
+import os
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add modules to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from modules.window_detector import WindowDetector
+
+
+class FakeMacWindows:
+    """Stand-in for pygetwindow's macOS API (titles plus geometry lookup)"""
+
+    def __init__(self):
+        self.windows = {"Terminal": (0, 0, 800, 600)}
+
+    def getAllTitles(self):
+        return list(self.windows.keys())
+
+    def getWindowGeometry(self, title):
+        return self.windows.get(title)
+
+
+class TestWindowDetector(unittest.TestCase):
+    """
+    Test cases for WindowDetector discovery
+    """
+
+    def setUp(self):
+        """Patch pygetwindow with a fake window list"""
+        self.fake_gw = FakeMacWindows()
+        patcher_gw = patch('modules.window_detector.gw', self.fake_gw, create=True)
+        patcher_available = patch('modules.window_detector.PYGETWINDOW_AVAILABLE', True)
+        patcher_gw.start()
+        patcher_available.start()
+        self.addCleanup(patcher_gw.stop)
+        self.addCleanup(patcher_available.stop)
+        self.detector = WindowDetector()
+
+    def test_find_window_by_title(self):
+        """Test that the configured title is used for lookup"""
+        self.fake_gw.windows["HingeAutomation"] = (100, 50, 540, 960)
+
+        self.assertTrue(self.detector.find_window_by_title("HingeAutomation"))
+        dimensions = self.detector.get_dimensions()
+
+        self.assertEqual(dimensions['left'], 100)
+        self.assertEqual(dimensions['width'], 540)
+        self.assertEqual(dimensions['bottom'], 1010)
+
+    def test_find_window_missing(self):
+        """Test that a missing window is reported"""
+        self.assertFalse(self.detector.find_window_by_title("HingeAutomation"))
+
+    def test_wait_for_window_returns_when_window_appears(self):
+        """Test that polling returns as soon as the window exists"""
+        def open_window():
+            time.sleep(0.2)
+            self.fake_gw.windows["HingeAutomation"] = (0, 0, 540, 960)
+
+        threading.Thread(target=open_window).start()
+        started = time.time()
+        found = self.detector.wait_for_window("HingeAutomation", timeout=5, poll_interval=0.05)
+
+        self.assertTrue(found)
+        self.assertLess(time.time() - started, 2)
+
+    def test_wait_for_window_deadline(self):
+        """Test that polling stops at the deadline"""
+        found = self.detector.wait_for_window("HingeAutomation", timeout=0.2, poll_interval=0.05)
+        self.assertFalse(found)
+
+    def test_refresh_if_moved(self):
+        """Test that geometry is refreshed only when the window moved"""
+        self.fake_gw.windows["HingeAutomation"] = (100, 50, 540, 960)
+        self.detector.find_window_by_title("HingeAutomation")
+        self.detector.get_dimensions()
+
+        self.assertFalse(self.detector.refresh_if_moved())
+
+        self.fake_gw.windows["HingeAutomation"] = (300, 80, 540, 960)
+        self.assertTrue(self.detector.refresh_if_moved())
+        self.assertEqual(self.detector.dimensions['left'], 300)
+        self.assertEqual(self.detector.dimensions['top'], 80)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
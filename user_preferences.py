@@ -5,6 +5,8 @@ Based on relationship research and compatibility studies
 Random data used which is non reflective of any real individuals
 """
 
+import re
+
 # Quick Rating Threshold
 QUICK_RATING_THRESHOLD = 4  # Minimum rating to continue with full analysis
 
@@ -131,6 +133,139 @@ def get_quick_rating_threshold():
     """Get the minimum rating threshold for continuing analysis"""
     return QUICK_RATING_THRESHOLD
 
+# Severity ranking used to pick the most serious red flag
+SEVERITY_ORDER = {"high": 3, "medium": 2, "low": 1}
+
+# Green flag fields holding keyword lists
+GREEN_KEYWORD_FIELDS = ("keywords", "preferred", "preferred_levels", "preferred_cities")
+
+
+def _trie_pattern(keywords):
+    """
+    Build a regex alternation with shared prefixes factored out
+
+    The regex engine then tests each distinct prefix once per position instead of
+    once per keyword, and the greedy optional suffixes prefer the longest keyword.
+
+    Args:
+        keywords: Iterable of normalised (lowercase, single-spaced) keywords
+
+    Returns:
+        str: Regex source matching any of the keywords
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [(r"\s+" if char == " " else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+
+class FlagMatcher:
+    """
+    Red and green flag keywords compiled into one case-insensitive regex
+
+    Keywords are matched on word boundaries (so "prison" does not match
+    "imprisoned"), longest keyword first, with any run of whitespace allowed
+    between the words of a phrase. A single pass over the text returns every hit,
+    and the cost grows with the text length rather than the number of keywords.
+    """
+
+    def __init__(self, red_flags=None, green_flags=None):
+        """
+        Compile the flag configurations
+
+        Args:
+            red_flags: Red flags configuration (uses global if None)
+            green_flags: Green flags configuration (uses global if None)
+        """
+        red_flags = RED_FLAGS if red_flags is None else red_flags
+        green_flags = GREEN_FLAGS if green_flags is None else green_flags
+
+        # Normalised keyword -> list of (kind, flag name, original keyword, flag config)
+        self.keywords = {}
+        for flag_name, flag_config in red_flags.items():
+            for keyword in flag_config.get("keywords", []):
+                self._add("red", flag_name, keyword, flag_config)
+        for flag_name, flag_config in green_flags.items():
+            for field in GREEN_KEYWORD_FIELDS:
+                for keyword in flag_config.get(field, []):
+                    self._add("green", flag_name, keyword, flag_config)
+
+        self.green_categories = sorted({entry[1] for entries in self.keywords.values()
+                                        for entry in entries if entry[0] == "green"})
+
+        self.pattern = re.compile(r"(?<!\w)(?:" + _trie_pattern(self.keywords) + r")(?!\w)",
+                                  re.IGNORECASE) if self.keywords else None
+
+    def _add(self, kind, flag_name, keyword, flag_config):
+        normalised = " ".join(keyword.lower().split())
+        if normalised:
+            self.keywords.setdefault(normalised, []).append((kind, flag_name, keyword, flag_config))
+
+    def scan(self, text):
+        """
+        Find every red and green flag keyword in the text
+
+        Args:
+            text: Text to scan (profile OCR text or LLM analysis)
+
+        Returns:
+            list of hit dicts in text order: kind ('red' or 'green'), flag_name,
+            keyword, start, end, plus severity and reason for red flags
+        """
+        if not text or self.pattern is None:
+            return []
+
+        hits = []
+        for match in self.pattern.finditer(text):
+            for kind, flag_name, keyword, flag_config in self.keywords[" ".join(match.group().lower().split())]:
+                hit = {"kind": kind, "flag_name": flag_name, "keyword": keyword,
+                       "start": match.start(), "end": match.end()}
+                if kind == "red":
+                    hit["severity"] = flag_config.get("severity", "low")
+                    hit["reason"] = flag_config.get("reason", "")
+                hits.append(hit)
+        return hits
+
+
+# Matcher for the global flag configuration, compiled on first use
+_flag_matcher = None
+
+def get_flag_matcher():
+    """
+    Get the matcher compiled from RED_FLAGS and GREEN_FLAGS
+
+    Returns:
+        FlagMatcher instance
+    """
+    global _flag_matcher
+    if _flag_matcher is None:
+        _flag_matcher = FlagMatcher()
+    return _flag_matcher
+
+def find_flags(text):
+    """
+    Find all red and green flag hits in text with the global matcher
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        list of hit dicts (see FlagMatcher.scan)
+    """
+    return get_flag_matcher().scan(text)
+
 def has_red_flag(text_analysis, red_flags_config=None):
     """
     Check if text analysis contains any red flags
@@ -140,44 +275,62 @@ def has_red_flag(text_analysis, red_flags_config=None):
         red_flags_config: Red flags configuration (uses global if None)
 
     Returns:
-        tuple: (has_red_flag, red_flag_details)
+        tuple: (has_red_flag, red_flag_details) where the details describe the most
+        severe hit (earliest on ties) and list every red hit under 'all_hits'
     """
     if red_flags_config is None:
-        red_flags_config = RED_FLAGS
-
-    text_lower = text_analysis.lower()
+        matcher = get_flag_matcher()
+    else:
+        matcher = FlagMatcher(red_flags=red_flags_config, green_flags={})
 
-    for flag_name, flag_config in red_flags_config.items():
-        for keyword in flag_config["keywords"]:
-            if keyword.lower() in text_lower:
-                return True, {
-                    "flag_name": flag_name,
-                    "keyword_found": keyword,
-                    "severity": flag_config["severity"],
-                    "reason": flag_config["reason"]
-                }
+    red_hits = [hit for hit in matcher.scan(text_analysis) if hit["kind"] == "red"]
+    if not red_hits:
+        return False, None
 
-    return False, None
+    worst = max(red_hits, key=lambda hit: (SEVERITY_ORDER.get(hit["severity"], 0), -hit["start"]))
+    return True, {
+        "flag_name": worst["flag_name"],
+        "keyword_found": worst["keyword"],
+        "severity": worst["severity"],
+        "reason": worst["reason"],
+        "all_hits": red_hits
+    }
 
-def calculate_compatibility_score(profile_analysis, user_profile=None):
+def calculate_compatibility_score(profile_analysis):
     """
     Calculate compatibility score based on green flags
 
     Args:
-        profile_analysis: AI analysis of profile
-        user_profile: User profile data
+        profile_analysis: AI analysis of profile (text, or a dict whose string values are scanned)
 
     Returns:
         dict: Compatibility scores and recommendations
     """
-    if user_profile is None:
-        user_profile = USER_PROFILE
+    if isinstance(profile_analysis, dict):
+        profile_analysis = " ".join(str(value) for value in profile_analysis.values() if isinstance(value, str))
+
+    matcher = get_flag_matcher()
+    hits = matcher.scan(profile_analysis)
+    green_hits = [hit for hit in hits if hit["kind"] == "green"]
+    red_hits = [hit for hit in hits if hit["kind"] == "red"]
+
+    # Each green flag category with keywords counts once, scaled to 0-10
+    matched_categories = {hit["flag_name"] for hit in green_hits}
+    categories = len(matcher.green_categories)
+    overall_score = round(10.0 * len(matched_categories) / categories, 2) if categories else 0.0
+
+    if any(hit["severity"] == "high" for hit in red_hits):
+        recommendation = "avoid"
+    elif red_hits:
+        recommendation = "caution"
+    elif overall_score >= 5:
+        recommendation = "positive"
+    else:
+        recommendation = "neutral"
 
-    # This would be implemented with more sophisticated matching
-    # For now, return a basic structure
     return {
-        "overall_score": 0.0,
-        "green_flag_matches": [],
-        "red_flag_warnings": [],
-        "recommendation": "neutral"
+        "overall_score": overall_score,
+        "green_flag_matches": green_hits,
+        "red_flag_warnings": red_hits,
+        "recommendation": recommendation
     }